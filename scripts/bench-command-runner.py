@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the latency of spawning a command through LoggedCommandRunner.
+
+Each runner mode starts the same short command --count times and reports
+the mean and worst time to run it to completion:
+
+  systemd-run   the command runs in a transient unit (the default)
+  direct        the command is run directly, its output logged via
+                systemd-cat
+  direct-pipe   the command is run directly with its output captured
+
+systemd-run needs a running systemd; use --user to talk to the user
+manager when not running as root.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+scripts_dir = sys.path[0]
+subiquity_root = Path(scripts_dir) / ".."
+
+sys.path.insert(0, str(subiquity_root))
+
+from subiquity.server.runner import LoggedCommandRunner  # noqa: E402
+
+MODES: Dict[str, dict] = {
+    "systemd-run": {"direct": False},
+    "direct": {"direct": True},
+    "direct-pipe": {"direct": True, "capture": True},
+}
+
+
+async def bench(runner: LoggedCommandRunner, cmd: List[str], count: int, opts: dict):
+    timings = []
+    for i in range(count):
+        start = time.perf_counter()
+        await runner.run(cmd, **opts)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def run(args: argparse.Namespace) -> None:
+    runner = LoggedCommandRunner(
+        "subiquity_bench", use_systemd_user=True if args.user else None
+    )
+    for mode in args.modes:
+        opts = MODES[mode]
+        # Warm up before measuring.
+        await bench(runner, args.cmd, 1, opts)
+        timings = await bench(runner, args.cmd, args.count, opts)
+        print(
+            f"{mode:12} mean {statistics.mean(timings) * 1000:8.2f}ms"
+            f"  max {max(timings) * 1000:8.2f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument(
+        "--mode",
+        dest="modes",
+        action="append",
+        choices=sorted(MODES),
+        help="Runner mode to measure (default: all)",
+    )
+    parser.add_argument("--user", action="store_true", help="Use systemd-run --user")
+    parser.add_argument("cmd", nargs="*", default=["true"])
+    args = parser.parse_args()
+    if not args.modes:
+        args.modes = list(MODES)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure how many context events per second the server can report.
+
+Every API request and most server operations create a Context and report
+start and finish events through SubiquityServer.report_start_event and
+report_finish_event, so this is a useful number to keep an eye on.
+
+By default events are sent to the journal just like in the real server;
+pass --no-journal to measure only the in-process overhead.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+scripts_dir = sys.path[0]
+subiquity_root = Path(scripts_dir) / ".."
+curtin_root = subiquity_root / "curtin"
+probert_root = subiquity_root / "probert"
+
+sys.path.insert(0, str(subiquity_root))
+sys.path.insert(1, str(curtin_root))
+sys.path.insert(2, str(probert_root))
+
+from subiquity.cmd.server import make_server_args_parser  # noqa: E402
+from subiquity.server.dryrun import DRConfig  # noqa: E402
+from subiquity.server.server import SubiquityServer  # noqa: E402
+from subiquitycore.context import Status  # noqa: E402
+
+
+def make_app() -> SubiquityServer:
+    parser = make_server_args_parser()
+    opts, unknown = parser.parse_known_args(["--dry-run"])
+    app = SubiquityServer(opts, "")
+    app.dr_cfg = DRConfig()
+    app.base_model = app.make_model()
+    app.controllers.load_all()
+    # Report everything, as in a fully automated install.
+    app.interactive = False
+    return app
+
+
+def bench(app: SubiquityServer, count: int, depth: int) -> float:
+    parent = app.controllers.instances[0].context
+    for i in range(depth):
+        parent = parent.child(f"level{i}")
+
+    start = time.perf_counter()
+    for i in range(count):
+        context = parent.child("bench", "benchmark event")
+        app.report_start_event(context, context.description)
+        app.report_finish_event(context, context.description, Status.SUCCESS)
+    return time.perf_counter() - start
+
+
+async def run(args: argparse.Namespace) -> None:
+    app = make_app()
+    if args.no_journal:
+        patcher = mock.patch("subiquity.server.server.journal.send")
+    else:
+        patcher = contextlib.nullcontext()
+    with patcher:
+        # Warm up before measuring.
+        bench(app, min(args.count, 1000), args.depth)
+        elapsed = bench(app, args.count, args.depth)
+    # Each iteration reports a start and a finish event.
+    events = 2 * args.count
+    print(f"{events} events in {elapsed:.3f}s: {events / elapsed:.0f} events/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument(
+        "--depth", type=int, default=3, help="Nesting depth of the contexts"
+    )
+    parser.add_argument(
+        "--no-journal",
+        action="store_true",
+        help="Do not send the events to the journal",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure how fast netlink link events are processed.
+
+A storm of link events is replayed through SubiquityNetworkEventReceiver
+into a NetworkModel, the way probert delivers them at boot on a host with
+many SR-IOV virtual functions.
+
+The events are read from a file with one JSON object per line, e.g.
+
+  {"event": "new_link", "ifindex": 2, "name": "ens3", "type": "eth"}
+  {"event": "update_link", "ifindex": 2, "flags": 0}
+  {"event": "del_link", "ifindex": 2}
+
+If no file is given, a storm is generated: --links interfaces appear,
+each then changes state --updates times, and finally they all go away.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+scripts_dir = sys.path[0]
+subiquity_root = Path(scripts_dir) / ".."
+curtin_root = subiquity_root / "curtin"
+probert_root = subiquity_root / "probert"
+
+sys.path.insert(0, str(subiquity_root))
+sys.path.insert(1, str(curtin_root))
+sys.path.insert(2, str(probert_root))
+
+from probert.network import IFF_UP  # noqa: E402
+
+from subiquitycore import netplan  # noqa: E402
+from subiquitycore.controllers.network import (  # noqa: E402
+    DryRunSubiquityNetworkEventReceiver,
+)
+from subiquitycore.models.network import NetworkModel  # noqa: E402
+
+
+class FakeLink:
+    """The parts of probert's Link that the model looks at."""
+
+    def __init__(self, ifindex: int, name: str, type: str, flags: int) -> None:
+        self.ifindex = ifindex
+        self.name = name
+        self.type = type
+        self.is_virtual = False
+        self.flags = flags
+        self.addresses = {}
+        self.hwaddr = None
+        self.is_connected = True
+
+
+class Controller:
+    """Stands in for the network controller, doing no work of its own."""
+
+    def __init__(self) -> None:
+        self.model = NetworkModel("subiquity")
+        self.model.config = netplan.Config()
+
+    def new_link(self, dev) -> None:
+        pass
+
+    def update_link(self, dev) -> None:
+        pass
+
+    def del_link(self, dev) -> None:
+        pass
+
+    def update_has_default_route(self, has_default_route) -> None:
+        pass
+
+
+def generate_events(links: int, updates: int) -> Iterator[Dict[str, Any]]:
+    ifindexes = range(2, links + 2)
+    for ifindex in ifindexes:
+        yield {
+            "event": "new_link",
+            "ifindex": ifindex,
+            "name": f"enp1s0v{ifindex}",
+            "type": "eth",
+        }
+    for i in range(updates):
+        for ifindex in ifindexes:
+            yield {
+                "event": "update_link",
+                "ifindex": ifindex,
+                "flags": IFF_UP * (i % 2),
+            }
+    for ifindex in ifindexes:
+        yield {"event": "del_link", "ifindex": ifindex}
+
+
+def read_events(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path) as fp:
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay(events) -> float:
+    controller = Controller()
+    receiver = DryRunSubiquityNetworkEventReceiver(controller)
+    links: Dict[int, FakeLink] = {}
+    start = time.perf_counter()
+    for event in events:
+        ifindex = event["ifindex"]
+        if event["event"] == "new_link":
+            link = links[ifindex] = FakeLink(
+                ifindex, event["name"], event["type"], event.get("flags", IFF_UP)
+            )
+            receiver.new_link(ifindex, link)
+        elif event["event"] == "update_link":
+            if ifindex in links:
+                links[ifindex].flags = event.get("flags", IFF_UP)
+            receiver.update_link(ifindex)
+        elif event["event"] == "del_link":
+            links.pop(ifindex, None)
+            receiver.del_link(ifindex)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("events", nargs="?", help="File of recorded events")
+    parser.add_argument("--links", type=int, default=512)
+    parser.add_argument("--updates", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.events is not None:
+        events = list(read_events(args.events))
+    else:
+        events = list(generate_events(args.links, args.updates))
+    elapsed = replay(events)
+    print(
+        f"{len(events)} events in {elapsed:.3f}s: "
+        f"{len(events) / elapsed:.0f} events/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
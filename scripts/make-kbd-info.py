@@ -15,6 +15,7 @@ from subiquity.common.types import (
     StepPressKey,
     StepKeyPresent,
     )
+from subiquity.models.keyboard import build_layout_index
 
 sys.path.insert(0, os.path.dirname(__file__))
 
@@ -68,6 +69,8 @@ for lang, layouts in lang_to_layouts.items():
                     "variant!")
             out.write(s.to_json(KeyboardLayout, layout) + "\n")
 
+build_layout_index(tdir)
+
 
 pc105tree = pc105.PC105Tree()
 pc105tree.read_steps()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Build the modalias index used to recommend drivers early.
+
+Run this when building the ISO, once the pool is complete, e.g.
+
+  make-modalias-index.py --cdrom $ISO_ROOT \\
+      --output $ISO_ROOT/casper/modalias-index.json
+
+The Packages files of the pool are found under the dists/ directory of
+--cdrom; they can also be passed explicitly.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+scripts_dir = sys.path[0]
+subiquity_root = Path(scripts_dir) / ".."
+
+sys.path.insert(0, str(subiquity_root))
+
+from subiquity.server.modalias_index import build_index  # noqa: E402
+
+
+def find_packages_files(cdrom: str) -> List[str]:
+    files = {}
+    pattern = os.path.join(cdrom, "dists", "*", "*", "binary-*", "Packages*")
+    for path in sorted(glob.glob(pattern)):
+        base, ext = os.path.splitext(path)
+        if ext not in ("", ".gz"):
+            continue
+        # Only read one of Packages and Packages.gz.
+        files.setdefault(base if ext else path, path)
+    return sorted(files.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("packages", nargs="*", help="Packages files to read")
+    parser.add_argument("--cdrom", help="Root of the ISO tree")
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    packages = list(args.packages)
+    if args.cdrom is not None:
+        packages.extend(find_packages_files(args.cdrom))
+    if not packages:
+        parser.error("no Packages files to read")
+
+    index = build_index(packages)
+    with open(args.output, "w") as fp:
+        json.dump(index, fp, separators=(",", ":"))
+    print(f"{len(index)} modalias patterns from {len(packages)} files")
+
+
+if __name__ == "__main__":
+    main()
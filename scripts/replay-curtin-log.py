@@ -2,19 +2,28 @@
 
 """ Script that replays curtin events from a journald export.
 curtin events are injected back in journald and log lines are written to a log
-file. """
+file.
+
+The replay file can also be a timeline written by the server (see
+subiquity/server/timeline.py), in which case the curtin install of the stages
+given by --stages is replayed. """
 
 import argparse
 import json
 import os
 import sys
 import time
-from typing import TextIO
+from pathlib import Path
+from typing import Any, Dict, List, TextIO
 
 from systemd import journal
 
 import yaml
 
+sys.path.insert(0, str(Path(sys.path[0]) / '..'))
+
+from subiquity.server.timeline import curtin_events  # noqa: E402
+
 scale_factor = float(os.environ.get('SUBIQUITY_REPLAY_TIMESCALE', "4"))
 
 def time_for_entry(e):
@@ -37,6 +46,18 @@ def report(e, log_file: TextIO, event_identifier: str):
         log_file.write(e['MESSAGE'] + '\n')
 
 
+def read_entries(path: str, stages: List[str]) -> List[Dict[str, Any]]:
+    with open(path) as fp:
+        content = fp.read()
+    try:
+        trace = json.loads(content)
+    except json.JSONDecodeError:
+        trace = None
+    if isinstance(trace, dict) and 'traceEvents' in trace:
+        return list(curtin_events(trace, stages))
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
 def main() -> int:
     """ Entry point. """
     parser = argparse.ArgumentParser()
@@ -45,6 +66,8 @@ def main() -> int:
     parser.add_argument("--event-identifier", required=True)
     parser.add_argument("--output", type=argparse.FileType("w"), default="-")
     parser.add_argument("--config", type=argparse.FileType("r"), default=None)
+    parser.add_argument("--stages", type=json.loads, default=[],
+                        help="curtin stages to replay from a timeline")
 
     args = vars(parser.parse_args())
 
@@ -62,8 +85,7 @@ def main() -> int:
                     json.dump(device_map, fp)
 
     prev_ev = None
-    for line in open(args["replay-file"]):
-        ev = json.loads(line.strip())
+    for ev in read_entries(args["replay-file"], args["stages"]):
         if prev_ev is not None:
             report(prev_ev, args["output"],
                    event_identifier=args["event_identifier"])
@@ -36,9 +36,9 @@ from subiquity.common.types import (
     ApplicationState,
     ErrorReportKind,
     ErrorReportRef,
+    InstallerEvent,
     NonReportableError,
 )
-from subiquity.journald import journald_listen
 from subiquity.server.server import POSTINSTALL_MODEL_NAMES
 from subiquity.ui.frame import SubiquityUI
 from subiquity.ui.views.error import ErrorReportStretchy, NonReportableErrorStretchy
@@ -151,6 +151,8 @@ class SubiquityClient(TuiApplication):
             self.our_tty = "not a tty"
 
         self.in_make_view_cvar = contextvars.ContextVar("in_make_view", default=False)
+        # Replaced by a new event each time it is set, see get_status.
+        self._state_changed = asyncio.Event()
 
         self.error_reporter = ErrorReporter(
             self.context.child("ErrorReporter"), self.opts.dry_run, self.root
@@ -250,10 +252,20 @@ class SubiquityClient(TuiApplication):
             answer = await run_in_thread(input)
         await self.confirm_install()
 
-    async def _status_get(self, cur=None):
+    def _notify_state_changed(self):
+        self._state_changed.set()
+        self._state_changed = asyncio.Event()
+
+    async def get_status(self, cur=None):
+        """Return the status of the server, once its state is not cur.
+
+        Changes of state are noticed through the "state" events the server
+        publishes, see _server_event.
+        """
         while True:
+            changed = self._state_changed
             try:
-                return await self.client.meta.status.GET(cur=cur)
+                status = await self.client.meta.status.GET()
             except aiohttp.ClientError:
                 try:
                     fp = open(self.state_path("server-state"))
@@ -265,6 +277,10 @@ class SubiquityClient(TuiApplication):
                     if state == ApplicationState.EXITED:
                         self.exit()
                 await asyncio.sleep(1)
+                continue
+            if cur is None or status.state != cur:
+                return status
+            await changed.wait()
 
     async def noninteractive_watch_app_state(self, initial_status):
         app_status = initial_status
@@ -284,12 +300,46 @@ class SubiquityClient(TuiApplication):
                 print("An error occurred. Press enter to start a shell")
                 await run_in_thread(input)
                 os.execvp("/bin/bash", ["/bin/bash"])
-            app_status = await self._status_get(app_state)
+            app_status = await self.get_status(app_state)
+
+    async def follow_events(self, callback):
+        """Call callback with every event the server publishes.
+
+        The events are fetched from the server's meta/events endpoint
+        starting from the first one, and following on from the last seen
+        one if the connection drops.
+        """
+        after = 0
+        while True:
+            try:
+                events = await self.client.meta.events.GET(after=after)
+            except aiohttp.ClientError:
+                # Let get_status find out what happened to the server.
+                self._notify_state_changed()
+                await asyncio.sleep(1)
+                continue
+            for event in events:
+                after = event.seq
+                callback(event)
+
+    def _server_event(self, event: InstallerEvent):
+        if event.kind == "state":
+            self._notify_state_changed()
+        elif event.kind == "echo":
+            print(event.message)
+
+    def _progress_event(self, event: InstallerEvent):
+        if event.kind in ("state", "echo"):
+            return
+        if event.kind == "log":
+            self.controllers.Progress.log_line(event)
+        else:
+            self.controllers.Progress.event(event)
 
-    def subiquity_event_noninteractive(self, event):
-        event_type = event["SUBIQUITY_EVENT_TYPE"]
-        message = event["MESSAGE"]
-        print(f"{event_type}: {message}")
+    def subiquity_event_noninteractive(self, event: InstallerEvent):
+        if event.kind in ("log", "state", "echo"):
+            return
+        print(f"{event.kind}: {event.message}")
 
     async def connect(self):
         def p(s):
@@ -310,19 +360,19 @@ class SubiquityClient(TuiApplication):
                 spinner.cancel()
                 p("\x08 \n")
 
-        status = await spinning_wait("connecting", self._status_get())
-        journald_listen([status.echo_syslog_id], lambda e: print(e["MESSAGE"]))
+        run_bg_task(self.follow_events(self._server_event))
+        status = await spinning_wait("connecting", self.get_status())
         if status.state == ApplicationState.STARTING_UP:
             status = await spinning_wait(
-                "starting up", self._status_get(cur=status.state)
+                "starting up", self.get_status(cur=status.state)
             )
         if status.state == ApplicationState.CLOUD_INIT_WAIT:
             status = await spinning_wait(
-                "waiting for cloud-init", self._status_get(cur=status.state)
+                "waiting for cloud-init", self.get_status(cur=status.state)
             )
         if status.state == ApplicationState.EARLY_COMMANDS:
             print("running early commands")
-            status = await self._status_get(cur=status.state)
+            status = await self.get_status(cur=status.state)
             await asyncio.sleep(0.5)
         return status
 
@@ -372,16 +422,8 @@ class SubiquityClient(TuiApplication):
                         self.load_controllers(controllers)
 
             await super().start()
-            # Progress uses systemd to collect and display the installation
-            # logs. Although some system don't have systemd, so we disable
-            # the progress page
             if hasattr(self.controllers, "Progress"):
-                journald_listen(
-                    [status.event_syslog_id], self.controllers.Progress.event
-                )
-                journald_listen(
-                    [status.log_syslog_id], self.controllers.Progress.log_line
-                )
+                run_bg_task(self.follow_events(self._progress_event))
             if not status.cloud_init_ok:
                 self.add_global_overlay(CloudInitFail(self))
                 run_bg_task(self.redraw_screen())
@@ -400,11 +442,7 @@ class SubiquityClient(TuiApplication):
                 # for a non-interactive one we need to clear things up or the
                 # prompting for confirmation will be confusing.
                 os.system("stty sane")
-            journald_listen(
-                [status.event_syslog_id],
-                self.subiquity_event_noninteractive,
-                seek=False,
-            )
+            run_bg_task(self.follow_events(self.subiquity_event_noninteractive))
             run_bg_task(self.noninteractive_watch_app_state(status))
 
     def _exception_handler(self, loop, context):
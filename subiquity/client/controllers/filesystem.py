@@ -15,7 +15,7 @@
 
 import asyncio
 import logging
-from typing import Callable, Optional
+from typing import Callable, Optional, Tuple
 
 from subiquity.client.controller import SubiquityTuiController
 from subiquity.common.filesystem import gaps
@@ -56,6 +56,27 @@ class FilesystemController(SubiquityTuiController, FilesystemManipulator):
         self.answers.setdefault("guided-index", 0)
         self.answers.setdefault("manual", [])
         self.current_view: Optional[BaseView] = None
+        # (etag, orig_config) of the last original config received. It only
+        # changes when the server loads new probe data, so there is no need
+        # to have it sent again every time.
+        self._orig_config: Optional[Tuple[str, list]] = None
+
+    async def _get_storage(self) -> StorageResponse:
+        known = self._orig_config
+        status: StorageResponse = await self.endpoint.GET(
+            orig_config_etag=known[0] if known is not None else None
+        )
+        if status.status != ProbeStatus.DONE:
+            return status
+        if (
+            status.orig_config is None
+            and known is not None
+            and status.orig_config_etag == known[0]
+        ):
+            status.orig_config = known[1]
+        elif status.orig_config_etag is not None:
+            self._orig_config = (status.orig_config_etag, status.orig_config)
+        return status
 
     async def make_ui(self) -> Callable[[], BaseView]:
         def get_current_view() -> BaseView:
@@ -273,7 +294,7 @@ class FilesystemController(SubiquityTuiController, FilesystemManipulator):
     async def _guided_choice(self, choice: GuidedChoiceV2):
         async def v2_guided_POST_with_v1_response() -> StorageResponse:
             await self.endpoint.v2.guided.POST(choice)
-            return await self.endpoint.GET()
+            return await self._get_storage()
 
         coro = v2_guided_POST_with_v1_response()
         if not choice.capability.supports_manual_customization():
@@ -325,7 +346,7 @@ class FilesystemController(SubiquityTuiController, FilesystemManipulator):
     async def _reset(self, refresh_view: bool) -> None:
         async def v2_reset_with_v1_response() -> StorageResponse:
             await self.endpoint.v2.reset.POST()
-            return await self.endpoint.GET()
+            return await self._get_storage()
 
         status = await v2_reset_with_v1_response()
         self.app.ui.block_input = False
@@ -17,13 +17,13 @@ import logging
 import os
 import shutil
 import tempfile
-from typing import Optional
+from typing import List, Optional
 
 from aiohttp import web
 
 from subiquity.client.controller import SubiquityTuiController
 from subiquity.common.api.server import make_server_at_path
-from subiquity.common.apidef import LinkAction, NetEventAPI
+from subiquity.common.apidef import LinkAction, LinkUpdate, NetEventAPI
 from subiquity.common.types import ErrorReportKind, PackageInstallState
 from subiquitycore.async_helpers import run_bg_task
 from subiquitycore.controllers.network import NetworkAnswersMixin
@@ -59,9 +59,7 @@ class NetworkController(SubiquityTuiController, NetworkAnswersMixin):
             )
         return resp
 
-    async def update_link_POST(self, act: LinkAction, info: NetDevInfo) -> None:
-        if self.view is None:
-            return
+    def _update_link(self, act: LinkAction, info: NetDevInfo) -> None:
         if act == LinkAction.NEW:
             self.view.new_link(info)
         if act == LinkAction.CHANGE:
@@ -69,6 +67,17 @@ class NetworkController(SubiquityTuiController, NetworkAnswersMixin):
         if act == LinkAction.DEL:
             self.view.del_link(info)
 
+    async def update_link_POST(self, act: LinkAction, info: NetDevInfo) -> None:
+        if self.view is None:
+            return
+        self._update_link(act, info)
+        self.view.request_redraw_if_visible()
+
+    async def update_links_POST(self, updates: List[LinkUpdate]) -> None:
+        if self.view is None:
+            return
+        for update in updates:
+            self._update_link(update.act, update.info)
         self.view.request_redraw_if_visible()
 
     async def route_watch_POST(self, has_default_route: bool) -> None:
@@ -15,45 +15,107 @@
 
 import asyncio
 import logging
-from typing import Optional
+import os
+from typing import List, Optional
 
 import aiohttp
 
 from subiquity.client.controller import SubiquityTuiController
-from subiquity.common.types import ApplicationState, ApplicationStatus, ShutdownMode
+from subiquity.common.types import (
+    ApplicationState,
+    ApplicationStatus,
+    InstallerEvent,
+    ShutdownMode,
+)
 from subiquity.ui.views.installprogress import InstallRunning, ProgressView
-from subiquitycore.async_helpers import run_bg_task
+from subiquitycore.async_helpers import run_bg_task, run_in_thread
 from subiquitycore.context import with_context
 
 log = logging.getLogger("subiquity.client.controllers.progress")
 
 
+class OutputLog:
+    """Write lines to a file without blocking the event loop.
+
+    Lines are queued and written in batches from a thread, so a burst of
+    output costs one write rather than one per line.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._pending: List[str] = []
+        self._fp = None
+        self._mode = "w"
+        self._task: Optional[asyncio.Task] = None
+
+    def write(self, line: str) -> None:
+        self._pending.append(line + "\n")
+        if self._task is None:
+            self._task = asyncio.create_task(self._write_pending())
+
+    async def _write_pending(self) -> None:
+        try:
+            while self._pending:
+                lines, self._pending = self._pending, []
+                await run_in_thread(self._write, lines)
+        finally:
+            self._task = None
+
+    def _write(self, lines: List[str]) -> None:
+        if self._fp is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._fp = open(self.path, self._mode)
+            # If output arrives after close(), add to what is already there.
+            self._mode = "a"
+        self._fp.writelines(lines)
+        self._fp.flush()
+
+    async def flush(self) -> None:
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._fp is not None:
+            fp, self._fp = self._fp, None
+            await run_in_thread(fp.close)
+
+
 class ProgressController(SubiquityTuiController):
     def __init__(self, app):
         super().__init__(app)
-        self.progress_view = ProgressView(self)
+        self.progress_view = ProgressView(
+            self,
+            max_event_lines=app.opts.max_event_lines,
+            max_log_lines=app.opts.max_output_lines,
+        )
         self.app_state = None
         self.has_nonreportable_error: Optional[bool] = None
         self.crash_report_ref = None
         self.answers = app.answers.get("InstallProgress", {})
+        # The progress view only keeps the most recent output, so keep all
+        # of it on disk too.
+        self.output_path = app.state_path("installer-output.log")
+        self.output = OutputLog(self.output_path)
 
-    def event(self, event):
-        if event["SUBIQUITY_EVENT_TYPE"] == "start":
+    def event(self, event: InstallerEvent):
+        if event.kind == "start":
             self.progress_view.event_start(
-                event["SUBIQUITY_CONTEXT_ID"],
-                event.get("SUBIQUITY_CONTEXT_PARENT_ID"),
-                event["MESSAGE"],
+                event.context_id,
+                event.context_parent_id,
+                event.message,
             )
-        elif event["SUBIQUITY_EVENT_TYPE"] == "finish":
-            self.progress_view.event_finish(event["SUBIQUITY_CONTEXT_ID"])
+        elif event.kind == "finish":
+            self.progress_view.event_finish(event.context_id)
         else:
-            event_type = event["SUBIQUITY_EVENT_TYPE"]
-            message = event["MESSAGE"]
-            self.progress_view.event_other(message, event_type)
+            self.progress_view.event_other(event.message, event.kind)
 
-    def log_line(self, event):
-        log_line = event["MESSAGE"]
-        self.progress_view.add_log_line(log_line)
+    def log_line(self, event: InstallerEvent):
+        self.output.write(event.message)
+        self.progress_view.add_log_line(event.message)
+
+    async def flush_output(self):
+        await self.output.flush()
 
     def cancel(self):
         pass
@@ -69,17 +131,14 @@ class ProgressController(SubiquityTuiController):
             await self.app.client.shutdown.POST(mode=ShutdownMode.REBOOT)
         except aiohttp.ClientError:
             pass
+        await self.output.close()
         self.app.exit()
 
     @with_context()
     async def _wait_status(self, context):
         install_running = None
         while True:
-            try:
-                app_status = await self.app.client.meta.status.GET(cur=self.app_state)
-            except aiohttp.ClientError:
-                await asyncio.sleep(1)
-                continue
+            app_status = await self.app.get_status(cur=self.app_state)
             self.app_state = app_status.state
             self.has_nonreportable_error = app_status.nonreportable_error is not None
 
@@ -105,6 +164,14 @@ class ProgressController(SubiquityTuiController):
                     self.app.remove_global_overlay(install_running)
                     install_running = None
 
+            if self.app_state in (
+                ApplicationState.DONE,
+                ApplicationState.ERROR,
+                ApplicationState.EXITED,
+            ):
+                # Nothing much is left to run, so let go of the file.
+                await self.output.close()
+
             if self.app_state == ApplicationState.DONE:
                 if self.answers.get("reboot", False):
                     self.click_reboot()
@@ -13,10 +13,12 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import tempfile
 import unittest
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, Mock, patch
 
-from subiquity.client.controllers.progress import ProgressController
+from subiquity.client.controllers.progress import OutputLog, ProgressController
 from subiquity.common.types import ApplicationState, ApplicationStatus
 from subiquitycore.tests.mocks import make_app
 
@@ -93,3 +95,33 @@ class TestProgressController(unittest.IsolatedAsyncioTestCase):
             self.controller._handle_error_state(status)
         self.controller.app.show_error_report.assert_not_called()
         self.controller.app.show_nonreportable_error.assert_not_called()
+
+
+class TestOutputLog(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        tdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tdir.cleanup)
+        self.path = os.path.join(tdir.name, "subdir", "output.log")
+        self.output = OutputLog(self.path)
+
+    def read(self):
+        with open(self.path) as fp:
+            return fp.read()
+
+    async def test_writes_in_batches(self):
+        with patch.object(self.output, "_write", wraps=self.output._write) as m:
+            for i in range(3):
+                self.output.write(f"line {i}")
+            await self.output.flush()
+        m.assert_called_once_with(["line 0\n", "line 1\n", "line 2\n"])
+        self.assertEqual("line 0\nline 1\nline 2\n", self.read())
+
+    async def test_close(self):
+        self.output.write("before")
+        await self.output.close()
+        self.assertIsNone(self.output._fp)
+        self.assertEqual("before\n", self.read())
+        # Late output is added to the file rather than replacing it.
+        self.output.write("after")
+        await self.output.close()
+        self.assertEqual("before\nafter\n", self.read())
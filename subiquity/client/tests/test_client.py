@@ -12,9 +12,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from unittest.mock import Mock
+import asyncio
+from unittest.mock import AsyncMock, Mock
 
 from subiquity.client.client import SubiquityClient
+from subiquity.common.types import ApplicationState, InstallerEvent
 from subiquitycore.tests import SubiTestCase
 
 
@@ -42,3 +44,36 @@ class TestClientVariantSupport(SubiTestCase):
             expected,
             "controllers changed unexpectedly during init",
         )
+
+
+class TestClientStatus(SubiTestCase):
+    async def asyncSetUp(self):
+        opts = Mock()
+        opts.dry_run = True
+        opts.output_base = self.tmp_dir()
+        opts.machine_config = "examples/machines/simple.json"
+        opts.answers = None
+        self.client = SubiquityClient(opts, None)
+        self.client.client = Mock()
+        self.client.client.meta.status.GET = AsyncMock()
+
+    async def test_get_status_waits_for_state_event(self):
+        GET = self.client.client.meta.status.GET
+        GET.return_value = Mock(state=ApplicationState.WAITING)
+        task = asyncio.create_task(self.client.get_status(cur=ApplicationState.WAITING))
+        await asyncio.sleep(0)
+        self.assertFalse(task.done())
+        GET.assert_called_once_with()
+
+        # Other events do not make the client fetch the status again.
+        self.client._server_event(InstallerEvent(seq=1, kind="info", message=""))
+        await asyncio.sleep(0)
+        GET.assert_called_once_with()
+
+        GET.return_value = Mock(state=ApplicationState.RUNNING)
+        self.client._server_event(
+            InstallerEvent(seq=2, kind="state", message="RUNNING")
+        )
+        status = await asyncio.wait_for(task, timeout=1)
+        self.assertEqual(ApplicationState.RUNNING, status.state)
+        self.assertEqual(2, GET.call_count)
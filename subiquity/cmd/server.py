@@ -116,6 +116,15 @@ def make_server_args_parser():
             "See examples/snaps/README.md for more."
         ),
     )
+    parser.add_argument(
+        "--snapd-socket",
+        action="store",
+        help=(
+            "Talk to the snapd listening on this socket, e.g. the simulator "
+            "in subiquity.server.snapd.simulator, instead of the one at "
+            "/run/snapd.socket. Implies --no-snaps-from-examples."
+        ),
+    )
     parser.add_argument(
         "--snap-section",
         action="store",
@@ -155,6 +164,16 @@ returned. """,
         dest="with_wlan_listener",
         default=True,
     )
+    parser.add_argument(
+        "--no-journal-events",
+        action="store_false",
+        dest="journal_events",
+        default=True,
+        help=(
+            "Do not also send installer events and command output to the "
+            "journal. Clients follow them through the meta/events API."
+        ),
+    )
     parser.add_argument(
         "--postinst-hooks-dir", default="/etc/subiquity/postinst.d", type=pathlib.Path
     )
@@ -208,7 +227,7 @@ def main():
             dr_cfg = DRConfig()
 
         if opts.snaps_from_examples is None:
-            opts.snaps_from_examples = True
+            opts.snaps_from_examples = opts.snapd_socket is None
         logdir = opts.output_base
         if opts.bootloader is None:
             opts.bootloader = "uefi"
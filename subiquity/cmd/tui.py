@@ -66,6 +66,18 @@ def make_client_args_parser():
         help="Run the installer in unicode mode.",
     )
     parser.add_argument("--screens", action="append", dest="screens", default=[])
+    parser.add_argument(
+        "--max-event-lines",
+        type=int,
+        default=1000,
+        help="how many install progress events to keep on screen",
+    )
+    parser.add_argument(
+        "--max-output-lines",
+        type=int,
+        default=5000,
+        help="how many lines of installer output to keep on screen",
+    )
     parser.add_argument("--answers")
     parser.add_argument("--server-pid")
     parser.add_argument(
@@ -16,6 +16,8 @@
 import enum
 from typing import List, Optional
 
+import attr
+
 from subiquity.common.api.defs import (
     Payload,
     allowed_before_start,
@@ -38,6 +40,8 @@ from subiquity.common.types import (
     DriversResponse,
     ErrorReportRef,
     IdentityData,
+    InstallerEvent,
+    IntegrityStatus,
     KeyboardSetting,
     KeyboardSetup,
     LiveSessionSSHInfo,
@@ -49,6 +53,7 @@ from subiquity.common.types import (
     NetworkStatus,
     OEMResponse,
     PackageInstallState,
+    ProfilerStatus,
     RefreshStatus,
     ShutdownMode,
     SnapInfo,
@@ -102,6 +107,13 @@ class API:
             def GET(cur: Optional[ApplicationState] = None) -> ApplicationStatus:
                 """Get the installer state."""
 
+        class events:
+            @allowed_before_start
+            def GET(after: int = 0, limit: int = 1000) -> List[InstallerEvent]:
+                """Get the events with a sequence number greater than after.
+
+                Block until there is at least one such event."""
+
         class mark_configured:
             def POST(endpoint_names: List[str]) -> None:
                 """Mark the controllers for endpoint_names as configured."""
@@ -149,6 +161,24 @@ class API:
             def GET() -> None:
                 """Requests to this method will fail with a HTTP 500."""
 
+    class debug:
+        """These endpoints only work in dry-run mode or when
+        subiquity-debug-api is on the kernel command line."""
+
+        class profiler:
+            def GET() -> ProfilerStatus:
+                """Get the state of the sampling profiler."""
+
+            def POST(
+                enable: bool, interval: float = 0.005, lag_threshold: float = 0.1
+            ) -> ProfilerStatus:
+                """Start or stop sampling the stacks of the server threads.
+
+                Stopping the profiler writes the samples, in the folded
+                format of flamegraph.pl, and the stacks of the callbacks
+                that blocked the event loop for more than lag_threshold
+                seconds to the log directory."""
+
     class refresh:
         def GET(wait: bool = False) -> RefreshStatus:
             """Get information about the snap refresh status.
@@ -277,8 +307,13 @@ class API:
 
     class storage:
         def GET(
-            wait: bool = False, use_cached_result: bool = False
-        ) -> StorageResponse: ...
+            wait: bool = False,
+            use_cached_result: bool = False,
+            config_etag: Optional[str] = None,
+            orig_config_etag: Optional[str] = None,
+        ) -> StorageResponse:
+            """config and orig_config are left out of the response if they
+            still match config_etag and orig_config_etag respectively."""
 
         def POST(config: Payload[list]): ...
 
@@ -311,9 +346,14 @@ class API:
             def GET(
                 wait: bool = False,
                 include_raid: bool = False,
-            ) -> StorageResponseV2: ...
+                since: Optional[str] = None,
+            ) -> StorageResponseV2:
+                """All the calls returning a StorageResponseV2 for the
+                current configuration accept since, the etag of a response
+                previously returned. If the server still knows about it, the
+                response only includes the disks that changed since then."""
 
-            def POST() -> StorageResponseV2: ...
+            def POST(since: Optional[str] = None) -> StorageResponseV2: ...
 
             class orig_config:
                 def GET() -> StorageResponseV2: ...
@@ -324,7 +364,7 @@ class API:
                 def POST(data: Payload[GuidedChoiceV2]) -> GuidedStorageResponseV2: ...
 
             class reset:
-                def POST() -> StorageResponseV2: ...
+                def POST(since: Optional[str] = None) -> StorageResponseV2: ...
 
             class ensure_transaction:
                 """This call will ensure that a transaction is initiated.
@@ -338,14 +378,18 @@ class API:
                 def POST() -> None: ...
 
             class reformat_disk:
-                def POST(data: Payload[ReformatDisk]) -> StorageResponseV2: ...
+                def POST(
+                    data: Payload[ReformatDisk], since: Optional[str] = None
+                ) -> StorageResponseV2: ...
 
             class add_boot_partition:
                 """Mark a given disk as bootable, which may cause a partition
                 to be added to the disk.  It is an error to call this for a
                 disk for which can_be_boot_device is False."""
 
-                def POST(disk_id: str) -> StorageResponseV2: ...
+                def POST(
+                    disk_id: str, since: Optional[str] = None
+                ) -> StorageResponseV2: ...
 
             class add_partition:
                 """required field format and mount, optional field size
@@ -358,14 +402,18 @@ class API:
                 format=None means an unformatted partition
                 """
 
-                def POST(data: Payload[AddPartitionV2]) -> StorageResponseV2: ...
+                def POST(
+                    data: Payload[AddPartitionV2], since: Optional[str] = None
+                ) -> StorageResponseV2: ...
 
             class delete_partition:
                 """required field number
                 It is an error to modify other Partition fields.
                 """
 
-                def POST(data: Payload[ModifyPartitionV2]) -> StorageResponseV2: ...
+                def POST(
+                    data: Payload[ModifyPartitionV2], since: Optional[str] = None
+                ) -> StorageResponseV2: ...
 
             class edit_partition:
                 """required field number
@@ -374,19 +422,21 @@ class API:
                 It is an error to modify other Partition fields.
                 """
 
-                def POST(data: Payload[ModifyPartitionV2]) -> StorageResponseV2: ...
+                def POST(
+                    data: Payload[ModifyPartitionV2], since: Optional[str] = None
+                ) -> StorageResponseV2: ...
 
             class volume_group:
-                def DELETE(id: str) -> StorageResponseV2:
+                def DELETE(id: str, since: Optional[str] = None) -> StorageResponseV2:
                     """Delete the VG specified by its ID. Any associated LV
                     will be deleted as well."""
 
             class logical_volume:
-                def DELETE(id: str) -> StorageResponseV2:
+                def DELETE(id: str, since: Optional[str] = None) -> StorageResponseV2:
                     """Delete the LV specified by its ID."""
 
             class raid:
-                def DELETE(id: str) -> StorageResponseV2:
+                def DELETE(id: str, since: Optional[str] = None) -> StorageResponseV2:
                     """Delete the Raid specified by its ID. Any associated
                     partition will be deleted as well."""
 
@@ -499,6 +549,14 @@ class API:
         @allowed_before_start
         def GET(wait=False) -> CasperMd5Results: ...
 
+        class status:
+            @allowed_before_start
+            def GET(wait: bool = False) -> IntegrityStatus:
+                """Progress of the check of the install media.
+
+                With wait=True, return when the next file has been checked
+                (or immediately if the check is over)."""
+
     class active_directory:
         def GET() -> Optional[AdConnectionInfo]: ...
 
@@ -539,6 +597,12 @@ class LinkAction(enum.Enum):
     DEL = enum.auto()
 
 
+@attr.s(auto_attribs=True)
+class LinkUpdate:
+    act: LinkAction
+    info: NetDevInfo
+
+
 @api
 class NetEventAPI:
     class wlan_support_install_finished:
@@ -547,6 +611,10 @@ class NetEventAPI:
     class update_link:
         def POST(act: LinkAction, info: Payload[NetDevInfo]) -> None: ...
 
+    class update_links:
+        def POST(updates: Payload[List[LinkUpdate]]) -> None:
+            """Several link updates at once, at most one per device."""
+
     class route_watch:
         def POST(has_default_route: bool) -> None: ...
 
@@ -15,11 +15,13 @@
 
 import asyncio
 import fcntl
+import hashlib
 import json
 import logging
 import os
 import re
 import sys
+import threading
 import time
 import traceback
 from typing import Optional
@@ -29,15 +31,50 @@ import apport.crashdb
 import apport.hookutils
 import attr
 import bson
+import problem_report
 import requests
 import urwid
 
 from subiquity.common.types import ErrorReportKind, ErrorReportRef, ErrorReportState
-from subiquitycore.async_helpers import run_in_thread, schedule_task
+from subiquitycore.async_helpers import run_bg_task, run_in_thread, schedule_task
 from subiquitycore.file_util import write_file
 
 log = logging.getLogger("subiquity.common.errorreport")
 
+# Attachments larger than this are truncated, keeping the end (which is
+# where the interesting part of a log usually is).
+MAX_ATTACHMENT_SIZE = 8 << 20
+# Attachments larger than this are stored compressed in the report.
+COMPRESS_THRESHOLD = 64 << 10
+
+
+def crash_signature(kind: ErrorReportKind, thing: str, exc=None) -> str:
+    """Return a string identifying "the same" crash.
+
+    Line numbers are deliberately not included so that the signature of a
+    crash does not depend on which exact line in a function raised.
+    """
+    parts = [kind.name, thing]
+    if exc is not None:
+        parts.append(type(exc).__qualname__)
+        for frame in traceback.extract_tb(exc.__traceback__):
+            parts.append("{}:{}".format(frame.filename, frame.name))
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _cap(data: bytes, limit: int) -> bytes:
+    if len(data) <= limit:
+        return data
+    return b"[%d bytes truncated]\n" % (len(data) - limit) + data[-limit:]
+
+
+def _text(value) -> str:
+    if isinstance(value, problem_report.CompressedValue):
+        value = value.get_value()
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", errors="replace")
+    return value
+
 
 @attr.s(eq=False)
 class Upload(metaclass=urwid.MetaSignals):
@@ -84,25 +121,26 @@ class ErrorReport(metaclass=urwid.MetaSignals):
 
     meta = attr.ib(default=attr.Factory(dict))
     uploader = attr.ib(default=None)
+    _meta_lock = attr.ib(init=False, factory=threading.Lock)
 
     @classmethod
-    def new(cls, reporter: "ErrorReporter", kind: ErrorReportKind):
+    def new(cls, reporter: "ErrorReporter", kind: ErrorReportKind, signature=None):
         base = "{:.9f}.{}".format(time.time(), kind.name.lower())
-        crash_file = open(os.path.join(reporter.crash_directory, base + ".crash"), "wb")
 
         pr = apport.Report("Bug")
         pr["CrashDB"] = repr(reporter.crashdb_spec)
 
-        r = cls(
+        # Nothing is written to disk here: the report and its metadata are
+        # written by add_info, off the event loop unless wait=True.
+        return cls(
             reporter=reporter,
             base=base,
             pr=pr,
-            file=crash_file,
+            file=None,
             state=ErrorReportState.INCOMPLETE,
             context=reporter.context.child(base),
+            meta={"kind": kind.name, "signature": signature},
         )
-        r.set_meta("kind", kind.name)
-        return r
 
     @classmethod
     def from_file(cls, reporter, fpath):
@@ -133,8 +171,9 @@ class ErrorReport(metaclass=urwid.MetaSignals):
             if not self.reporter.dry_run:
                 self.pr.add_hooks_info(None)
                 apport.hookutils.attach_hardware(self.pr)
-            self.pr["InstallerJournal"] = apport.hookutils.recent_syslog(
-                re.compile(".")
+            journal = apport.hookutils.recent_syslog(re.compile("."))
+            self.pr["InstallerJournal"] = self.reporter._bg_attachment_value(
+                _cap(journal.encode("utf-8", errors="replace"), MAX_ATTACHMENT_SIZE)
             )
             snap_name = os.environ.get("SNAP_NAME", "")
             if snap_name != "":
@@ -156,7 +195,7 @@ class ErrorReport(metaclass=urwid.MetaSignals):
             # here.  /proc/maps is very unlikely to be interesting for us
             # anyway.
             del self.pr["ProcMaps"]
-            self.pr.write(self._file)
+            self._bg_write()
 
         async def add_info():
             with self._context.child("add_info") as context:
@@ -168,8 +207,6 @@ class ErrorReport(metaclass=urwid.MetaSignals):
                 else:
                     context.description = "written to " + self.path
                     self.state = ErrorReportState.DONE
-                self._file.close()
-                self._file = None
                 urwid.emit_signal(self, "changed")
 
         if wait:
@@ -179,6 +216,16 @@ class ErrorReport(metaclass=urwid.MetaSignals):
         else:
             self._info_task = asyncio.create_task(add_info())
 
+    def _bg_write(self):
+        os.makedirs(self.reporter.crash_directory, exist_ok=True)
+        # Write to a name load_reports ignores and rename into place, so
+        # that a half-written report is never picked up.
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as fp:
+            self.pr.write(fp)
+        os.replace(tmp_path, self.path)
+        self._write_meta()
+
     async def load(self):
         with self._context.child("load"):
             # Load report from disk in background.
@@ -218,12 +265,12 @@ class ErrorReport(metaclass=urwid.MetaSignals):
                     "Traceback",
                     "ProcCpuinfoMinimal",
                 }:
-                    for_upload[k] = v
+                    for_upload[k] = _text(v)
                 else:
                     log.debug("dropping %s of length %s", k, len(v))
             if "CurtinLog" in self.pr:
                 logtail = []
-                for line in self.pr["CurtinLog"].splitlines():
+                for line in _text(self.pr["CurtinLog"]).splitlines():
                     logtail.append(line.strip())
                     while sum(map(len, logtail)) > 2048:
                         logtail.pop(0)
@@ -268,10 +315,21 @@ class ErrorReport(metaclass=urwid.MetaSignals):
     def path(self):
         return self._path_with_ext("crash")
 
+    def _write_meta(self):
+        # Metadata can be written from the event loop and from worker
+        # threads, so serialize the writes.
+        with self._meta_lock:
+            os.makedirs(self.reporter.crash_directory, exist_ok=True)
+            with open(self.meta_path, "w") as fp:
+                json.dump(self.meta, fp, indent=4)
+
     def set_meta(self, key, value):
         self.meta[key] = value
-        with open(self.meta_path, "w") as fp:
-            json.dump(self.meta, fp, indent=4)
+        self._write_meta()
+
+    def note_duplicate(self):
+        self.meta["duplicates"] = self.duplicates + 1
+        run_bg_task(run_in_thread(self._write_meta))
 
     def mark_seen(self):
         self.set_meta("seen", True)
@@ -290,6 +348,14 @@ class ErrorReport(metaclass=urwid.MetaSignals):
     def oops_id(self):
         return self.meta.get("oops-id")
 
+    @property
+    def signature(self):
+        return self.meta.get("signature")
+
+    @property
+    def duplicates(self):
+        return self.meta.get("duplicates", 0)
+
     @property
     def persistent_details(self):
         """Return fs-label, path-on-fs to report."""
@@ -339,6 +405,12 @@ class ErrorReporter(object):
         self.reports = []
         self._reports_by_base = {}
         self._reports_by_exception = {}
+        self._reports_by_signature = {}
+        # path -> ((inode, size, mtime), value) for files attached to
+        # reports, so that a file which has not changed is read (and
+        # compressed) only once however many reports it is attached to.
+        self._attachments = {}
+        self._attachments_lock = threading.Lock()
         self.crashdb_spec = {
             "impl": "launchpad",
             "project": "subiquity",
@@ -361,6 +433,9 @@ class ErrorReporter(object):
                 r = ErrorReport.from_file(self, path)
                 self.reports.append(r)
                 self._reports_by_base[base] = r
+                if r.signature is not None:
+                    # Reports are loaded newest first.
+                    self._reports_by_signature.setdefault(r.signature, r)
                 to_load.append(r)
         schedule_task(self._load_reports(to_load))
 
@@ -377,34 +452,73 @@ class ErrorReporter(object):
     def report_for_exc(self, exc):
         return self._reports_by_exception.get(exc)
 
+    def _bg_attachment_value(self, data: bytes):
+        if len(data) > COMPRESS_THRESHOLD:
+            return problem_report.CompressedValue(data)
+        return data.decode("utf-8", errors="replace").strip()
+
+    def _bg_read_attachment(self, path):
+        """Return the value to attach for the file at path, or None."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._attachments_lock:
+            cached = self._attachments.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with open(path, "rb") as fp:
+            if st.st_size > MAX_ATTACHMENT_SIZE:
+                fp.seek(st.st_size - MAX_ATTACHMENT_SIZE)
+                data = b"[%d bytes truncated]\n" % fp.tell() + fp.read()
+            else:
+                data = fp.read()
+        value = self._bg_attachment_value(data)
+        with self._attachments_lock:
+            self._attachments[path] = (key, value)
+        return value
+
     def make_apport_report(
         self, kind: ErrorReportKind, thing, *, wait=False, exc=None, **kw
     ) -> ErrorReport:
         if not self.dry_run and not os.path.exists("/cdrom/.disk/info"):
             return None
 
+        if exc is None:
+            exc = sys.exc_info()[1]
+        signature = crash_signature(kind, thing, exc)
+
+        if not wait:
+            # A crash that keeps happening (e.g. a probe that fails every
+            # time it is retried) gets one report, not one per occurrence.
+            # Reports written with wait=True are for crashes that end the
+            # process, and are always written in full.
+            report = self._reports_by_signature.get(signature)
+            if report is not None:
+                log.debug("crash is a duplicate of %s", report.base)
+                report.note_duplicate()
+                if exc is not None:
+                    self._reports_by_exception[exc] = report
+                return report
+
         log.debug("generating crash report")
-        os.makedirs(self.crash_directory, exist_ok=True)
 
         try:
-            report = ErrorReport.new(self, kind)
+            report = ErrorReport.new(self, kind, signature)
             self.reports.insert(0, report)
             self._reports_by_base[report.base] = report
+            self._reports_by_signature[signature] = report
         except Exception:
             log.exception("creating crash report failed")
             return
 
-        if exc is None:
-            exc = sys.exc_info()[1]
+        traceback_text = None
         if exc is not None:
             report.pr["Title"] = "{} crashed with {}".format(thing, type(exc).__name__)
             tb = traceback.TracebackException.from_exception(exc)
-            report.pr["Traceback"] = "".join(tb.format())
-            # Write out traceback for apport consumption
-            traceback_log = os.path.join(
-                self.root, "var/log/installer", "subiquity-traceback.txt"
-            )
-            write_file(traceback_log, "".join(tb.format()))
+            traceback_text = "".join(tb.format())
+            report.pr["Traceback"] = traceback_text
             self._reports_by_exception[exc] = report
         else:
             report.pr["Title"] = thing
@@ -415,10 +529,18 @@ class ErrorReporter(object):
         apport_data = self._apport_data.copy()
 
         def _bg_attach_hook():
+            if traceback_text is not None:
+                # Write out traceback for apport consumption
+                traceback_log = os.path.join(
+                    self.root, "var/log/installer", "subiquity-traceback.txt"
+                )
+                write_file(traceback_log, traceback_text)
             # Attach any stuff other parts of the code think we should know
             # about.
             for key, path in apport_files:
-                apport.hookutils.attach_file_if_exists(report.pr, path, key)
+                value = self._bg_read_attachment(path)
+                if value is not None:
+                    report.pr[key] = value
             for key, value in apport_data:
                 report.pr[key] = value
             for key, value in kw.items():
@@ -426,7 +548,6 @@ class ErrorReporter(object):
 
         report.add_info(_bg_attach_hook, wait)
 
-        # In the fullness of time we should do the signature thing here.
         return report
 
     def get(self, error_ref: ErrorReportRef) -> Optional[ErrorReport]:
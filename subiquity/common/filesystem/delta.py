@@ -0,0 +1,102 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Incremental StorageResponseV2 updates.
+
+Each StorageResponseV2 the server returns for its current model is tagged
+with an etag. A client that passes the etag of the last response it saw
+as the "since" argument of v2 calls gets back only the disks that changed
+since then, which apply_delta merges into its copy of that response. This
+keeps the size of a response to an edit proportional to what the edit
+changed rather than to the number of disks.
+"""
+
+import collections
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from subiquity.common.types.storage import StorageResponseV2
+
+
+def _digest(data: str) -> str:
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def config_etag(config: Any) -> str:
+    """Return an etag for a JSON-like value, such as a storage config."""
+    return _digest(json.dumps(config, sort_keys=True))
+
+
+class StorageDeltaTracker:
+    """Remembers the disks of the last few responses sent to clients."""
+
+    def __init__(self, history: int = 16):
+        self.history = history
+        self._snapshots: collections.OrderedDict[str, Dict[str, str]] = (
+            collections.OrderedDict()
+        )
+
+    def tag(
+        self, response: StorageResponseV2, since: Optional[str] = None
+    ) -> StorageResponseV2:
+        """Set the etag of response, and turn it into a delta against the
+        response tagged since if that is still known."""
+        # The attrs generated repr covers every field, recursively, and is
+        # much cheaper than serializing.
+        hashes = {disk.id: _digest(repr(disk)) for disk in response.disks}
+        etag = _digest("\n".join(f"{k}:{v}" for k, v in hashes.items()))
+        base = self._snapshots.get(since) if since is not None else None
+
+        self._snapshots[etag] = hashes
+        self._snapshots.move_to_end(etag)
+        while len(self._snapshots) > self.history:
+            self._snapshots.popitem(last=False)
+
+        response.etag = etag
+        if base is not None:
+            response.base_etag = since
+            response.disk_ids = list(hashes)
+            response.disks = [
+                disk for disk in response.disks if base.get(disk.id) != hashes[disk.id]
+            ]
+        return response
+
+
+def apply_delta(
+    current: Optional[StorageResponseV2], update: StorageResponseV2
+) -> StorageResponseV2:
+    """Merge update into current, in place, and return the result.
+
+    If update is a complete response it is returned as is. The disks that
+    did not change are kept as the same objects.
+    """
+    if update.base_etag is None:
+        return update
+    if current is None or current.etag != update.base_etag:
+        raise ValueError(
+            f"delta against {update.base_etag} does not apply to "
+            f"{current.etag if current is not None else None}"
+        )
+    by_id = {disk.id: disk for disk in current.disks}
+    by_id.update((disk.id, disk) for disk in update.disks)
+    current.disks[:] = [by_id[disk_id] for disk_id in update.disk_ids]
+    current.status = update.status
+    current.error_report = update.error_report
+    current.need_root = update.need_root
+    current.need_boot = update.need_boot
+    current.install_minimum_size = update.install_minimum_size
+    current.etag = update.etag
+    return current
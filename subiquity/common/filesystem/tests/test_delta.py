@@ -0,0 +1,122 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+import attr
+
+from subiquity.common.filesystem.delta import (
+    StorageDeltaTracker,
+    apply_delta,
+    config_etag,
+)
+from subiquity.common.types.storage import Disk, ProbeStatus, StorageResponseV2
+
+
+def make_disk(id, size=1 << 30):
+    return Disk(
+        id=id,
+        label=id,
+        type="local disk",
+        size=size,
+        usage_labels=[],
+        partitions=[],
+        ok_for_guided=True,
+        ptable="gpt",
+        preserve=True,
+        path=f"/dev/{id}",
+        boot_device=False,
+        can_be_boot_device=True,
+    )
+
+
+def make_response(*disks):
+    return StorageResponseV2(
+        status=ProbeStatus.DONE,
+        disks=[attr.evolve(disk) for disk in disks],
+        need_root=True,
+        need_boot=True,
+    )
+
+
+class TestStorageDelta(unittest.TestCase):
+    def setUp(self):
+        self.tracker = StorageDeltaTracker(history=2)
+        self.disks = [make_disk(f"disk-sd{c}") for c in "abc"]
+
+    def test_full_response(self):
+        resp = self.tracker.tag(make_response(*self.disks))
+        self.assertIsNotNone(resp.etag)
+        self.assertIsNone(resp.base_etag)
+        self.assertIsNone(resp.disk_ids)
+        self.assertEqual(3, len(resp.disks))
+
+    def test_same_disks_same_etag(self):
+        resp1 = self.tracker.tag(make_response(*self.disks))
+        resp2 = self.tracker.tag(make_response(*self.disks))
+        self.assertEqual(resp1.etag, resp2.etag)
+
+    def test_delta(self):
+        client = self.tracker.tag(make_response(*self.disks))
+        unchanged = client.disks[0]
+        self.disks[1] = attr.evolve(self.disks[1], ptable="msdos")
+        self.disks.append(make_disk("disk-sdd"))
+        resp = self.tracker.tag(make_response(*self.disks), since=client.etag)
+        self.assertEqual(client.etag, resp.base_etag)
+        self.assertEqual(["disk-sdb", "disk-sdd"], [d.id for d in resp.disks])
+        self.assertEqual([d.id for d in self.disks], resp.disk_ids)
+
+        merged = apply_delta(client, resp)
+        self.assertIs(client, merged)
+        self.assertEqual(self.disks, merged.disks)
+        self.assertIs(unchanged, merged.disks[0])
+        self.assertEqual(resp.etag, merged.etag)
+        self.assertEqual(self.tracker.tag(make_response(*self.disks)).etag, merged.etag)
+
+    def test_delta_removed_disk(self):
+        client = self.tracker.tag(make_response(*self.disks))
+        resp = self.tracker.tag(make_response(*self.disks[1:]), since=client.etag)
+        self.assertEqual([], resp.disks)
+        merged = apply_delta(client, resp)
+        self.assertEqual(self.disks[1:], merged.disks)
+
+    def test_unknown_since(self):
+        self.tracker.tag(make_response(*self.disks))
+        resp = self.tracker.tag(make_response(*self.disks), since="unknown")
+        self.assertIsNone(resp.base_etag)
+        self.assertEqual(3, len(resp.disks))
+
+    def test_history_expires(self):
+        old = self.tracker.tag(make_response(*self.disks))
+        for size in 1, 2:
+            self.disks[0] = attr.evolve(self.disks[0], size=size)
+            self.tracker.tag(make_response(*self.disks))
+        resp = self.tracker.tag(make_response(*self.disks), since=old.etag)
+        self.assertIsNone(resp.base_etag)
+
+    def test_apply_to_wrong_base(self):
+        client = self.tracker.tag(make_response(*self.disks))
+        resp = self.tracker.tag(make_response(*self.disks[1:]), since=client.etag)
+        with self.assertRaises(ValueError):
+            apply_delta(make_response(*self.disks), resp)
+        with self.assertRaises(ValueError):
+            apply_delta(None, resp)
+
+
+class TestConfigEtag(unittest.TestCase):
+    def test_config_etag(self):
+        config = [{"type": "disk", "id": "disk-sda", "ptable": "gpt"}]
+        self.assertEqual(config_etag(config), config_etag([dict(config[0])]))
+        self.assertNotEqual(config_etag(config), config_etag([]))
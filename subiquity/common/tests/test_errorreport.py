@@ -0,0 +1,110 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest.mock import Mock, patch
+
+import problem_report
+
+from subiquity.common import errorreport
+from subiquity.common.errorreport import ErrorReport, ErrorReporter, crash_signature
+from subiquity.common.types import ErrorReportKind
+from subiquitycore.tests import SubiTestCase
+
+
+def raise_error(msg):
+    raise RuntimeError(msg)
+
+
+def catch(func, *args):
+    try:
+        func(*args)
+    except Exception as exc:
+        return exc
+
+
+class TestCrashSignature(SubiTestCase):
+    def test_same_crash_same_signature(self):
+        exc1 = catch(raise_error, "one")
+        exc2 = catch(raise_error, "two")
+        kind = ErrorReportKind.BLOCK_PROBE_FAIL
+        self.assertEqual(
+            crash_signature(kind, "block probing", exc1),
+            crash_signature(kind, "block probing", exc2),
+        )
+
+    def test_different_crashes(self):
+        exc = catch(raise_error, "one")
+        kind = ErrorReportKind.BLOCK_PROBE_FAIL
+        sig = crash_signature(kind, "block probing", exc)
+        self.assertNotEqual(sig, crash_signature(kind, "disk probing", exc))
+        self.assertNotEqual(
+            sig, crash_signature(ErrorReportKind.UNKNOWN, "block probing", exc)
+        )
+        self.assertNotEqual(
+            sig, crash_signature(kind, "block probing", catch(int, "x"))
+        )
+
+
+class TestErrorReporter(SubiTestCase):
+    def setUp(self):
+        self.root = self.tmp_dir()
+        self.reporter = ErrorReporter(Mock(), dry_run=True, root=self.root)
+
+    @patch.object(ErrorReport, "add_info")
+    async def test_duplicate_reports(self, add_info):
+        kind = ErrorReportKind.BLOCK_PROBE_FAIL
+        exc1 = catch(raise_error, "one")
+        exc2 = catch(raise_error, "two")
+        report1 = self.reporter.make_apport_report(kind, "block probing", exc=exc1)
+        report2 = self.reporter.make_apport_report(kind, "block probing", exc=exc2)
+        self.assertIs(report1, report2)
+        self.assertEqual(1, report1.duplicates)
+        self.assertIs(report1, self.reporter.report_for_exc(exc2))
+        self.assertEqual([report1], self.reporter.reports)
+        add_info.assert_called_once()
+
+    @patch.object(ErrorReport, "add_info")
+    async def test_wait_reports_not_deduplicated(self, add_info):
+        kind = ErrorReportKind.UNKNOWN
+        exc = catch(raise_error, "one")
+        report1 = self.reporter.make_apport_report(kind, "unknown error", exc=exc)
+        report2 = self.reporter.make_apport_report(
+            kind, "unknown error", exc=exc, wait=True
+        )
+        self.assertIsNot(report1, report2)
+
+    async def test_attachment_shared(self):
+        path = self.tmp_path("probe-data.json")
+        with open(path, "w") as fp:
+            fp.write("{}\n")
+        value = self.reporter._bg_read_attachment(path)
+        self.assertEqual("{}", value)
+        with patch("builtins.open") as m_open:
+            self.assertIs(value, self.reporter._bg_read_attachment(path))
+        m_open.assert_not_called()
+
+    async def test_attachment_missing(self):
+        self.assertIsNone(self.reporter._bg_read_attachment("/does/not/exist"))
+
+    async def test_attachment_capped_and_compressed(self):
+        path = self.tmp_path("curtin-install.log")
+        with open(path, "wb") as fp:
+            fp.write(b"a" * 1000 + b"b" * 1000)
+        with patch.multiple(
+            errorreport, MAX_ATTACHMENT_SIZE=1000, COMPRESS_THRESHOLD=100
+        ):
+            value = self.reporter._bg_read_attachment(path)
+        self.assertIsInstance(value, problem_report.CompressedValue)
+        self.assertEqual(b"[1000 bytes truncated]\n" + b"b" * 1000, value.get_value())
@@ -111,6 +111,24 @@ class ApplicationStatus:
     event_syslog_id: str
 
 
+@attr.s(auto_attribs=True)
+class InstallerEvent:
+    """An event streamed to clients by the meta/events endpoint.
+
+    kind is one of the context event types ("start", "finish", "info",
+    "warning", "error") or "log" for a line of command output. seq
+    increases by one for every event the server publishes.
+    """
+
+    seq: int
+    kind: str
+    message: str
+    context_id: Optional[str] = None
+    context_parent_id: Optional[str] = None
+    context_name: Optional[str] = None
+    level: Optional[str] = None
+
+
 class PasswordKind(enum.Enum):
     NONE = enum.auto()
     KNOWN = enum.auto()
@@ -519,6 +537,18 @@ class CasperMd5Results(enum.Enum):
     SKIP = "skip"
 
 
+@attr.s(auto_attribs=True)
+class IntegrityStatus:
+    result: CasperMd5Results
+    files_total: int = 0
+    files_checked: int = 0
+    bytes_total: int = 0
+    bytes_checked: int = 0
+    # The file most recently checked, relative to the root of the media.
+    last_file: Optional[str] = None
+    checksum_mismatch: List[str] = attr.Factory(list)
+
+
 class MirrorCheckStatus(enum.Enum):
     OK = "OK"
     RUNNING = "RUNNING"
@@ -599,3 +629,22 @@ class AdJoinResult(enum.Enum):
     EMPTY_HOSTNAME = "Target hostname cannot be empty"
     PAM_ERROR = "Failed to update pam-auth"
     UNKNOWN = "Didn't attempt to join yet"
+
+
+@attr.s(auto_attribs=True)
+class LoopStall:
+    # Seconds since the profiler was started.
+    start: float
+    duration: float
+    # The stack of the event loop thread while it was blocked, as formatted
+    # by traceback.format_list.
+    stack: List[str]
+
+
+@attr.s(auto_attribs=True)
+class ProfilerStatus:
+    running: bool
+    samples: int = 0
+    stalls: List[LoopStall] = attr.Factory(list)
+    # The files written when the profiler was last stopped.
+    files: List[str] = attr.Factory(list)
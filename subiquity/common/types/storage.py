@@ -226,6 +226,10 @@ class StorageResponse:
     config: Optional[list] = None
     dasd: Optional[dict] = None
     storage_version: int = 1
+    # Identify config and orig_config. Either is left out (set to None) if
+    # the client passed its current etag for it to GET.
+    etag: Optional[str] = None
+    orig_config_etag: Optional[str] = None
 
 
 @attr.s(auto_attribs=True)
@@ -238,6 +242,13 @@ class StorageResponseV2:
     # if need_boot == True, there is not yet a boot partition
     need_boot: Optional[bool] = None
     install_minimum_size: Optional[int] = None
+    # Identifies the disks in this response. Pass it back as "since" to get
+    # a delta: base_etag is then set, disks only holds the disks that
+    # changed since base_etag and disk_ids lists the ids of all the disks,
+    # in order. See subiquity.common.filesystem.delta.
+    etag: Optional[str] = None
+    base_etag: Optional[str] = None
+    disk_ids: Optional[List[str]] = None
 
 
 class SizingPolicy(enum.Enum):
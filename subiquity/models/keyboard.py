@@ -13,15 +13,19 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import glob
+import json
 import logging
+import mmap
 import os
 import re
+from typing import Dict, List, Optional, Tuple
 
 import yaml
 
 from subiquity.common.resources import resource_path
 from subiquity.common.serialize import Serializer
-from subiquity.common.types import KeyboardLayout, KeyboardSetting
+from subiquity.common.types import KeyboardLayout, KeyboardSetting, KeyboardVariant
 
 log = logging.getLogger("subiquity.models.keyboard")
 
@@ -105,12 +109,9 @@ class KeyboardModel:
             )
 
         for layout, variant in zip(layout_tokens, variant_tokens):
-            kbd_layout = self.keyboard_list.layout_map.get(layout)
-            if kbd_layout is None:
+            if layout not in self.keyboard_list.layout_map:
                 raise ValueError(f'Unknown keyboard layout "{layout}"')
-            if not any(
-                kbd_variant.code == variant for kbd_variant in kbd_layout.variants
-            ):
+            if self.keyboard_list.lookup_variant(layout, variant) is None:
                 raise ValueError(
                     f'Unknown keyboard variant "{variant}" for layout "{layout}"'
                 )
@@ -155,18 +156,94 @@ class KeyboardModel:
         return ret
 
 
+# The per-language .jsonl files compiled into a single file, see
+# build_layout_index.
+LAYOUT_INDEX = "layouts.index"
+
+
+def build_layout_index(kbds_dir: str) -> str:
+    """Compile the kbds/<lang>.jsonl files into kbds/layouts.index.
+
+    The index starts with a line holding a JSON object mapping each
+    language to the (offset, length) of its layouts in the rest of the
+    file, which is one compact JSON array per language. This lets
+    KeyboardList read and decode a single language without looking at
+    the others.
+    """
+    chunks: Dict[str, bytes] = {}
+    for path in sorted(glob.glob(os.path.join(kbds_dir, "*.jsonl"))):
+        lang = os.path.basename(path)[: -len(".jsonl")]
+        with open(path) as fp:
+            rows = [json.loads(line) for line in fp if line.strip()]
+        chunks[lang] = json.dumps(
+            rows, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+    header = {}
+    offset = 0
+    for lang, chunk in chunks.items():
+        header[lang] = (offset, len(chunk))
+        offset += len(chunk)
+    outpath = os.path.join(kbds_dir, LAYOUT_INDEX)
+    with open(outpath, "wb") as out:
+        out.write(json.dumps(header, separators=(",", ":")).encode("utf-8"))
+        out.write(b"\n")
+        for chunk in chunks.values():
+            out.write(chunk)
+    return outpath
+
+
 class KeyboardList:
     def __init__(self):
         self._kbnames_dir = resource_path("kbds")
         self.serializer = Serializer(compact=True)
+        self._index: Optional[Dict[str, Tuple[int, int]]] = None
+        self._index_data: Optional[mmap.mmap] = None
+        self._index_start = 0
+        self._loaded: Dict[str, Tuple[List[KeyboardLayout], Dict]] = {}
+        self._variant_maps: Dict[str, Dict[str, Dict[str, KeyboardVariant]]] = {}
+        self._open_index()
         self._clear()
 
+    def _open_index(self):
+        path = os.path.join(self._kbnames_dir, LAYOUT_INDEX)
+        try:
+            fp = open(path, "rb")
+        except FileNotFoundError:
+            log.debug("no %s, reading per-language layout files", path)
+            return
+        with fp:
+            self._index = json.loads(fp.readline())
+            self._index_start = fp.tell()
+            self._index_data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
     def _file_for_lang(self, code):
         return os.path.join(self._kbnames_dir, code + ".jsonl")
 
     def _has_language(self, code):
+        if self._index is not None:
+            return code in self._index
         return os.path.exists(self._file_for_lang(code))
 
+    def _read_language(self, code) -> List[KeyboardLayout]:
+        if self._index is None:
+            with open(self._file_for_lang(code)) as kbdnames:
+                return [
+                    self.serializer.from_json(KeyboardLayout, line) for line in kbdnames
+                ]
+        offset, length = self._index[code]
+        start = self._index_start + offset
+        rows = json.loads(self._index_data[start : start + length])
+        # The rows are in the compact serialization of KeyboardLayout, which
+        # is simple enough to build the objects directly.
+        return [
+            KeyboardLayout(
+                code=layout_code,
+                name=layout_name,
+                variants=[KeyboardVariant(code=c, name=n) for c, n in variants],
+            )
+            for layout_code, layout_name, variants in rows
+        ]
+
     def load_language(self, code):
         if "." in code:
             code = code.split(".")[0]
@@ -180,15 +257,34 @@ class KeyboardList:
 
         self._clear()
 
-        with open(self._file_for_lang(code)) as kbdnames:
-            self.layouts = []
-            self.layout_map = {}
-            for line in kbdnames:
-                kbd_layout = self.serializer.from_json(KeyboardLayout, line)
-                self.layouts.append(kbd_layout)
-                self.layout_map[kbd_layout.code] = kbd_layout
+        # Languages are kept once loaded, so switching back and forth
+        # between languages on the keyboard screen does not read anything.
+        if code not in self._loaded:
+            layouts = self._read_language(code)
+            self._loaded[code] = (
+                layouts,
+                {kbd_layout.code: kbd_layout for kbd_layout in layouts},
+            )
+        self.layouts, self.layout_map = self._loaded[code]
         self.current_lang = code
 
+    def lookup_variant(
+        self, layout_code: str, variant_code: str
+    ) -> Optional[KeyboardVariant]:
+        """Return the variant of the given layout, or None if there is none."""
+        if self.current_lang is None:
+            return None
+        variant_map = self._variant_maps.setdefault(self.current_lang, {})
+        variants = variant_map.get(layout_code)
+        if variants is None:
+            kbd_layout = self.layout_map.get(layout_code)
+            if kbd_layout is None:
+                return None
+            variants = variant_map[layout_code] = {
+                variant.code: variant for variant in kbd_layout.variants
+            }
+        return variants.get(variant_code)
+
     def _clear(self):
         self.current_lang = None
         self.layouts = []
@@ -13,8 +13,17 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import shutil
+from unittest import mock
+
 from subiquity.common.types import KeyboardSetting
-from subiquity.models.keyboard import InconsistentMultiLayoutError, KeyboardModel
+from subiquity.models.keyboard import (
+    InconsistentMultiLayoutError,
+    KeyboardList,
+    KeyboardModel,
+    build_layout_index,
+)
 from subiquitycore.tests import SubiTestCase
 from subiquitycore.tests.parameterized import parameterized
 
@@ -97,3 +106,60 @@ aa_BB.UTF-8:
         actual = self.model.load_layout_suggestions(data)
         expected = {"aa_BB.UTF-8": KeyboardSetting(layout="aa", variant="cc")}
         self.assertEqual(expected, actual)
+
+
+class TestKeyboardList(SubiTestCase):
+    def setUp(self):
+        self.kbds = self.tmp_dir()
+        for lang in "C", "fr", "ja":
+            shutil.copy(os.path.join("kbds", lang + ".jsonl"), self.kbds)
+
+    def make_list(self):
+        with mock.patch(
+            "subiquity.models.keyboard.resource_path", return_value=self.kbds
+        ):
+            return KeyboardList()
+
+    def test_index_matches_jsonl(self):
+        from_jsonl = self.make_list()
+        build_layout_index(self.kbds)
+        from_index = self.make_list()
+        self.assertIsNone(from_jsonl._index)
+        self.assertIsNotNone(from_index._index)
+        for lang in "C", "fr", "ja":
+            from_jsonl.load_language(lang)
+            from_index.load_language(lang)
+            self.assertEqual(from_jsonl.layouts, from_index.layouts)
+            self.assertEqual(from_jsonl.layout_map, from_index.layout_map)
+
+    @parameterized.expand(
+        [
+            ["fr_FR.UTF-8", "fr"],
+            ["ja", "ja"],
+            ["de_DE.UTF-8", "C"],
+        ]
+    )
+    def test_load_language_fallback(self, lang, expected):
+        build_layout_index(self.kbds)
+        kbd_list = self.make_list()
+        kbd_list.load_language(lang)
+        self.assertEqual(expected, kbd_list.current_lang)
+
+    def test_languages_cached(self):
+        build_layout_index(self.kbds)
+        kbd_list = self.make_list()
+        kbd_list.load_language("fr")
+        fr_layouts = kbd_list.layouts
+        kbd_list.load_language("C")
+        with mock.patch.object(kbd_list, "_read_language") as m_read:
+            kbd_list.load_language("fr")
+        m_read.assert_not_called()
+        self.assertIs(fr_layouts, kbd_list.layouts)
+
+    def test_lookup_variant(self):
+        kbd_list = self.make_list()
+        kbd_list.load_language("C")
+        self.assertEqual("intl", kbd_list.lookup_variant("us", "intl").code)
+        self.assertEqual("", kbd_list.lookup_variant("us", "").code)
+        self.assertIsNone(kbd_list.lookup_variant("us", "zz"))
+        self.assertIsNone(kbd_list.lookup_variant("zz", ""))
@@ -16,8 +16,10 @@
 import asyncio
 import contextlib
 import enum
+import hashlib
 import io
 import logging
+import os
 import pathlib
 import random
 import re
@@ -67,6 +69,31 @@ def get_index_targets() -> List[str]:
     return [key for key in targets if key.count("::") == 3]
 
 
+# The apt state that apt-get update produces for the pool, relative to the
+# root of the install tree. It only depends on the contents of the pool
+# (and on the sources line pointing at it), so it is kept and reused.
+POOL_APT_STATE = [
+    "var/lib/apt/lists",
+    "var/cache/apt/pkgcache.bin",
+    "var/cache/apt/srcpkgcache.bin",
+]
+
+
+def pool_lists_key(pool: str, codename: str, sources: str) -> Optional[str]:
+    """Return the key under which the apt state of the pool is cached, or
+    None if the pool has no Release file to tell its contents by."""
+    for name in "InRelease", "Release":
+        try:
+            with open(os.path.join(pool, "dists", codename, name), "rb") as fp:
+                release = fp.read()
+        except FileNotFoundError:
+            continue
+        h = hashlib.sha256(sources.encode("utf-8"))
+        h.update(release)
+        return h.hexdigest()
+    return None
+
+
 def apt_sourceparts_files(mp: Mountpoint) -> List[str]:
     # Return the relative path of the files from
     # mp("etc/apt/sources.list.d") that apt will read.
@@ -97,7 +124,11 @@ class AptConfigurer:
     # 3. writing "deb file:///cdrom $(lsb_release -sc) main restricted"
     #    to /etc/apt/sources.list.
     #
-    # 4. running "apt-get update" in the new overlay.
+    # 4. running "apt-get update" in the new overlay. When offline, only the
+    #    pool is configured and the resulting apt state is kept, keyed by
+    #    the Release file of the pool, so that it can be copied in rather
+    #    than regenerated the next time. A copy can also be provided on
+    #    the ISO under prebuilt_lists_dir.
     #
     # When the install is done the deconfigure method makes the installed
     # system's apt state look as if the pool had never been configured. So
@@ -114,6 +145,9 @@ class AptConfigurer:
     #    system, or if it is not, just copy /var/lib/apt/lists from the
     #    'configured_tree' overlay.
 
+    pool = "/cdrom"
+    prebuilt_lists_dir = "/cdrom/casper/apt-lists"
+
     def __init__(self, app, mounter: Mounter, source_handler: AbstractSourceHandler):
         self.app = app
         self.mounter = mounter
@@ -123,6 +157,14 @@ class AptConfigurer:
         self.install_tree: Optional[OverlayMountpoint] = None
         self.install_mount = None
 
+    def pool_lists_dirs(self) -> List[pathlib.Path]:
+        """Return the directories to look for a copy of the apt state of the
+        pool in. The last one is where it gets saved."""
+        return [
+            pathlib.Path(self.prebuilt_lists_dir),
+            pathlib.Path(self.app.root, "var/cache/subiquity/apt-lists"),
+        ]
+
     @property
     def source_path(self):
         if self._source_path is None:
@@ -144,6 +186,14 @@ class AptConfigurer:
         return {"apt": cfg}
 
     async def apply_apt_config(self, context, final: bool):
+        if self.configured_tree is not None and self.install_tree is None:
+            # Mirror testing applies the configuration again for each
+            # candidate; do not leave the previous overlays behind.
+            try:
+                await self.mounter.teardown_overlay(self.configured_tree)
+            except OverlayCleanupError:
+                # Mounter.cleanup() will try again.
+                log.exception("failed to tear down previous apt configuration")
         self.configured_tree = await self.mounter.setup_overlay([self.source_path])
 
         config_location = pathlib.Path(self.app.root).joinpath(
@@ -257,17 +307,20 @@ class AptConfigurer:
 
         codename = lsb_release(dry_run=self.app.opts.dry_run)["codename"]
 
-        write_file(
-            self.install_tree.p("etc/apt/sources.list"),
-            f"deb [check-date=no] file:///cdrom {codename} main restricted\n",
-            mode=0o644,
-        )
+        sources = f"deb [check-date=no] file:///cdrom {codename} main restricted\n"
+        write_file(self.install_tree.p("etc/apt/sources.list"), sources, mode=0o644)
 
         # workaround LP: #2105480 and many many many like it
         apt_lists = self.install_tree.pp("var/lib/apt/lists")
         if apt_lists.exists():
             shutil.rmtree(str(apt_lists))
 
+        key = None
+        if not self.app.base_model.network.has_network:
+            key = pool_lists_key(self.pool, codename, sources)
+        if key is not None and await self._restore_pool_lists(key):
+            return self.install_tree.p()
+
         await run_curtin_command(
             self.app,
             context,
@@ -280,34 +333,59 @@ class AptConfigurer:
             private_mounts=True,
         )
 
+        if key is not None:
+            await self._save_pool_lists(key)
+
         return self.install_tree.p()
 
+    async def _restore_pool_lists(self, key: str) -> bool:
+        for lists_dir in self.pool_lists_dirs():
+            saved = lists_dir / key
+            if not saved.is_dir():
+                continue
+            log.debug("copying apt state of the pool from %s", saved)
+            # Copying with -a preserves the mtimes, which apt checks before
+            # trusting pkgcache.bin.
+            await self.app.command_runner.run(
+                ["cp", "-aT", str(saved), self.install_tree.p()]
+            )
+            return True
+        return False
+
+    async def _save_pool_lists(self, key: str) -> None:
+        lists_dir = self.pool_lists_dirs()[-1]
+        saved = lists_dir / key
+        if saved.exists():
+            return
+        tmp = lists_dir / f".{key}.tmp"
+        try:
+            shutil.rmtree(tmp, ignore_errors=True)
+            for relpath in POOL_APT_STATE:
+                if not self.install_tree.pp(relpath).exists():
+                    continue
+                dest = tmp / relpath
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                await self.app.command_runner.run(
+                    ["cp", "-a", self.install_tree.p(relpath), str(dest)]
+                )
+            tmp.rename(saved)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            log.warning("could not save apt state of the pool: %r", exc)
+
     @contextlib.asynccontextmanager
     async def overlay(self):
-        overlay = await self.mounter.setup_overlay(
-            [
-                self.source_path,
-                self.configured_tree.upperdir,
-                self.install_tree.upperdir,
-            ]
-        )
-        try:
+        """Use a writable overlay of the install tree. It is not used
+        concurrently by anyone else but may be reused afterwards."""
+        lowers = [
+            self.source_path,
+            self.configured_tree.upperdir,
+            self.install_tree.upperdir,
+        ]
+        async with self.mounter.pooled_overlay(lowers) as overlay:
             yield overlay
-        finally:
-            # TODO self.unmount expects a Mountpoint object. Unfortunately, the
-            # one we created in setup_overlay was discarded and replaced by an
-            # OverlayMountPoint object instead. Here we re-create a new
-            # Mountpoint object and (thanks to attr.s) make sure that it
-            # compares equal to the one we discarded earlier.
-            # But really, there should be better ways to handle this.
-            try:
-                await self.mounter.unmount(Mountpoint(mountpoint=overlay.mountpoint))
-            except subprocess.CalledProcessError as exc:
-                raise OverlayCleanupError from exc
 
     async def cleanup(self):
-        # FIXME disabled until we can sort out umount
-        # await self.mounter.cleanup()
+        await self.mounter.cleanup()
         if self._source_path is not None:
             self.source_handler.cleanup()
             self._source_path = None
@@ -380,7 +458,9 @@ class DryRunAptConfigurer(AptConfigurer):
 
     @contextlib.asynccontextmanager
     async def overlay(self):
-        yield await self.mounter.setup_overlay([self.install_tree.mountpoint])
+        lowers = [self.install_tree.mountpoint]
+        async with self.mounter.pooled_overlay(lowers) as overlay:
+            yield overlay
 
     async def deconfigure(self, context, target):
         await self.cleanup()
@@ -13,7 +13,10 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import logging
-from typing import Optional
+from typing import Any, Optional
+
+import jsonschema
+from jsonschema.exceptions import best_match
 
 from subiquity.server.nonreportable import NonReportableException
 
@@ -33,3 +36,36 @@ class AutoinstallValidationError(AutoinstallError):
         self.message = f"Malformed autoinstall in {owner!r} section"
         self.owner = owner
         super().__init__(self.message, details=details)
+
+
+# Compiled validators, keyed by the id() of the schema they were built from.
+# The schema itself is kept alongside the validator so that an id() reused by
+# a different object after garbage collection is not mistaken for a hit.
+_validators: dict[int, tuple[Any, jsonschema.protocols.Validator]] = {}
+
+
+def get_validator(schema: Any) -> jsonschema.protocols.Validator:
+    """Return a validator for schema, compiling and caching it on first use.
+
+    Autoinstall schemas are class attributes that are not rebuilt at runtime,
+    so checking the schema and selecting a validator class only needs to
+    happen once per schema object rather than on every validation.
+    """
+    cached = _validators.get(id(schema))
+    if cached is not None and cached[0] is schema:
+        return cached[1]
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    validator = cls(schema)
+    _validators[id(schema)] = (schema, validator)
+    return validator
+
+
+def validate_with_schema(instance: Any, schema: Any) -> None:
+    """Drop-in replacement for jsonschema.validate using cached validators.
+
+    Raises the same "best match" ValidationError jsonschema.validate would.
+    """
+    error = best_match(get_validator(schema).iter_errors(instance))
+    if error is not None:
+        raise error
@@ -13,16 +13,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import json
 import logging
-import os
 from typing import Any, Optional
 
-import jsonschema
 from jsonschema.exceptions import ValidationError
 
 from subiquity.common.api.server import bind
-from subiquity.server.autoinstall import AutoinstallValidationError
+from subiquity.server.autoinstall import (
+    AutoinstallValidationError,
+    validate_with_schema,
+)
 from subiquity.server.types import InstallerChannels
 from subiquitycore.context import with_context
 from subiquitycore.controller import BaseController
@@ -59,7 +59,7 @@ class SubiquityController(BaseController):
 
     def validate_autoinstall(self, ai_data: dict) -> None:
         try:
-            jsonschema.validate(ai_data, self.autoinstall_schema)
+            validate_with_schema(ai_data, self.autoinstall_schema)
 
         except ValidationError as original_exception:
             section = self.autoinstall_key
@@ -160,19 +160,16 @@ class SubiquityController(BaseController):
 
     async def configured(self):
         """Let the world know that this controller's model is now configured."""
-        with open(self.app.state_path("states", self.name), "w") as fp:
-            json.dump(self.serialize(), fp)
+        self.app.state_store.save(self.name, self.serialize())
         if self.model_name is not None:
             await self.app.hub.abroadcast(
                 (InstallerChannels.CONFIGURED, self.model_name)
             )
 
     def load_state(self):
-        state_path = self.app.state_path("states", self.name)
-        if not os.path.exists(state_path):
+        if self.name not in self.app.state_store:
             return
-        with open(state_path) as fp:
-            self.deserialize(json.load(fp))
+        self.deserialize(self.app.state_store.get(self.name))
 
     def deserialize(self, state):
         pass
@@ -16,14 +16,15 @@
 import asyncio
 import os
 import shlex
+import subprocess
 from typing import List, Sequence, Union
 
 import attr
-from systemd import journal
 
 from subiquity.server.controller import NonInteractiveController
+from subiquity.server.runner import forward_output
 from subiquitycore.context import with_context
-from subiquitycore.utils import arun_command
+from subiquitycore.utils import arun_command, astart_command
 
 
 @attr.s(auto_attribs=True)
@@ -79,17 +80,33 @@ class CmdListController(NonInteractiveController):
             with context.child("command_{}".format(i), desc):
                 args = cmd.as_args_list()
                 if self.syslog_id:
-                    journal.send("  running " + desc, SYSLOG_IDENTIFIER=self.syslog_id)
-                    args = [
-                        "systemd-cat",
-                        "--level-prefix=false",
-                        "--identifier=" + self.syslog_id,
-                    ] + args
-                await arun_command(
-                    args, env=env, stdin=None, stdout=None, stderr=None, check=cmd.check
-                )
+                    await self._run_logged(args, desc, env, cmd.check)
+                else:
+                    await arun_command(
+                        args,
+                        env=env,
+                        stdin=None,
+                        stdout=None,
+                        stderr=None,
+                        check=cmd.check,
+                    )
         self.run_event.set()
 
+    async def _run_logged(self, args, desc, env, check):
+        """Run args, publishing its output under syslog_id."""
+
+        def output(line):
+            self.app.publish_log_line(line, self.syslog_id)
+
+        output("  running " + desc)
+        proc = await astart_command(
+            args, env=env, stdin=None, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        await forward_output(proc.stdout, output)
+        returncode = await proc.wait()
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(returncode, args)
+
 
 class EarlyController(CmdListController):
     autoinstall_key = "early-commands"
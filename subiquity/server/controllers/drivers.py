@@ -19,7 +19,6 @@ from typing import List, Optional
 
 from subiquity.common.apidef import API
 from subiquity.common.types import DriversPayload, DriversResponse
-from subiquity.server.apt import OverlayCleanupError
 from subiquity.server.controller import SubiquityController
 from subiquity.server.controllers.source import SEARCH_DRIVERS_AUTOINSTALL_DEFAULT
 from subiquity.server.types import InstallerChannels
@@ -53,6 +52,9 @@ class DriversController(SubiquityController):
 
         self._list_drivers_task: Optional[asyncio.Task] = None
         self.list_drivers_done_event = asyncio.Event()
+        # Unlike list_drivers_done_event, only set once ubuntu-drivers has
+        # confirmed the list found from the modalias index.
+        self.drivers_confirmed_event = asyncio.Event()
         self.configured_event = asyncio.Event()
 
         # None means that the list has not (yet) been retrieved whereas an
@@ -91,6 +93,7 @@ class DriversController(SubiquityController):
 
         self.drivers = None
         self.list_drivers_done_event.clear()
+        self.drivers_confirmed_event.clear()
         if self._list_drivers_task is not None:
             self._list_drivers_task.cancel()
 
@@ -99,6 +102,20 @@ class DriversController(SubiquityController):
 
     @with_context()
     async def _list_drivers(self, context):
+        # Matching the devices of the system against the modalias index of
+        # the pool gives a list of drivers long before we can run
+        # ubuntu-drivers in an overlay. The run below then only confirms
+        # (or corrects) that list. An empty list is not published early:
+        # the client stops looking once it has an answer, so drivers that
+        # only ubuntu-drivers finds would never be offered.
+        early_drivers = None
+        if self.app.controllers.Source.model.search_drivers:
+            with context.child("early_list_drivers"):
+                early_drivers = await self.ubuntu_drivers.early_list_drivers()
+            if early_drivers:
+                log.debug("Drivers found from the modalias index: %s", early_drivers)
+                self.drivers = early_drivers
+                self.list_drivers_done_event.set()
         with context.child("wait_apt"):
             await self._wait_apt.wait()
         # The APT_CONFIGURED event (which unblocks _wait_apt.wait) is sent
@@ -108,26 +125,35 @@ class DriversController(SubiquityController):
         if not self.app.controllers.Source.model.search_drivers:
             self.drivers = []
             self.list_drivers_done_event.set()
+            self.drivers_confirmed_event.set()
             return
         apt = self.app.controllers.Mirror.final_apt_configurer
-        try:
-            async with apt.overlay() as d:
-                try:
-                    # Make sure ubuntu-drivers is available.
-                    await self.ubuntu_drivers.ensure_cmd_exists(d.mountpoint)
-                except CommandNotFoundError:
-                    self.drivers = []
-                else:
-                    self.drivers = await self.ubuntu_drivers.list_drivers(
-                        root_dir=d.mountpoint, context=context
-                    )
-        except OverlayCleanupError:
-            log.exception("Failed to cleanup overlay. Continuing anyway.")
+        async with apt.overlay() as d:
+            try:
+                # Make sure ubuntu-drivers is available.
+                await self.ubuntu_drivers.ensure_cmd_exists(d.mountpoint)
+            except CommandNotFoundError:
+                self.drivers = []
+            else:
+                self.drivers = await self.ubuntu_drivers.list_drivers(
+                    root_dir=d.mountpoint, context=context
+                )
+        if early_drivers and self.drivers != early_drivers:
+            log.warning(
+                "ubuntu-drivers recommends %s rather than %s from the modalias index",
+                self.drivers,
+                early_drivers,
+            )
         self.list_drivers_done_event.set()
+        self.drivers_confirmed_event.set()
         log.debug("Available drivers to install: %s", self.drivers)
 
     async def _send_drivers_decided(self):
-        await self.list_drivers_done_event.wait()
+        # The list of drivers can be known before APT is configured but the
+        # source can still change until then.
+        await self._wait_apt.wait()
+        # Not the early list: the kernel is chosen from what is decided here.
+        await self.drivers_confirmed_event.wait()
         if self.drivers:
             # If there are drivers, we need to wait until all
             # postinstall models are configured before we can be sure
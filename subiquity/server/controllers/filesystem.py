@@ -36,7 +36,7 @@ from subiquity.common.api.defs import Payload, api, path_parameter
 from subiquity.common.api.recoverable_error import RecoverableError
 from subiquity.common.apidef import API
 from subiquity.common.errorreport import ErrorReport, ErrorReportKind
-from subiquity.common.filesystem import boot, gaps, labels, sizes
+from subiquity.common.filesystem import boot, delta, gaps, labels, sizes
 from subiquity.common.filesystem.actions import DeviceAction
 from subiquity.common.filesystem.manipulator import FilesystemManipulator
 from subiquity.common.filesystem.spec import FileSystemSpec, PartitionSpec, VolGroupSpec
@@ -336,6 +336,9 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
         self.queued_probe_data: Optional[Dict[str, Any]] = None
         self.reset_partition_only: bool = False
 
+        self._v2_deltas = delta.StorageDeltaTracker()
+        self._orig_config_etag_cache: Optional[tuple[Optional[list], str]] = None
+
         # If needed, this can be moved outside of the storage/filesystem stuff.
         self._probe_firmware_task = SingleInstanceTask(self._probe_firmware)
 
@@ -886,25 +889,53 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
         else:
             return None
 
-    def _done_response(self):
-        return StorageResponse(
+    def _orig_config_etag(self) -> str:
+        # The original config only changes when probe data is loaded, which
+        # replaces the list, so only hash it again when that happens.
+        orig_config = self.model._orig_config
+        cache = self._orig_config_etag_cache
+        if cache is None or cache[0] is not orig_config:
+            cache = self._orig_config_etag_cache = (
+                orig_config,
+                delta.config_etag(orig_config),
+            )
+        return cache[1]
+
+    def _done_response(
+        self,
+        config_etag: Optional[str] = None,
+        orig_config_etag: Optional[str] = None,
+    ):
+        config = self.model._render_actions(mode=ActionRenderMode.FOR_API)
+        resp = StorageResponse(
             status=ProbeStatus.DONE,
             bootloader=self.model.bootloader,
             error_report=self.full_probe_error(),
             orig_config=self.model._orig_config,
-            config=self.model._render_actions(mode=ActionRenderMode.FOR_API),
+            config=config,
             dasd=self.model._probe_data.get("dasd", {}),
             storage_version=self.model.storage_version,
+            etag=delta.config_etag(config),
+            orig_config_etag=self._orig_config_etag(),
         )
+        if config_etag is not None and config_etag == resp.etag:
+            resp.config = None
+        if orig_config_etag is not None and orig_config_etag == resp.orig_config_etag:
+            resp.orig_config = None
+        return resp
 
     async def GET(
-        self, wait: bool = False, use_cached_result: bool = False
+        self,
+        wait: bool = False,
+        use_cached_result: bool = False,
+        config_etag: Optional[str] = None,
+        orig_config_etag: Optional[str] = None,
     ) -> StorageResponse:
         if not use_cached_result:
             probe_resp = await self._probe_response(wait, StorageResponse)
             if probe_resp is not None:
                 return probe_resp
-        return self._done_response()
+        return self._done_response(config_etag, orig_config_etag)
 
     async def POST(self, config: list):
         log.debug(config)
@@ -1173,7 +1204,7 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
         log.debug(f"suggested install minimum size: {humanize_size(install_min)}")
         return install_min
 
-    async def get_v2_storage_response(self, model, wait, include_raid):
+    async def get_v2_storage_response(self, model, wait, include_raid, since=None):
         probe_resp = await self._probe_response(wait, StorageResponseV2)
         if probe_resp is not None:
             return probe_resp
@@ -1182,13 +1213,16 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
         else:
             disks = model._all(type="disk")
         minsize = self.calculate_suggested_install_min()
-        return StorageResponseV2(
+        resp = StorageResponseV2(
             status=ProbeStatus.DONE,
             disks=[labels.for_client(d) for d in disks],
             need_root=not model.is_root_mounted(),
             need_boot=model.needs_bootloader_partition(),
             install_minimum_size=minsize,
         )
+        if model is self.model:
+            self._v2_deltas.tag(resp, since)
+        return resp
 
     async def generate_recovery_key_GET(self) -> str:
         return self.model.generate_recovery_key()
@@ -1210,18 +1244,19 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
         self,
         wait: bool = False,
         include_raid: bool = False,
+        since: Optional[str] = None,
     ) -> StorageResponseV2:
-        return await self.get_v2_storage_response(self.model, wait, include_raid)
+        return await self.get_v2_storage_response(self.model, wait, include_raid, since)
 
-    async def v2_POST(self) -> StorageResponseV2:
+    async def v2_POST(self, since: Optional[str] = None) -> StorageResponseV2:
         await self.configured()
-        return await self.v2_GET()
+        return await self.v2_GET(since=since)
 
     async def v2_orig_config_GET(self) -> StorageResponseV2:
         model = self.model.get_orig_model()
         return await self.get_v2_storage_response(model, False, False)
 
-    async def v2_reset_POST(self) -> StorageResponseV2:
+    async def v2_reset_POST(self, since: Optional[str] = None) -> StorageResponseV2:
         log.info("Resetting Filesystem model")
         # From the API standpoint, it seems sound to set locked_probe_data back
         # to False after a reset. But in practise, v2_reset_POST can be called
@@ -1234,7 +1269,7 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
             self.queued_probe_data = None
         else:
             self.model.reset()
-        return await self.v2_GET()
+        return await self.v2_GET(since=since)
 
     async def v2_ensure_transaction_POST(self) -> None:
         self.locked_probe_data = True
@@ -1499,12 +1534,16 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
             await self.configured()
         return await self.v2_guided_GET()
 
-    async def v2_reformat_disk_POST(self, data: ReformatDisk) -> StorageResponseV2:
+    async def v2_reformat_disk_POST(
+        self, data: ReformatDisk, since: Optional[str] = None
+    ) -> StorageResponseV2:
         self.locked_probe_data = True
         self.reformat(self.model._one(id=data.disk_id), data.ptable)
-        return await self.v2_GET()
+        return await self.v2_GET(since=since)
 
-    async def v2_add_boot_partition_POST(self, disk_id: str) -> StorageResponseV2:
+    async def v2_add_boot_partition_POST(
+        self, disk_id: str, since: Optional[str] = None
+    ) -> StorageResponseV2:
         log.debug("v2_add_boot_partition: disk-id: %s", disk_id)
         self.locked_probe_data = True
         disk = self.model._one(id=disk_id)
@@ -1517,9 +1556,11 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
         if DeviceAction.TOGGLE_BOOT not in DeviceAction.supported(disk):
             raise StorageRecoverableError("disk does not support boot partiton")
         self.add_boot_disk(disk)
-        return await self.v2_GET()
+        return await self.v2_GET(since=since)
 
-    async def v2_add_partition_POST(self, data: AddPartitionV2) -> StorageResponseV2:
+    async def v2_add_partition_POST(
+        self, data: AddPartitionV2, since: Optional[str] = None
+    ) -> StorageResponseV2:
         log.debug(data)
         self.locked_probe_data = True
         if data.partition.boot is not None:
@@ -1549,10 +1590,10 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
 
         gap = gaps.at_offset(disk, data.gap.offset).split(requested_size)[0]
         self.create_partition(disk, gap, spec, wipe="superblock")
-        return await self.v2_GET()
+        return await self.v2_GET(since=since)
 
     async def v2_delete_partition_POST(
-        self, data: ModifyPartitionV2
+        self, data: ModifyPartitionV2, since: Optional[str] = None
     ) -> StorageResponseV2:
         log.debug(data)
         self.locked_probe_data = True
@@ -1563,10 +1604,10 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
             )
         partition = self.get_partition(disk, data.partition.number)
         self.delete_partition(partition)
-        return await self.v2_GET()
+        return await self.v2_GET(since=since)
 
     async def v2_edit_partition_POST(
-        self, data: ModifyPartitionV2
+        self, data: ModifyPartitionV2, since: Optional[str] = None
     ) -> StorageResponseV2:
         log.debug(data)
         self.locked_probe_data = True
@@ -1612,9 +1653,11 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
             spec["size"] = data.partition.size
         spec["wipe"] = data.partition.wipe
         self.partition_disk_handler(disk, spec, partition=partition)
-        return await self.v2_GET()
+        return await self.v2_GET(since=since)
 
-    async def v2_volume_group_DELETE(self, id: str) -> StorageResponseV2:
+    async def v2_volume_group_DELETE(
+        self, id: str, since: Optional[str] = None
+    ) -> StorageResponseV2:
         """Delete the VG specified by its ID. Any associated LV will be deleted
         as well."""
         self.locked_probe_data = True
@@ -1624,9 +1667,11 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
         assert isinstance(vg, LVM_VolGroup)
 
         self.delete_volgroup(vg)
-        return await self.v2_GET()
+        return await self.v2_GET(since=since)
 
-    async def v2_logical_volume_DELETE(self, id: str) -> StorageResponseV2:
+    async def v2_logical_volume_DELETE(
+        self, id: str, since: Optional[str] = None
+    ) -> StorageResponseV2:
         """Delete the LV specified by its ID."""
         self.locked_probe_data = True
 
@@ -1635,9 +1680,11 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
         assert isinstance(lv, LVM_LogicalVolume)
 
         self.delete_logical_volume(lv)
-        return await self.v2_GET()
+        return await self.v2_GET(since=since)
 
-    async def v2_raid_DELETE(self, id: str) -> StorageResponseV2:
+    async def v2_raid_DELETE(
+        self, id: str, since: Optional[str] = None
+    ) -> StorageResponseV2:
         """Delete the Raid specified by its ID. Any associated partition will
         be deleted as well."""
         self.locked_probe_data = True
@@ -1647,7 +1694,7 @@ class FilesystemController(SubiquityController, FilesystemManipulator):
         assert isinstance(raid, Raid)
 
         self.delete_raid(raid)
-        return await self.v2_GET()
+        return await self.v2_GET(since=since)
 
     @exclusive
     async def do_entropy_check(
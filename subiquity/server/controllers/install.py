@@ -36,7 +36,6 @@ from curtin.distro import list_kernels
 from subiquity.common.errorreport import ErrorReportKind
 from subiquity.common.pkg import TargetPkg
 from subiquity.common.types import ApplicationState, PackageInstallState
-from subiquity.journald import journald_listen
 from subiquity.models.filesystem import ActionRenderMode, Partition
 from subiquity.server.controller import SubiquityController
 from subiquity.server.controllers.filesystem import VariationInfo
@@ -94,14 +93,14 @@ class InstallController(SubiquityController):
         return True
 
     def start(self):
-        journald_listen([self.app.log_syslog_id], self.log_event)
+        self.app.hub.subscribe(InstallerChannels.LOG_LINE, self.log_event)
         self.install_task = asyncio.create_task(self.install())
 
     def tpath(self, *path):
         return os.path.join(self.model.target, *path)
 
-    def log_event(self, event):
-        self.tb_extractor.feed(event["MESSAGE"])
+    def log_event(self, line: str):
+        self.tb_extractor.feed(line)
 
     def write_config(self, config_file: Path, config: Any) -> None:
         """Create a YAML file that represents the curtin install configuration
@@ -591,12 +590,15 @@ class InstallController(SubiquityController):
             return
 
         with context.child("live-packages", "installing packages to live system"):
-            for package in before:
-                state = await self.app.package_installer.install_pkg(package)
-                if state != PackageInstallState.DONE:
-                    raise RuntimeError(f"could not install {package}")
+            # Start all the packages together so they are installed in as
+            # few apt-get transactions as possible, but only wait for the
+            # ones that are needed before the install.
             for package in during:
                 self.app.package_installer.start_installing_pkg(package)
+            states = await self.app.package_installer.install_pkgs(sorted(before))
+            for package, state in states.items():
+                if state != PackageInstallState.DONE:
+                    raise RuntimeError(f"could not install {package}")
 
     @with_context()
     async def install(self, *, context):
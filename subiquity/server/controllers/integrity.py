@@ -16,12 +16,23 @@
 import asyncio
 import json
 import logging
+import os
+import subprocess
+from typing import Dict, List, Optional
 
 from subiquity.common.apidef import API
-from subiquity.common.types import CasperMd5Results
+from subiquity.common.types import CasperMd5Results, IntegrityStatus
 from subiquity.journald import journald_get_first_match
 from subiquity.server.controller import SubiquityController
-from subiquitycore.async_helpers import schedule_task
+from subiquity.server.md5check import (
+    Md5Checker,
+    Md5Entry,
+    parse_md5sums,
+    squashfs_layers,
+)
+from subiquity.server.types import InstallerChannels
+from subiquitycore.async_helpers import run_bg_task, run_in_thread, schedule_task
+from subiquitycore.utils import arun_command
 
 log = logging.getLogger("subiquity.server.controllers.integrity")
 
@@ -35,9 +46,23 @@ class IntegrityController(SubiquityController):
 
     model_name = "integrity"
     result_filepath = "/run/casper-md5check.json"
+    media_root = "/cdrom"
 
     md5check_done = asyncio.Event()
 
+    def __init__(self, app):
+        super().__init__(app)
+        self.status = IntegrityStatus(result=CasperMd5Results.UNKNOWN)
+        self._status_changed = asyncio.Event()
+        self._checker = Md5Checker(self.media_root)
+        # The contents of md5sum.txt, if we are checking the media
+        # ourselves rather than relying on casper-md5check.
+        self._entries: Optional[List[Md5Entry]] = None
+        # Path -> whether the file matched its checksum.
+        self._checked: Dict[str, bool] = {}
+        self._check_lock = asyncio.Lock()
+        self._md5check_task: Optional[asyncio.Task] = None
+
     @property
     def result(self):
         return CasperMd5Results(self.model.md5check_results.get("result", "unknown"))
@@ -48,6 +73,13 @@ class IntegrityController(SubiquityController):
 
         return self.result
 
+    async def status_GET(self, wait: bool = False) -> IntegrityStatus:
+        if wait and not self.md5check_done.is_set():
+            await self._status_changed.wait()
+        self.status.result = self.result
+        self.status.bytes_checked = self._checker.bytes_checked
+        return self.status
+
     async def wait_casper_md5check(self):
         if not self.app.opts.dry_run:
             await journald_get_first_match(
@@ -67,10 +99,133 @@ class IntegrityController(SubiquityController):
                 log.debug(f"casper-md5check results: {ret}")
                 return ret
 
+    def _write_results(self, results: dict) -> None:
+        # In place of casper-md5check, which is stopped when we check the
+        # media ourselves; the file is copied to the logs of the target.
+        with open(self.result_filepath, "w") as fp:
+            json.dump(results, fp)
+
+    async def save_results(self, results: dict) -> None:
+        self.model.md5check_results = results
+        try:
+            await run_in_thread(self._write_results, results)
+        except OSError as exc:
+            log.debug("cannot write %s: %r", self.result_filepath, exc)
+
+    async def stop_casper_md5check(self) -> None:
+        # It would read the whole media at the same time as we do.
+        try:
+            await arun_command(["systemctl", "stop", "casper-md5check.service"])
+        except (OSError, subprocess.CalledProcessError) as exc:
+            log.debug("cannot stop casper-md5check: %r", exc)
+
+    def _skip_requested(self) -> bool:
+        # casper-md5check honours the same option.
+        with open("/proc/cmdline") as fp:
+            return "fsck.mode=skip" in fp.read().split()
+
+    def _read_md5sums(self) -> List[Md5Entry]:
+        with open(os.path.join(self.media_root, "md5sum.txt")) as fp:
+            return parse_md5sums(fp.read())
+
+    def _needed_entries(self) -> List[Md5Entry]:
+        """Return the entries of md5sum.txt that matter for the install.
+
+        That is everything except the squashfs layers that the selected
+        source does not use.
+        """
+        source = self.app.base_model.source.current
+        langs = []
+        if source.preinstalled_langs:
+            langs = list(source.preinstalled_langs) + ["no-languages"]
+        layers = set()
+        for variation in source.variations.values():
+            layers |= squashfs_layers(variation.path, langs)
+
+        squashfs = [e for e in self._entries if e.path.endswith(".squashfs")]
+        if not any(os.path.basename(e.path) in layers for e in squashfs):
+            # The source is not a layered one from the media (or it is not
+            # described in a way we understand): check every layer.
+            return self._entries
+        return [
+            e
+            for e in self._entries
+            if not e.path.endswith(".squashfs") or os.path.basename(e.path) in layers
+        ]
+
+    def _file_checked(self, entry: Md5Entry, ok: bool) -> None:
+        self._checked[entry.path] = ok
+        self.status.files_checked += 1
+        self.status.last_file = entry.path
+        if not ok:
+            self.status.checksum_mismatch.append(entry.path)
+        self._status_changed.set()
+        self._status_changed.clear()
+
+    async def _check_needed(self) -> dict:
+        async with self._check_lock:
+            todo = [e for e in self._needed_entries() if e.path not in self._checked]
+            if todo:
+                sizes = await run_in_thread(
+                    lambda: [self._checker.size(e) for e in todo]
+                )
+                self.status.files_total += len(todo)
+                self.status.bytes_total += sum(sizes)
+                await self._checker.check(todo, self._file_checked)
+        failed = [
+            "./" + e.path
+            for e in self._needed_entries()
+            if self._checked.get(e.path) is False
+        ]
+        log.debug("checked media, %d files failed", len(failed))
+        return {"checksum_missmatch": failed, "result": "fail" if failed else "pass"}
+
+    async def check_media(self) -> Optional[dict]:
+        """Check the media against its md5sum.txt.
+
+        Returns None if this is not possible, in which case the results of
+        casper-md5check should be used.
+        """
+        if await run_in_thread(self._skip_requested):
+            return mock_skip
+        try:
+            self._entries = await run_in_thread(self._read_md5sums)
+        except OSError as exc:
+            log.debug("cannot read md5sum.txt: %r", exc)
+            return None
+        await self.stop_casper_md5check()
+        return await self._check_needed()
+
     async def md5check(self):
-        await self.wait_casper_md5check()
-        self.model.md5check_results = await self.get_md5check_results()
+        if self.app.opts.dry_run:
+            results = await self.get_md5check_results()
+        else:
+            results = await self.check_media()
+            if results is None:
+                await self.wait_casper_md5check()
+                results = await self.get_md5check_results()
+            elif self._entries is not None:
+                await self.save_results(results)
+        self.model.md5check_results = results
         self.md5check_done.set()
+        self._status_changed.set()
+        self._status_changed.clear()
+
+    async def _source_configured(self):
+        # A different source may use squashfs layers that have not been
+        # checked yet.
+        await self._md5check_task
+        if self._entries is None:
+            return
+        await self.save_results(await self._check_needed())
 
     def start(self):
+        # Called early for autoinstall, and again with the other
+        # controllers.
+        if self._md5check_task is not None:
+            return
         self._md5check_task = schedule_task(self.md5check())
+        self.app.hub.subscribe(
+            (InstallerChannels.CONFIGURED, "source"),
+            lambda: run_bg_task(self._source_configured()),
+        )
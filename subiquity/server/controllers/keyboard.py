@@ -13,6 +13,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import functools
 import logging
 import os
 import pwd
@@ -88,6 +89,7 @@ standard_non_latin_layouts = set(
 default_desktop_user = "ubuntu"
 
 
+@functools.lru_cache(maxsize=None)
 def latinizable(layout_code, variant_code) -> Optional[Tuple[str, str]]:
     """
     If this setting does not allow the typing of latin characters,
@@ -15,19 +15,25 @@
 
 import asyncio
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import aiohttp
 
 from subiquity.common.api.client import make_client_for_conn
-from subiquity.common.apidef import API, LinkAction, NetEventAPI
+from subiquity.common.apidef import API, LinkAction, LinkUpdate, NetEventAPI
 from subiquity.common.errorreport import ErrorReportKind
 from subiquity.common.types import NetworkStatus, PackageInstallState
 from subiquity.server.controller import SubiquityController
 from subiquitycore.async_helpers import run_bg_task, schedule_task
 from subiquitycore.context import with_context
 from subiquitycore.controllers.network import BaseNetworkController
-from subiquitycore.models.network import BondConfig, StaticConfig, WLANConfig
+from subiquitycore.models.network import (
+    BondConfig,
+    NetDevInfo,
+    NetworkDev,
+    StaticConfig,
+    WLANConfig,
+)
 
 log = logging.getLogger("subiquity.server.controllers.network")
 
@@ -95,6 +101,11 @@ class NetworkController(BaseNetworkController, SubiquityController):
         self.clients = {}
         self.install_wpasupplicant_task = None
         self.pending_wlan_devices = set()
+        # Link updates waiting to be sent to clients, by device name.
+        self.pending_link_updates: Dict[str, Tuple[LinkAction, NetworkDev]] = {}
+        # netdev_info() is O(number of devices), so cache it for GET. An
+        # entry is dropped whenever an update for the device is sent.
+        self._netdev_infos: Dict[str, NetDevInfo] = {}
 
     def maybe_start_install_wpasupplicant(self):
         log.debug("maybe_start_install_wpasupplicant")
@@ -202,6 +213,9 @@ class NetworkController(BaseNetworkController, SubiquityController):
         self.model.has_network = self.network_event_receiver.has_default_route
 
     async def _apply_config(self, *, context=None, silent=False):
+        # Applying the config updates the DHCP state of devices without
+        # necessarily sending updates for them.
+        self._netdev_infos.clear()
         try:
             await super()._apply_config(context=context, silent=silent)
         except asyncio.CancelledError:
@@ -232,7 +246,7 @@ class NetworkController(BaseNetworkController, SubiquityController):
                 dev for dev in self.model.get_all_netdevs() if dev.type != "wlan"
             ]
         return NetworkStatus(
-            devices=[dev.netdev_info() for dev in devices],
+            devices=[self._netdev_info(dev) for dev in devices],
             wlan_support_install_state=self.wlan_support_install_state(),
         )
 
@@ -318,12 +332,43 @@ class NetworkController(BaseNetworkController, SubiquityController):
         super().update_has_default_route(has_default_route)
         self._call_clients("route_watch", has_default_route)
 
+    def update_initial_configs(self):
+        super().update_initial_configs()
+        self._netdev_infos.clear()
+
+    def _netdev_info(self, dev: NetworkDev) -> NetDevInfo:
+        info = self._netdev_infos.get(dev.name)
+        if info is None:
+            info = self._netdev_infos[dev.name] = dev.netdev_info()
+        return info
+
     def _send_update(self, act, dev):
-        with self.context.child("_send_update", "{} {}".format(act.name, dev.name)):
+        self._netdev_infos.pop(dev.name, None)
+        # Link updates can come in bursts (DHCP churn, many SR-IOV VFs
+        # appearing at once...) so rather than sending each one to the
+        # clients straight away, collect them until the next iteration of
+        # the event loop and send them as one batch. Only the latest state
+        # of each device is sent.
+        if not self.pending_link_updates:
+            asyncio.get_running_loop().call_soon(self._send_pending_updates)
+        prev = self.pending_link_updates.get(dev.name)
+        if prev is not None and prev[0] == LinkAction.NEW and act == LinkAction.CHANGE:
+            # The client has not been told about the device yet.
+            act = LinkAction.NEW
+        self.pending_link_updates[dev.name] = (act, dev)
+
+    def _send_pending_updates(self):
+        pending, self.pending_link_updates = self.pending_link_updates, {}
+        if not pending:
+            return
+        with self.context.child("_send_updates", "{} links".format(len(pending))):
             # disable log - can contain PSK
             # log.debug("dev_info {} {}".format(dev.name, dev.config))
-            dev_info = dev.netdev_info()
-            self._call_clients("update_link", act, dev_info)
+            updates = [
+                LinkUpdate(act=act, info=self._netdev_info(dev))
+                for act, dev in pending.values()
+            ]
+            self._call_clients("update_links", updates)
 
     def new_link(self, dev):
         super().new_link(dev)
@@ -20,7 +20,6 @@ from typing import List, Optional
 from subiquity.common.apidef import API
 from subiquity.common.types import OEMResponse
 from subiquity.models.oem import OEMMetaPkg
-from subiquity.server.apt import OverlayCleanupError
 from subiquity.server.autoinstall import AutoinstallError
 from subiquity.server.controller import SubiquityController
 from subiquity.server.curtin import run_curtin_command
@@ -157,29 +156,25 @@ class OEMController(SubiquityController):
             await self._wait_apt.wait()
 
         apt = self.app.controllers.Mirror.final_apt_configurer
-        try:
-            async with apt.overlay() as d:
-                try:
-                    # Make sure ubuntu-drivers is available.
-                    await self.ubuntu_drivers.ensure_cmd_exists(d.mountpoint)
-                except CommandNotFoundError:
-                    self.model.metapkgs = []
-                else:
-                    metapkgs: List[str] = await self.ubuntu_drivers.list_oem(
-                        root_dir=d.mountpoint, context=context
+        async with apt.overlay() as d:
+            try:
+                # Make sure ubuntu-drivers is available.
+                await self.ubuntu_drivers.ensure_cmd_exists(d.mountpoint)
+            except CommandNotFoundError:
+                self.model.metapkgs = []
+            else:
+                metapkgs: List[str] = await self.ubuntu_drivers.list_oem(
+                    root_dir=d.mountpoint, context=context
+                )
+                self.model.metapkgs = [
+                    OEMMetaPkg(
+                        name=name,
+                        wants_oem_kernel=await self.wants_oem_kernel(
+                            name, context=context, overlay=d
+                        ),
                     )
-                    self.model.metapkgs = [
-                        OEMMetaPkg(
-                            name=name,
-                            wants_oem_kernel=await self.wants_oem_kernel(
-                                name, context=context, overlay=d
-                            ),
-                        )
-                        for name in metapkgs
-                    ]
-
-        except OverlayCleanupError:
-            log.exception("Failed to cleanup overlay. Continuing anyway.")
+                    for name in metapkgs
+                ]
 
         for pkg in self.model.metapkgs:
             if pkg.wants_oem_kernel:
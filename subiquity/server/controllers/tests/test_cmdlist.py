@@ -13,11 +13,15 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import subprocess
+from unittest.mock import Mock, call
+
 import jsonschema
 from jsonschema.validators import validator_for
 
-from subiquity.server.controllers.cmdlist import CmdListController
+from subiquity.server.controllers.cmdlist import CmdListController, Command
 from subiquitycore.tests import SubiTestCase
+from subiquitycore.tests.mocks import make_app
 
 
 class TestCmdListController(SubiTestCase):
@@ -29,3 +33,23 @@ class TestCmdListController(SubiTestCase):
         )
 
         JsonValidator.check_schema(CmdListController.autoinstall_schema)
+
+    async def test_run_publishes_output(self):
+        app = make_app()
+        app.publish_log_line = Mock()
+        controller = CmdListController(app)
+        controller.syslog_id = "my-id"
+        controller.cmds = [Command(args="echo one; echo two >&2", check=True)]
+        await controller.run()
+        self.assertEqual(
+            [
+                call("  running echo one; echo two >&2", "my-id"),
+                call("one", "my-id"),
+                call("two", "my-id"),
+            ],
+            app.publish_log_line.call_args_list,
+        )
+
+        controller.cmds = [Command(args="false", check=True)]
+        with self.assertRaises(subprocess.CalledProcessError):
+            await controller.run()
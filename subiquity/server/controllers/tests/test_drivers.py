@@ -13,11 +13,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock
+
 import jsonschema
 from jsonschema.validators import validator_for
 
 from subiquity.server.controllers.drivers import DriversController
+from subiquity.server.types import InstallerChannels
 from subiquitycore.tests import SubiTestCase
+from subiquitycore.tests.mocks import make_app
 
 
 class TestDriversController(SubiTestCase):
@@ -29,3 +34,87 @@ class TestDriversController(SubiTestCase):
         )
 
         JsonValidator.check_schema(DriversController.autoinstall_schema)
+
+
+class TestListDrivers(SubiTestCase):
+    def setUp(self):
+        self.app = make_app()
+        self.app.controllers.Source.model.search_drivers = True
+        self.controller = DriversController(self.app)
+        self.controller._wait_apt = asyncio.Event()
+        self.controller.ubuntu_drivers = Mock()
+        self.controller.ubuntu_drivers.ensure_cmd_exists = AsyncMock()
+        self.controller.ubuntu_drivers.early_list_drivers = AsyncMock(
+            return_value=["nvidia-driver-550"]
+        )
+        self.controller.ubuntu_drivers.list_drivers = AsyncMock(
+            return_value=["nvidia-driver-550"]
+        )
+        self.app.controllers.Mirror.final_apt_configurer.overlay = MagicMock()
+
+    async def test_early_drivers_before_apt(self):
+        task = asyncio.create_task(self.controller._list_drivers())
+        await asyncio.wait_for(self.controller.list_drivers_done_event.wait(), 1)
+        self.assertEqual(["nvidia-driver-550"], self.controller.drivers)
+        self.controller.ubuntu_drivers.list_drivers.assert_not_called()
+
+        self.controller._wait_apt.set()
+        await task
+        self.controller.ubuntu_drivers.list_drivers.assert_awaited_once()
+
+    async def test_confirmation_corrects_early_drivers(self):
+        self.controller.ubuntu_drivers.list_drivers.return_value = ["nvidia-driver-535"]
+        self.controller._wait_apt.set()
+        with self.assertLogs("subiquity.server.controllers.drivers", "WARNING"):
+            await self.controller._list_drivers()
+        self.assertEqual(["nvidia-driver-535"], self.controller.drivers)
+
+    async def test_no_index(self):
+        self.controller.ubuntu_drivers.early_list_drivers.return_value = None
+        task = asyncio.create_task(self.controller._list_drivers())
+        await asyncio.sleep(0)
+        self.assertFalse(self.controller.list_drivers_done_event.is_set())
+        self.assertIsNone(self.controller.drivers)
+
+        self.controller._wait_apt.set()
+        await task
+        self.assertEqual(["nvidia-driver-550"], self.controller.drivers)
+
+    async def test_empty_early_drivers_not_published(self):
+        self.controller.ubuntu_drivers.early_list_drivers.return_value = []
+        task = asyncio.create_task(self.controller._list_drivers())
+        await asyncio.sleep(0)
+        self.assertFalse(self.controller.list_drivers_done_event.is_set())
+
+        self.controller._wait_apt.set()
+        await task
+        self.assertTrue(self.controller.list_drivers_done_event.is_set())
+        self.assertEqual(["nvidia-driver-550"], self.controller.drivers)
+
+    async def test_drivers_decided_after_confirmation(self):
+        confirm = asyncio.Event()
+
+        async def list_drivers(root_dir, context):
+            await confirm.wait()
+            return ["nvidia-driver-535-server"]
+
+        self.controller.ubuntu_drivers.list_drivers.side_effect = list_drivers
+        self.app.base_model.wait_postinstall = AsyncMock()
+        decided_with = []
+        self.app.hub.subscribe(
+            InstallerChannels.DRIVERS_DECIDED,
+            lambda: decided_with.append(self.controller.drivers),
+        )
+        list_task = asyncio.create_task(self.controller._list_drivers())
+        decided_task = asyncio.create_task(self.controller._send_drivers_decided())
+        await asyncio.wait_for(self.controller.list_drivers_done_event.wait(), 1)
+        self.controller._wait_apt.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        # The early list is published but the drivers are not decided yet.
+        self.assertEqual([], decided_with)
+
+        confirm.set()
+        await list_task
+        await decided_task
+        self.assertEqual([["nvidia-driver-535-server"]], decided_with)
@@ -2429,6 +2429,60 @@ class TestManualBoot(IsolatedAsyncioTestCase):
         self.assertFalse(resp.disks[0].can_be_boot_device)
 
 
+class TestStorageDeltas(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.app = make_app()
+        self.app.opts.bootloader = Bootloader.UEFI.value
+        self.fsc = FilesystemController(app=self.app)
+        self.fsc.calculate_suggested_install_min = mock.Mock()
+        self.fsc.calculate_suggested_install_min.return_value = 10 << 30
+        self.fsc.model = self.model = make_model(Bootloader.UEFI)
+        self.model.storage_version = 2
+        self.fsc._probe_task.task = mock.Mock()
+        self.fsc._probe_firmware_task.task = mock.Mock()
+        self.fsc._examine_systems_task.task = mock.Mock()
+
+    async def test_v2_edit_returns_delta(self):
+        d1 = make_disk(self.model)
+        d2 = make_disk(self.model)
+        resp = await self.fsc.v2_GET()
+        self.assertIsNone(resp.base_etag)
+        self.assertEqual(2, len(resp.disks))
+
+        delta = await self.fsc.v2_add_boot_partition_POST(d2.id, since=resp.etag)
+        self.assertEqual(resp.etag, delta.base_etag)
+        self.assertEqual([d1.id, d2.id], delta.disk_ids)
+        [disk] = delta.disks
+        self.assertEqual(d2.id, disk.id)
+        self.assertTrue(disk.boot_device)
+        self.assertNotEqual(resp.etag, delta.etag)
+
+    async def test_v2_unchanged(self):
+        make_disk(self.model)
+        resp = await self.fsc.v2_GET()
+        again = await self.fsc.v2_GET(since=resp.etag)
+        self.assertEqual(resp.etag, again.etag)
+        self.assertEqual([], again.disks)
+
+    async def test_get_etags(self):
+        make_disk(self.model)
+        resp = await self.fsc.GET()
+        self.assertIsNotNone(resp.config)
+        again = await self.fsc.GET(
+            config_etag=resp.etag, orig_config_etag=resp.orig_config_etag
+        )
+        self.assertIsNone(again.config)
+        self.assertIsNone(again.orig_config)
+        self.assertEqual(resp.etag, again.etag)
+
+        make_disk(self.model)
+        changed = await self.fsc.GET(
+            config_etag=resp.etag, orig_config_etag=resp.orig_config_etag
+        )
+        self.assertIsNotNone(changed.config)
+        self.assertNotEqual(resp.etag, changed.etag)
+
+
 class TestCoreBootInstallMethods(IsolatedAsyncioTestCase):
     def setUp(self):
         self.app = make_app()
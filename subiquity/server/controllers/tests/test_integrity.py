@@ -13,6 +13,12 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
+import hashlib
+import json
+import os
+from unittest.mock import AsyncMock, Mock, patch
+
 from subiquity.common.types import CasperMd5Results
 from subiquity.models.integrity import IntegrityModel
 from subiquity.server.controllers.integrity import (
@@ -21,6 +27,8 @@ from subiquity.server.controllers.integrity import (
     mock_pass,
     mock_skip,
 )
+from subiquity.server.md5check import Md5Entry
+from subiquity.server.types import InstallerChannels
 from subiquitycore.tests import SubiTestCase
 from subiquitycore.tests.mocks import make_app
 
@@ -46,3 +54,106 @@ class TestMd5Check(SubiTestCase):
     def test_fail(self):
         self.ic.model.md5check_results = mock_fail
         self.assertEqual(CasperMd5Results.FAIL, self.ic.result)
+
+
+class TestNeededEntries(SubiTestCase):
+    def setUp(self):
+        self.app = make_app()
+        self.ic = IntegrityController(app=self.app)
+        self.source = self.app.base_model.source.current
+        self.source.preinstalled_langs = ["en"]
+        self.ic._entries = [
+            Md5Entry(path=path, md5="0")
+            for path in [
+                "casper/vmlinuz",
+                "casper/minimal.squashfs",
+                "casper/minimal.en.squashfs",
+                "casper/minimal.standard.squashfs",
+                "casper/minimal.standard.fr.squashfs",
+                "casper/other.squashfs",
+            ]
+        ]
+
+    def test_layers_of_source(self):
+        self.source.variations = {
+            "standard": Mock(path="casper/minimal.standard.squashfs"),
+        }
+        self.assertEqual(
+            [
+                "casper/vmlinuz",
+                "casper/minimal.squashfs",
+                "casper/minimal.en.squashfs",
+                "casper/minimal.standard.squashfs",
+            ],
+            [e.path for e in self.ic._needed_entries()],
+        )
+
+    def test_unknown_source_checks_everything(self):
+        self.source.variations = {"default": Mock(path="/some/image.img")}
+        self.assertEqual(self.ic._entries, self.ic._needed_entries())
+
+
+class TestCheckMedia(SubiTestCase):
+    def setUp(self):
+        self.app = make_app()
+        self.app.opts.dry_run = False
+        self.ic = IntegrityController(app=self.app)
+        self.ic.model = IntegrityModel()
+        self.ic.md5check_done = asyncio.Event()
+        self.ic.result_filepath = os.path.join(self.tmp_dir(), "results.json")
+        self.ic.media_root = self.ic._checker.root = self.tmp_dir()
+        md5sums = []
+        for name, content in ("good", b"good"), ("bad", b"bad"):
+            with open(os.path.join(self.ic.media_root, name), "wb") as fp:
+                fp.write(content)
+            md5sums.append(f"{hashlib.md5(b'good').hexdigest()}  ./{name}\n")
+        with open(os.path.join(self.ic.media_root, "md5sum.txt"), "w") as fp:
+            fp.write("".join(md5sums))
+        self.app.base_model.source.current.preinstalled_langs = []
+        self.app.base_model.source.current.variations = {}
+        self.ic._skip_requested = Mock(return_value=False)
+        self.ic.stop_casper_md5check = AsyncMock()
+
+    async def test_status(self):
+        status = await self.ic.status_GET()
+        self.assertEqual(CasperMd5Results.UNKNOWN, status.result)
+        waiter = asyncio.create_task(self.ic.status_GET(wait=True))
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+
+        await self.ic.md5check()
+        self.assertTrue(waiter.done())
+        self.ic.stop_casper_md5check.assert_awaited_once()
+        status = await self.ic.status_GET(wait=True)
+        self.assertEqual(CasperMd5Results.FAIL, status.result)
+        self.assertEqual(2, status.files_total)
+        self.assertEqual(2, status.files_checked)
+        self.assertEqual(7, status.bytes_total)
+        self.assertEqual(7, status.bytes_checked)
+        self.assertEqual(["bad"], status.checksum_mismatch)
+        with open(self.ic.result_filepath) as fp:
+            self.assertEqual(
+                {"checksum_missmatch": ["./bad"], "result": "fail"}, json.load(fp)
+            )
+
+    async def test_fallback_to_casper_md5check(self):
+        os.unlink(os.path.join(self.ic.media_root, "md5sum.txt"))
+        with (
+            patch.object(self.ic, "wait_casper_md5check") as wait,
+            patch.object(self.ic, "get_md5check_results", return_value=mock_pass),
+        ):
+            await self.ic.md5check()
+        wait.assert_awaited_once()
+        self.ic.stop_casper_md5check.assert_not_called()
+        self.assertEqual(CasperMd5Results.PASS, self.ic.result)
+
+    async def test_start_once(self):
+        with patch.object(self.ic, "md5check", new_callable=AsyncMock) as md5check:
+            self.ic.start()
+            self.ic.start()
+            await self.ic._md5check_task
+        md5check.assert_awaited_once()
+        self.assertEqual(
+            1,
+            len(self.app.hub.subscriptions[(InstallerChannels.CONFIGURED, "source")]),
+        )
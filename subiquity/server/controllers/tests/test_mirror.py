@@ -135,7 +135,7 @@ class TestMirrorController(unittest.IsolatedAsyncioTestCase):
 
     @mock.patch("subiquity.server.controllers.mirror.asyncio.sleep")
     async def test_find_and_elect_candidate_mirror(self, mock_sleep):
-        self.controller.app.context.child = contextlib.nullcontext
+        self.controller.app.context = mock.Mock(child=contextlib.nullcontext)
         self.controller.app.base_model.network.has_network = True
         self.controller.model = MirrorModel()
         self.controller.network_configured_event.set()
@@ -222,7 +222,7 @@ class TestMirrorController(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(self.controller.model.primary_elected.uri, "http://success")
 
     async def test_find_and_elect_candidate_mirror_no_network(self):
-        self.controller.app.context.child = contextlib.nullcontext
+        self.controller.app.context = mock.Mock(child=contextlib.nullcontext)
         self.controller.app.base_model.network.has_network = False
         self.controller.model = MirrorModel()
         self.controller.network_configured_event.set()
@@ -13,12 +13,14 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 from copy import copy
 from unittest.mock import ANY, AsyncMock, Mock, patch
 
 import jsonschema
 from jsonschema.validators import validator_for
 
+from subiquity.common.apidef import LinkAction, LinkUpdate
 from subiquity.models.network import NetworkModel
 from subiquity.server.controllers.network import NetworkController
 from subiquitycore.models.network import NetworkDev
@@ -107,8 +109,7 @@ class TestNetworkAutoDisableInterfaces(SubiTestCase):
         dead_dev.info = Mock(addresses={})
         self.controller.model.devices_by_name["testdev1"] = dead_dev
 
-        with patch("subiquity.server.controller.open"):
-            await self.controller.configured()
+        await self.controller.configured()
 
         # Live config shouldn't be modified no matter what
         self.assertEqual(live_dev.config, live_config)
@@ -117,3 +118,54 @@ class TestNetworkAutoDisableInterfaces(SubiTestCase):
             self.assertEqual(dead_dev.config, {})
         else:
             self.assertEqual(dead_dev.config, dead_config)
+
+
+class TestLinkUpdates(SubiTestCase):
+    def setUp(self):
+        app = make_app()
+        app.note_file_for_apport = Mock()
+        app.opts.output_base = self.tmp_dir()
+        app.opts.project = "subiquity"
+        self.controller = NetworkController(app)
+        self.controller._call_clients = Mock()
+
+    def make_dev(self, name):
+        dev = Mock()
+        dev.name = name
+        dev.netdev_info.return_value = "info-" + name
+        return dev
+
+    async def test_updates_coalesced(self):
+        dev0, dev1 = self.make_dev("ens3"), self.make_dev("ens4")
+        self.controller._send_update(LinkAction.NEW, dev0)
+        for i in range(10):
+            self.controller._send_update(LinkAction.CHANGE, dev0)
+            self.controller._send_update(LinkAction.CHANGE, dev1)
+        self.controller._call_clients.assert_not_called()
+        await asyncio.sleep(0)
+        self.controller._call_clients.assert_called_once_with(
+            "update_links",
+            [
+                LinkUpdate(act=LinkAction.NEW, info="info-ens3"),
+                LinkUpdate(act=LinkAction.CHANGE, info="info-ens4"),
+            ],
+        )
+        dev0.netdev_info.assert_called_once_with()
+
+    async def test_del_after_change(self):
+        dev = self.make_dev("ens3")
+        self.controller._send_update(LinkAction.CHANGE, dev)
+        self.controller._send_update(LinkAction.DEL, dev)
+        await asyncio.sleep(0)
+        self.controller._call_clients.assert_called_once_with(
+            "update_links", [LinkUpdate(act=LinkAction.DEL, info="info-ens3")]
+        )
+
+    async def test_netdev_info_cached(self):
+        dev = self.make_dev("ens3")
+        self.assertEqual("info-ens3", self.controller._netdev_info(dev))
+        self.assertEqual("info-ens3", self.controller._netdev_info(dev))
+        dev.netdev_info.assert_called_once_with()
+        self.controller._send_update(LinkAction.CHANGE, dev)
+        self.controller._netdev_info(dev)
+        self.assertEqual(2, dev.netdev_info.call_count)
@@ -17,61 +17,99 @@ import logging
 import os
 import subprocess
 from shutil import which
+from typing import List
 
 from subiquity.common.apidef import API
 from subiquity.common.types import TimeZoneInfo
 from subiquity.server.controller import SubiquityController
+from subiquitycore.context import with_context
+from subiquitycore.utils import arun_command
 
 log = logging.getLogger("subiquity.server.controllers.timezone")
 
 
+ZONEINFO = "/usr/share/zoneinfo"
+
+
 def active_timedatectl():
     return which("timedatectl") and os.path.exists("/run/systemd/system")
 
 
+def read_tzdata_zi(path: str) -> List[str]:
+    """Return the zone and link names defined in a tzdata.zi file."""
+    names = set()
+    with open(path) as fp:
+        for line in fp:
+            # Zones are "Z <name> ...", links are "L <target> <name>".
+            if line.startswith("Z "):
+                names.add(line.split()[1])
+            elif line.startswith("L "):
+                names.add(line.split()[2])
+    return sorted(names)
+
+
+def read_zone1970_tab(path: str) -> List[str]:
+    names = set()
+    with open(path) as fp:
+        for line in fp:
+            if line.startswith("#"):
+                continue
+            fields = line.split("\t")
+            if len(fields) >= 3:
+                names.add(fields[2].strip())
+    names.add("UTC")
+    return sorted(names)
+
+
+def list_timezones(zoneinfo: str = ZONEINFO) -> List[str]:
+    """List the time zones the way timedatectl list-timezones does.
+
+    The zone data is read directly rather than asking timedatectl, which
+    needs a round trip to systemd-timedated.
+    """
+    try:
+        return read_tzdata_zi(os.path.join(zoneinfo, "tzdata.zi"))
+    except FileNotFoundError:
+        pass
+    try:
+        return read_zone1970_tab(os.path.join(zoneinfo, "zone1970.tab"))
+    except FileNotFoundError:
+        pass
+    tzcmd = ["timedatectl", "list-timezones"]
+    return subprocess.check_output(tzcmd, universal_newlines=True).splitlines()
+
+
 def generate_possible_tzs():
     special_keys = ["", "geoip"]
     if not active_timedatectl():
         return special_keys
-    tzcmd = ["timedatectl", "list-timezones"]
-    list_tz_out = subprocess.check_output(tzcmd, universal_newlines=True)
-    real_tzs = list_tz_out.splitlines()
-    return special_keys + real_tzs
+    return special_keys + list_timezones()
 
 
-def timedatectl_settz(app, tz):
+async def timedatectl_settz(app, tz):
     tzcmd = ["timedatectl", "set-timezone", tz]
     if app.opts.dry_run:
         tzcmd = ["sleep", str(1 / app.scale_factor)]
 
     try:
-        subprocess.run(tzcmd, universal_newlines=True)
+        await arun_command(tzcmd, check=True)
     except subprocess.CalledProcessError as cpe:
         log.error("Failed to set live system timezone: %r", cpe)
 
 
-def timedatectl_gettz():
-    # timedatectl show would be easier, but isn't on bionic
-    tzcmd = ["timedatectl", "status"]
-    env = {"LC_ALL": "C"}
-    # ...
-    #    Time zone: America/Denver (MDT, -0600)
-    # ...
+def timedatectl_gettz(localtime: str = "/etc/localtime"):
+    # This is what timedatectl (or rather systemd-timedated) does too:
+    # /etc/localtime is a symlink into the zoneinfo directory.
     try:
-        out = subprocess.check_output(tzcmd, env=env, universal_newlines=True)
-        for line in out.splitlines():
-            chunks = line.split(":")
-            label = chunks[0].strip()
-            if label != "Time zone":
-                continue
-            chunks = chunks[1].split(" ")
-            return chunks[1]
-    except subprocess.CalledProcessError as cpe:
-        log.error("Failed to get live system timezone: %r", cpe)
-    except IndexError:
-        log.error("Failed to acquire system time zone")
-    log.debug("Failed to find Time zone in timedatectl output")
-    return "Etc/UTC"
+        target = os.readlink(localtime)
+    except OSError as exc:
+        log.error("Failed to get live system timezone: %r", exc)
+        return "Etc/UTC"
+    zone = target.partition("zoneinfo/")[2]
+    if not zone:
+        log.debug("%s points to %s, not a time zone", localtime, target)
+        return "Etc/UTC"
+    return zone
 
 
 class TimeZoneController(SubiquityController):
@@ -86,6 +124,7 @@ class TimeZoneController(SubiquityController):
 
     def __init__(self, *args, **kwargs):
         self.possible = None
+        self.needs_set_timezone = False
         super().__init__(*args, **kwargs)
 
     def get_possible_tzs(self):
@@ -95,6 +134,12 @@ class TimeZoneController(SubiquityController):
 
     def load_autoinstall_data(self, data):
         self.deserialize(data)
+        self.needs_set_timezone = data is not None
+
+    @with_context()
+    async def apply_autoinstall_config(self, context):
+        if self.needs_set_timezone:
+            await self.set_system_timezone()
 
     def make_autoinstall(self):
         return self.serialize()
@@ -113,11 +158,10 @@ class TimeZoneController(SubiquityController):
             self.model.got_from_geoip = True
         else:
             self.model.got_from_geoip = False
-        self.set_system_timezone()
 
-    def set_system_timezone(self):
+    async def set_system_timezone(self):
         if self.model.should_set_tz:
-            timedatectl_settz(self.app, self.model.timezone)
+            await timedatectl_settz(self.app, self.model.timezone)
 
     async def GET(self) -> TimeZoneInfo:
         # if someone POSTed before, return that
@@ -133,4 +177,5 @@ class TimeZoneController(SubiquityController):
 
     async def POST(self, tz: str):
         self.deserialize(tz)
+        await self.set_system_timezone()
         await self.configured()
@@ -107,7 +107,9 @@ class UbuntuProController(SubiquityController):
                 os.environ["PYTHON"],
                 os.path.join(os.environ["SNAP"], "usr/bin/ubuntu-advantage"),
             )
-            strategy = UAClientUAInterfaceStrategy(executable=executable)
+            strategy = UAClientUAInterfaceStrategy(
+                executable=executable, use_worker=True
+            )
         self.ua_interface = UAInterface(strategy)
         self.cs: Optional[ContractSelection] = None
         self.magic_token = Optional[str]
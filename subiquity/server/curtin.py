@@ -21,7 +21,7 @@ import os
 import re
 import subprocess
 import sys
-from typing import Dict, List, Type
+from typing import Dict, List, Optional, Type
 
 import yaml
 
@@ -146,6 +146,10 @@ class _DryRunCurtinCommand(_CurtinCommand):
         ("swap",): "curthooks.json",  # hack
     }
 
+    def __init__(self, *args, timeline: Optional[str] = None, **kwargs):
+        self.timeline = timeline
+        super().__init__(*args, **kwargs)
+
     def make_command(self, command, *args, config=None):
         if command == "install":
             log.debug("creating substitute for curtin install %s", args)
@@ -173,6 +177,9 @@ class _DryRunCurtinCommand(_CurtinCommand):
             ]
             if config:
                 cmd.extend(["--config", config])
+            if self.timeline is not None:
+                cmd.extend(["--stages", json.dumps(stages), "--", self.timeline])
+                return cmd
             event_log_filename = self.stages_mapping[tuple(stages)]
             cmd.extend(
                 [
@@ -196,11 +203,14 @@ async def start_curtin_command(
     app, context, command: str, *args: str, config=None, private_mounts: bool, **opts
 ) -> _CurtinCommand:
     cls: Type[_CurtinCommand]
+    kw = {}
     if app.opts.dry_run:
         if "install-fail" in app.debug_flags:
             cls = _FailingDryRunCurtinCommand
         else:
             cls = _DryRunCurtinCommand
+        if app.dr_cfg is not None:
+            kw["timeline"] = app.dr_cfg.curtin_timeline
     else:
         cls = _CurtinCommand
     curtin_cmd = cls(
@@ -210,6 +220,7 @@ async def start_curtin_command(
         *args,
         config=config,
         private_mounts=private_mounts,
+        **kw,
     )
     await curtin_cmd.start(context, **opts)
     return curtin_cmd
@@ -0,0 +1,82 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional
+
+from subiquity.common.types import ProfilerStatus
+from subiquity.server.profiler import SamplingProfiler
+from subiquitycore.async_helpers import run_in_thread
+
+log = logging.getLogger("subiquity.server.debug")
+
+# Enables the debug endpoints outside of dry-run mode.
+DEBUG_API_CMDLINE_FLAG = "subiquity-debug-api"
+
+
+class DebugController:
+    def __init__(self, app):
+        self.app = app
+        self.context = app.context.child("Debug")
+        self.profiler: Optional[SamplingProfiler] = None
+        self.profiler_files: List[str] = []
+
+    def _profiler_status(self) -> ProfilerStatus:
+        if self.profiler is None:
+            return ProfilerStatus(running=False, files=self.profiler_files)
+        return ProfilerStatus(
+            running=self.profiler.running,
+            samples=self.profiler.sample_count,
+            stalls=list(self.profiler.stalls),
+            files=self.profiler_files,
+        )
+
+    async def profiler_GET(self) -> ProfilerStatus:
+        return self._profiler_status()
+
+    async def profiler_POST(
+        self, enable: bool, interval: float = 0.005, lag_threshold: float = 0.1
+    ) -> ProfilerStatus:
+        if enable:
+            # Zero would make the sampler and the watchdog spin.
+            if interval <= 0:
+                raise ValueError("interval must be positive")
+            if lag_threshold <= 0:
+                raise ValueError("lag_threshold must be positive")
+            if self.profiler is None or not self.profiler.running:
+                self.profiler = SamplingProfiler(
+                    asyncio.get_running_loop(),
+                    interval=interval,
+                    lag_threshold=lag_threshold,
+                )
+                self.profiler.start()
+                log.info("started sampling profiler")
+        elif self.profiler is not None and self.profiler.running:
+            profiler = self.profiler
+            # This waits for at most one sampling interval.
+            profiler.stop()
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            directory = os.path.dirname(self.app.block_log_dir)
+            self.profiler_files = await run_in_thread(profiler.write, directory, stamp)
+            log.info(
+                "stopped sampling profiler after %d samples and %d stalls: %s",
+                profiler.sample_count,
+                len(profiler.stalls),
+                self.profiler_files,
+            )
+        return self._profiler_status()
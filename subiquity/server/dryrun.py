@@ -85,6 +85,10 @@ class DRConfig:
         "examples/umockdev/dell-certified+nvidia.yaml"
     )
 
+    # Replay curtin installs from this timeline, as written by the server
+    # to subiquity-timeline.json, instead of from examples/curtin-events.
+    curtin_timeline: Optional[str] = None
+
     @classmethod
     def load(cls, stream):
         data = yaml.safe_load(stream)
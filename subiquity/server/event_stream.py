@@ -0,0 +1,94 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import collections
+from typing import List, Optional
+
+from subiquity.common.types import InstallerEvent
+
+
+class EventStream:
+    """A bounded, sequenced buffer of events for clients to follow.
+
+    Every published event gets the next sequence number. Clients ask for
+    the events after the last sequence number they have seen, which lets
+    them resume after a reconnect without missing or repeating events
+    (unless more than maxlen events were published in between, in which
+    case the gap is visible in the sequence numbers).
+
+    This is not thread safe: events must be published from the event loop.
+    """
+
+    def __init__(self, maxlen: int = 10000):
+        self._events: collections.deque[InstallerEvent] = collections.deque(
+            maxlen=maxlen
+        )
+        self._seq = 0
+        self._new_events = asyncio.Event()
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(
+        self,
+        kind: str,
+        message: str,
+        *,
+        context_id: Optional[str] = None,
+        context_parent_id: Optional[str] = None,
+        context_name: Optional[str] = None,
+        level: Optional[str] = None,
+    ) -> InstallerEvent:
+        self._seq += 1
+        event = InstallerEvent(
+            seq=self._seq,
+            kind=kind,
+            message=message,
+            context_id=context_id,
+            context_parent_id=context_parent_id,
+            context_name=context_name,
+            level=level,
+        )
+        self._events.append(event)
+        self._new_events.set()
+        self._new_events.clear()
+        return event
+
+    def _resume_point(self, after: int) -> int:
+        if after > self._seq:
+            # The client has seen events from a previous server process
+            # (e.g. across a restart), so give it everything we have.
+            return 0
+        return after
+
+    def events_after(self, after: int, limit: int) -> List[InstallerEvent]:
+        after = self._resume_point(after)
+        if after == self._seq or not self._events:
+            return []
+        # Sequence numbers are contiguous, so the index of the first wanted
+        # event can be computed rather than searched for.
+        start = max(0, after + 1 - self._events[0].seq)
+        stop = min(len(self._events), start + limit)
+        return [self._events[i] for i in range(start, stop)]
+
+    async def wait_for_events_after(
+        self, after: int, limit: int
+    ) -> List[InstallerEvent]:
+        after = self._resume_point(after)
+        while after == self._seq:
+            await self._new_events.wait()
+        return self.events_after(after, limit)
@@ -20,6 +20,7 @@ from xml.etree import ElementTree
 
 import aiohttp
 
+from subiquity.server.http_client import HTTPClient
 from subiquity.server.types import InstallerChannels
 from subiquitycore.async_helpers import SingleInstanceTask
 
@@ -71,18 +72,19 @@ class HTTPGeoIPStrategy(GeoIPStrategy):
     """HTTP implementation to retrieve GeoIP information. We use the
     geoip.ubuntu.com service."""
 
+    def __init__(self, http: HTTPClient):
+        self.http = http
+
     async def get_response(self) -> str:
         url = "https://geoip.ubuntu.com/lookup"
-        async with aiohttp.ClientSession() as session:
-            # We probably want to honor proxy settings here; using
-            # session.get(url, proxy=...) so that we can perform a successful
-            # geoip lookup in a walled garden. Bear in mind that it would
-            # result in a geoip lookup of the proxy itself (the proxy initiates
-            # the connection to the geoip service) but in most cases this is
-            # what we want.
-            async with session.get(url) as response:
-                response.raise_for_status()
-                return await response.text()
+        # The request goes through the configured proxy, if any, so that a
+        # lookup can succeed in a walled garden. Bear in mind that this
+        # results in a geoip lookup of the proxy itself (the proxy initiates
+        # the connection to the geoip service) but in most cases this is what
+        # we want.
+        async with self.http.get(url) as response:
+            response.raise_for_status()
+            return await response.text()
 
 
 class GeoIP:
@@ -0,0 +1,106 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+import contextlib
+import logging
+from typing import AsyncIterator, Counter, Optional
+
+import aiohttp
+import yarl
+
+log = logging.getLogger("subiquity.server.http_client")
+
+
+class HTTPClient:
+    """The server's shared client for outgoing HTTP requests.
+
+    All requests go through a single aiohttp session, so connections (and
+    TLS sessions) are reused and DNS answers are cached between lookups.
+    Requests are sent through the proxy configured in the ProxyModel, if
+    any, and the number of concurrent connections to a single host is
+    capped so that a slow host cannot use up the whole pool.
+    """
+
+    def __init__(
+        self,
+        app,
+        *,
+        limit: int = 32,
+        limit_per_host: int = 4,
+        dns_ttl: int = 300,
+        timeout: float = 30,
+    ):
+        self.app = app
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._requests: Counter[str] = collections.Counter()
+        self._errors: Counter[str] = collections.Counter()
+        self._sessions_created = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout
+            )
+            self._sessions_created += 1
+        return self._session
+
+    def _proxy(self) -> Optional[str]:
+        # aiohttp keys pooled connections on the proxy too, so nothing
+        # needs resetting when the proxy is changed.
+        return self.app.base_model.proxy.proxy or None
+
+    @contextlib.asynccontextmanager
+    async def request(
+        self, method: str, url: str, **kwargs
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        host = yarl.URL(url).host or ""
+        self._requests[host] += 1
+        kwargs.setdefault("proxy", self._proxy())
+        try:
+            async with self._get_session().request(method, url, **kwargs) as resp:
+                yield resp
+        except aiohttp.ClientError:
+            self._errors[host] += 1
+            raise
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def metrics(self) -> dict:
+        """Return counters about the requests made so far."""
+        return {
+            "requests": dict(self._requests),
+            "errors": dict(self._errors),
+            "sessions_created": self._sessions_created,
+        }
+
+    async def close(self) -> None:
+        if self._session is not None:
+            log.debug("closing HTTP client: %s", self.metrics())
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,151 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Check files against an md5sum.txt, as found at the root of the ISO."""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import logging
+import os
+import threading
+from typing import Callable, Iterable, List, Optional, Set
+
+import attr
+
+log = logging.getLogger("subiquity.server.md5check")
+
+# Size of the reads done when hashing a file. Reading install media in
+# large sequential chunks is much faster than the default buffer size.
+READ_SIZE = 8 << 20
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Md5Entry:
+    # Path relative to the root of the media, without the leading "./".
+    path: str
+    md5: str
+
+
+def parse_md5sums(content: str) -> List[Md5Entry]:
+    entries = []
+    for line in content.splitlines():
+        md5, sep, path = line.partition("  ")
+        if not sep:
+            continue
+        if path.startswith("./"):
+            path = path[2:]
+        entries.append(Md5Entry(path=path, md5=md5.lower()))
+    return entries
+
+
+def squashfs_layers(path: str, langs: Iterable[str] = ()) -> Set[str]:
+    """Return the names of the squashfs files a layered source is made of.
+
+    A source at "minimal.standard.squashfs" is made of "minimal.squashfs"
+    and "minimal.standard.squashfs", plus the per-language layers
+    ("minimal.en.squashfs", ...) of each of them for the given langs.
+    """
+    base, ext = os.path.splitext(os.path.basename(path))
+    parts = base.split(".")
+    layers = set()
+    for i in range(1, len(parts) + 1):
+        prefix = ".".join(parts[:i])
+        layers.add(prefix + ext)
+        for lang in langs:
+            layers.add(prefix + "." + lang + ext)
+    return layers
+
+
+def md5_file(path: str, progress: Optional[Callable[[int], None]] = None) -> str:
+    h = hashlib.md5()
+    buf = bytearray(READ_SIZE)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as fp:
+        try:
+            os.posix_fadvise(fp.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+        while True:
+            n = fp.readinto(buf)
+            if not n:
+                break
+            # hashlib releases the GIL for large updates, so files hashed
+            # in different threads really are hashed in parallel.
+            h.update(view[:n])
+            if progress is not None:
+                progress(n)
+    return h.hexdigest()
+
+
+class Md5Checker:
+    """Check files under root against their expected md5 in a thread pool.
+
+    bytes_checked is updated as files are read, on_checked(entry, ok) is
+    called in the event loop as each file is done.
+    """
+
+    def __init__(self, root: str, max_workers: int = 4):
+        self.root = root
+        self.max_workers = max_workers
+        self.bytes_checked = 0
+        self._lock = threading.Lock()
+
+    def _progress(self, n: int) -> None:
+        with self._lock:
+            self.bytes_checked += n
+
+    def _check_one(self, entry: Md5Entry) -> bool:
+        try:
+            md5 = md5_file(os.path.join(self.root, entry.path), self._progress)
+        except OSError as exc:
+            log.debug("checking %s failed: %r", entry.path, exc)
+            return False
+        if md5 != entry.md5:
+            log.debug("%s has md5 %s, expected %s", entry.path, md5, entry.md5)
+            return False
+        return True
+
+    def size(self, entry: Md5Entry) -> int:
+        try:
+            return os.stat(os.path.join(self.root, entry.path)).st_size
+        except OSError:
+            return 0
+
+    async def check(
+        self,
+        entries: List[Md5Entry],
+        on_checked: Callable[[Md5Entry, bool], None],
+    ) -> List[str]:
+        """Check entries, returning the paths of the files that failed."""
+        failed = []
+        loop = asyncio.get_running_loop()
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="md5check"
+        )
+
+        async def check_one(entry):
+            ok = await loop.run_in_executor(executor, self._check_one, entry)
+            on_checked(entry, ok)
+            if not ok:
+                failed.append(entry.path)
+
+        try:
+            await asyncio.gather(*(check_one(entry) for entry in entries))
+        finally:
+            # Do not block the event loop waiting for files being hashed
+            # if we are cancelled.
+            executor.shutdown(wait=False, cancel_futures=True)
+        return failed
@@ -0,0 +1,177 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Match the devices of the system against the Modaliases of the pool.
+
+Packages that ship drivers declare the devices they support in the
+Modaliases field of their stanza in the archive's Packages file, e.g.
+
+  Modaliases: nvidia(pci:v000010DEd00001C82sv*sd*bc03sc*i*, ...)
+
+which is what ubuntu-drivers uses to find drivers. build_index collects
+these fields from the Packages files of the pool when the ISO is built,
+so that the installer can recommend drivers without setting up an
+overlay and running ubuntu-drivers in it.
+"""
+
+import collections
+import fnmatch
+import glob
+import gzip
+import json
+import logging
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+log = logging.getLogger("subiquity.server.modalias_index")
+
+# Where the index is written on the ISO, next to install-sources.yaml.
+MODALIAS_INDEX_PATH = "/cdrom/casper/modalias-index.json"
+
+_MODULE_ALIASES = re.compile(r"([^\s(,]+)\(([^)]*)\)")
+_WILDCARDS = re.compile(r"[*?\[]")
+_VERSIONED = re.compile(r"(?P<name>.*?)-(?P<version>[0-9]+)(?P<flavour>(-[a-z]+)*)")
+
+
+def parse_modaliases(value: str) -> List[str]:
+    """Return the patterns listed in the value of a Modaliases field."""
+    patterns = []
+    for _module, aliases in _MODULE_ALIASES.findall(value):
+        patterns.extend(a.strip() for a in aliases.split(",") if a.strip())
+    return patterns
+
+
+def _stanzas(fp) -> Iterator[Dict[str, str]]:
+    stanza: Dict[str, str] = {}
+    key = None
+    for line in fp:
+        line = line.rstrip("\n")
+        if not line:
+            if stanza:
+                yield stanza
+            stanza = {}
+            key = None
+        elif line[0] in " \t":
+            if key is not None:
+                stanza[key] += " " + line.strip()
+        else:
+            key, _, value = line.partition(":")
+            stanza[key] = value.strip()
+    if stanza:
+        yield stanza
+
+
+def build_index(packages_files: Iterable[str]) -> Dict[str, List[str]]:
+    """Map each modalias pattern found in packages_files to its packages.
+
+    Files ending in .gz are decompressed on the fly.
+    """
+    index: Dict[str, Set[str]] = collections.defaultdict(set)
+    for path in packages_files:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as fp:
+            for stanza in _stanzas(fp):
+                if "Modaliases" not in stanza or "Package" not in stanza:
+                    continue
+                for pattern in parse_modaliases(stanza["Modaliases"]):
+                    index[pattern].add(stanza["Package"])
+    return {pattern: sorted(pkgs) for pattern, pkgs in sorted(index.items())}
+
+
+def read_system_modaliases(sysfs: str = "/sys") -> Set[str]:
+    modaliases = set()
+    for path in glob.glob(os.path.join(sysfs, "bus/*/devices/*/modalias")):
+        try:
+            with open(path) as fp:
+                modalias = fp.read().strip()
+        except OSError:
+            continue
+        if modalias:
+            modaliases.add(modalias)
+    return modaliases
+
+
+class ModaliasIndex:
+    """Look up the packages supporting a set of modaliases.
+
+    Patterns are bucketed by their literal prefix, i.e. everything up to
+    the first wildcard, so that each modalias is only compared against
+    the few patterns that can possibly match it.
+    """
+
+    def __init__(self, index: Dict[str, List[str]]) -> None:
+        self._buckets: Dict[str, List[str]] = collections.defaultdict(list)
+        self._packages = index
+        for pattern in index:
+            m = _WILDCARDS.search(pattern)
+            prefix = pattern if m is None else pattern[: m.start()]
+            self._buckets[prefix].append(pattern)
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._buckets})
+
+    @classmethod
+    def load(cls, path: str = MODALIAS_INDEX_PATH) -> Optional["ModaliasIndex"]:
+        try:
+            with open(path) as fp:
+                return cls(json.load(fp))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            log.warning("could not load modalias index %s: %r", path, exc)
+            return None
+
+    def packages_for(self, modaliases: Iterable[str]) -> Set[str]:
+        packages: Set[str] = set()
+        for modalias in modaliases:
+            for length in self._prefix_lengths:
+                if length > len(modalias):
+                    break
+                for pattern in self._buckets.get(modalias[:length], ()):
+                    if fnmatch.fnmatchcase(modalias, pattern):
+                        packages.update(self._packages[pattern])
+        return packages
+
+
+def recommend(packages: Iterable[str], gpgpu: bool) -> List[str]:
+    """Pick, like ubuntu-drivers list --recommended, one package per driver.
+
+    Packages that only differ by version, like nvidia-driver-535 and
+    nvidia-driver-550, are alternatives and only the newest one is kept.
+    The -server flavours are preferred for gpgpu and avoided otherwise.
+    This is an approximation of what ubuntu-drivers does and its result
+    is later confirmed by running it.
+    """
+    plain: List[str] = []
+    versioned: Dict[str, List[str]] = collections.defaultdict(list)
+    for package in packages:
+        if package.startswith("oem-") and package.endswith("-meta"):
+            continue
+        m = _VERSIONED.fullmatch(package)
+        if m is None:
+            plain.append(package)
+        else:
+            versioned[m.group("name")].append(package)
+
+    def preference(package):
+        m = _VERSIONED.fullmatch(package)
+        flavours = m.group("flavour").split("-")[1:]
+        return (
+            ("server" in flavours) == gpgpu,
+            int(m.group("version")),
+            -len(flavours),
+        )
+
+    recommended = plain + [max(alts, key=preference) for alts in versioned.values()]
+    return sorted(recommended)
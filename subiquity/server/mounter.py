@@ -13,14 +13,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import contextlib
 import functools
 import logging
 import os
 import shutil
+import subprocess
 import tempfile
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import AsyncIterator, Dict, List, Optional, Union
 
 import attr
 
@@ -36,13 +38,16 @@ class TmpFileSet:
         self._tdirs.append(d)
         return d
 
+    def remove(self, d):
+        try:
+            shutil.rmtree(d)
+            self._tdirs.remove(d)
+        except OSError as ose:
+            log.warning(f"failed to rmtree {d}: {ose}")
+
     def cleanup(self):
         for d in self._tdirs[:]:
-            try:
-                shutil.rmtree(d)
-                self._tdirs.remove(d)
-            except OSError as ose:
-                log.warning(f"failed to rmtree {d}: {ose}")
+            self.remove(d)
 
 
 class OverlayCleanupError(Exception):
@@ -87,6 +92,12 @@ class OverlayMountpoint(_MountBase):
 Lower = Union[Mountpoint, str, OverlayMountpoint]
 
 
+@attr.s(auto_attribs=True, kw_only=True)
+class _PooledOverlay:
+    overlay: OverlayMountpoint
+    in_use: bool = False
+
+
 @functools.singledispatch
 def lowerdir_for(x):
     """Return value suitable for passing to the lowerdir= overlayfs option."""
@@ -120,6 +131,12 @@ class Mounter:
         self.app = app
         self.tmpfiles = TmpFileSet()
         self._mounts: List[Mountpoint] = []
+        # The temporary directory holding the upper and work directories of
+        # each overlay, by mountpoint.
+        self._overlay_dirs: Dict[str, str] = {}
+        # Overlays handed out by pooled_overlay, by lowerdir option.
+        self._overlay_pool: Dict[str, List[_PooledOverlay]] = {}
+        self._overlay_pool_lock = asyncio.Lock()
 
     async def mount(self, device, mountpoint=None, options=None, type=None):
         opts = []
@@ -147,11 +164,13 @@ class Mounter:
         return m
 
     async def unmount(self, mountpoint: Mountpoint, remove=True):
-        if remove:
-            self._mounts.remove(mountpoint)
         await self.app.command_runner.run(
             ["umount", mountpoint.mountpoint], private_mounts=False
         )
+        # Only forget about the mount once it is really gone, so that
+        # cleanup() can try again.
+        if remove:
+            self._mounts.remove(mountpoint)
         if mountpoint.created:
             path = Path(mountpoint.mountpoint)
             if path.is_dir():
@@ -181,13 +200,85 @@ class Mounter:
         options = f"lowerdir={lowerdir},upperdir={upperdir},workdir={workdir}"
 
         mount = await self.mount("overlay", target, options=options, type="overlay")
+        self._overlay_dirs[mount.mountpoint] = tdir
 
         return OverlayMountpoint(lowers=lowers, mountpoint=mount.p(), upperdir=upperdir)
 
+    async def teardown_overlay(self, overlay: OverlayMountpoint) -> None:
+        """Unmount an overlay set up by setup_overlay and remove its upper
+        and work directories."""
+        for mount in self._mounts:
+            if mount.mountpoint == overlay.mountpoint:
+                break
+        else:
+            raise ValueError(f"{overlay.mountpoint} is not mounted")
+        try:
+            await self.unmount(mount)
+        except subprocess.CalledProcessError as exc:
+            raise OverlayCleanupError from exc
+        self.tmpfiles.remove(self._overlay_dirs.pop(overlay.mountpoint))
+
+    async def _release_idle_overlays(self, keep: str) -> None:
+        for key, pool in list(self._overlay_pool.items()):
+            if key == keep:
+                continue
+            for pooled in pool[:]:
+                if pooled.in_use:
+                    continue
+                pool.remove(pooled)
+                try:
+                    await self.teardown_overlay(pooled.overlay)
+                except OverlayCleanupError:
+                    log.exception("failed to tear down unused overlay")
+            if not pool:
+                del self._overlay_pool[key]
+
+    @contextlib.asynccontextmanager
+    async def pooled_overlay(
+        self, lowers: List[Lower]
+    ) -> AsyncIterator[OverlayMountpoint]:
+        """Use an overlay over lowers from a pool of overlays.
+
+        Concurrent users each get an overlay with its own upper directory, so
+        they can write to it. Once released, an overlay is reused by the
+        next user of the same lower layers, who sees the changes made by the
+        previous users.
+
+        Overlays are not torn down as soon as they are unused but only when
+        an overlay over different layers is needed, or on cleanup().
+        """
+        key = lowerdir_for(lowers)
+        async with self._overlay_pool_lock:
+            pool = self._overlay_pool.setdefault(key, [])
+            for pooled in pool:
+                if not pooled.in_use:
+                    break
+            else:
+                await self._release_idle_overlays(keep=key)
+                overlay = await self.setup_overlay(lowers)
+                pooled = _PooledOverlay(overlay=overlay)
+                pool.append(pooled)
+            pooled.in_use = True
+        try:
+            yield pooled.overlay
+        finally:
+            pooled.in_use = False
+
     async def cleanup(self):
-        for m in reversed(self._mounts):
-            await self.unmount(m, remove=False)
-        self.tmpfiles.cleanup()
+        self._overlay_pool.clear()
+        for m in reversed(self._mounts[:]):
+            try:
+                await self.unmount(m)
+            except subprocess.CalledProcessError as exc:
+                log.warning("failed to unmount %s: %r", m.mountpoint, exc)
+                continue
+            tdir = self._overlay_dirs.pop(m.mountpoint, None)
+            if tdir is not None:
+                self.tmpfiles.remove(tdir)
+        # Do not remove the upper directory of an overlay that is still
+        # mounted.
+        if not self._overlay_dirs:
+            self.tmpfiles.cleanup()
 
     async def bind_mount_tree(self, src, dst):
         """bind-mount files and directories from src that are not already
@@ -245,3 +336,6 @@ class DryRunMounter(Mounter):
         )
 
         return OverlayMountpoint(lowers=[source], mountpoint=target, upperdir=None)
+
+    async def teardown_overlay(self, overlay: OverlayMountpoint) -> None:
+        self.tmpfiles.remove(overlay.mountpoint)
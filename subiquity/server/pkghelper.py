@@ -16,11 +16,12 @@
 import asyncio
 import logging
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 import apt
 
 from subiquity.common.types import PackageInstallState
+from subiquitycore.async_helpers import run_in_thread
 from subiquitycore.utils import arun_command
 
 log = logging.getLogger("subiquity.server.pkghelper")
@@ -32,18 +33,50 @@ class PackageInstaller:
     Sometimes we need packages from the pool in the live session, for
     example to install wpasupplicant when wlan interfaces are detected
     by the server installer.
+
+    The apt cache is loaded in a thread (start_loading_cache can be called
+    early to have it ready by the time it is needed) and installs that are
+    requested while another one is running are merged into a single
+    apt-get transaction.
     """
 
     def __init__(self):
         self.pkgs: Dict[str, asyncio.Task] = {}
         self._cache: Optional[apt.Cache] = None
+        self._cache_task: Optional[asyncio.Task] = None
+        # Packages waiting for the next apt-get transaction.
+        self._queued: Dict[str, asyncio.Future] = {}
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._apt_lock = asyncio.Lock()
 
     @property
     def cache(self):
+        # Prefer get_cache(), this blocks if the cache is not loaded yet.
         if self._cache is None:
             self._cache = apt.Cache()
         return self._cache
 
+    def start_loading_cache(self) -> None:
+        if self._cache is None and self._cache_task is None:
+            self._cache_task = asyncio.create_task(run_in_thread(apt.Cache))
+            self._cache_task.add_done_callback(self._cache_loaded)
+
+    def _cache_loaded(self, task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            log.warning("loading apt cache failed: %r", task.exception())
+            # Allow a later get_cache() to try again.
+            self._cache_task = None
+
+    async def get_cache(self) -> apt.Cache:
+        if self._cache is None:
+            self.start_loading_cache()
+            cache = await asyncio.shield(self._cache_task)
+            if self._cache is None:
+                self._cache = cache
+        return self._cache
+
     def state_for_pkg(self, pkgname: str) -> PackageInstallState:
         t = self.pkgs.get(pkgname)
         if t is None:
@@ -61,9 +94,15 @@ class PackageInstaller:
         self.start_installing_pkg(pkgname)
         return await self.pkgs[pkgname]
 
+    async def install_pkgs(self, pkgnames) -> Dict[str, PackageInstallState]:
+        for pkgname in pkgnames:
+            self.start_installing_pkg(pkgname)
+        states = await asyncio.gather(*(self.pkgs[pkgname] for pkgname in pkgnames))
+        return dict(zip(pkgnames, states))
+
     async def _install_pkg(self, pkgname: str) -> PackageInstallState:
         log.debug("checking if %s is available", pkgname)
-        binpkg = self.cache.get(pkgname)
+        binpkg = (await self.get_cache()).get(pkgname)
         if not binpkg:
             log.debug("%s not found", pkgname)
             return PackageInstallState.NOT_AVAILABLE
@@ -75,6 +114,44 @@ class PackageInstaller:
                 "%s not available from cdrom (rather %s)", pkgname, binpkg.candidate.uri
             )
             return PackageInstallState.NOT_AVAILABLE
+        return await self._queue_install(pkgname)
+
+    async def _queue_install(self, pkgname: str) -> PackageInstallState:
+        fut = asyncio.get_running_loop().create_future()
+        self._queued[pkgname] = fut
+        if len(self._queued) == 1:
+            # First package of a new transaction. Anything queued before
+            # the transaction starts is installed along with it.
+            task = asyncio.create_task(self._run_queued())
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+        return await fut
+
+    async def _run_queued(self) -> None:
+        async with self._apt_lock:
+            queued, self._queued = self._queued, {}
+            pkgnames = sorted(queued)
+            try:
+                if await self._apt_get_install(pkgnames):
+                    results = {pkgname: True for pkgname in pkgnames}
+                elif len(pkgnames) == 1:
+                    results = {pkgnames[0]: False}
+                else:
+                    # Find out which packages are actually at fault.
+                    results = {}
+                    for pkgname in pkgnames:
+                        results[pkgname] = await self._apt_get_install([pkgname])
+            except Exception as exc:
+                for fut in queued.values():
+                    fut.set_exception(exc)
+                return
+        for pkgname, fut in queued.items():
+            if results[pkgname]:
+                fut.set_result(PackageInstallState.DONE)
+            else:
+                fut.set_result(PackageInstallState.FAILED)
+
+    async def _apt_get_install(self, pkgnames: List[str]) -> bool:
         env = os.environ.copy()
         env["DEBIAN_FRONTEND"] = "noninteractive"
         apt_opts = [
@@ -83,12 +160,9 @@ class PackageInstaller:
             "--option=Dpkg::Options::=--force-unsafe-io",
             "--option=Dpkg::Options::=--force-confold",
         ]
-        cp = await arun_command(["apt-get", "install"] + apt_opts + [pkgname], env=env)
-        log.debug("apt-get install %s returned %s", pkgname, cp)
-        if cp.returncode == 0:
-            return PackageInstallState.DONE
-        else:
-            return PackageInstallState.FAILED
+        cp = await arun_command(["apt-get", "install"] + apt_opts + pkgnames, env=env)
+        log.debug("apt-get install %s returned %s", " ".join(pkgnames), cp)
+        return cp.returncode == 0
 
 
 class DryRunPackageInstaller(PackageInstaller):
@@ -115,16 +189,19 @@ class DryRunPackageInstaller(PackageInstaller):
             return await self.package_specific_impl[pkgname]()
 
         log.debug("checking if %s is available", pkgname)
-        binpkg = self.cache.get(pkgname)
+        binpkg = (await self.get_cache()).get(pkgname)
         if not binpkg:
             log.debug("%s not found", pkgname)
             return PackageInstallState.NOT_AVAILABLE
         if binpkg.installed:
             log.debug("%s already installed", pkgname)
             return PackageInstallState.DONE
-        log.debug("dry-run apt-get install %s", pkgname)
+        return await self._queue_install(pkgname)
+
+    async def _apt_get_install(self, pkgnames: List[str]) -> bool:
+        log.debug("dry-run apt-get install %s", " ".join(pkgnames))
         await asyncio.sleep(2 / self.scale_factor)
-        return PackageInstallState.DONE
+        return True
 
 
 def get_package_installer(app):
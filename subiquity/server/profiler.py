@@ -0,0 +1,134 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Sample the stacks of all the threads of the running server.
+
+A thread wakes up every interval and records the stack of every other
+thread. The samples are written in the "folded" format understood by
+flamegraph.pl and https://www.speedscope.app, one line per distinct
+stack:
+
+  MainThread;_run_once (.../asyncio/base_events.py:1845);... 42
+
+While sampling, a LoopWatchdog records the stack of the callbacks that
+block the event loop for more than lag_threshold seconds as stalls.
+"""
+
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from subiquity.common.types import LoopStall
+from subiquitycore.watchdog import LoopWatchdog, Stall
+
+
+def fold(thread_name: str, frame) -> str:
+    """Return the stack of frame, outermost first, separated by ';'."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(thread_name)
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        *,
+        interval: float = 0.005,
+        lag_threshold: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.loop = loop
+        self.interval = interval
+        self.lag_threshold = lag_threshold
+        self.clock = clock
+        self.samples: Dict[str, int] = collections.Counter()
+        self.sample_count = 0
+        self.stalls: List[LoopStall] = []
+        self.started = 0.0
+        self._watchdog: Optional[LoopWatchdog] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start sampling. Must be called from the event loop thread."""
+        self.started = self.clock()
+        self._watchdog = LoopWatchdog(
+            self.loop, self.lag_threshold, self._on_stall, clock=self.clock
+        )
+        self._watchdog.start()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="subiquity-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self._watchdog is not None:
+            self._watchdog.stop()
+            self._watchdog = None
+
+    def _on_stall(self, stall: Stall) -> None:
+        self.stalls.append(
+            LoopStall(
+                start=stall.start - self.started,
+                duration=stall.duration,
+                stack=stall.stack,
+            )
+        )
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident != me:
+                    self.samples[fold(names.get(ident, str(ident)), frame)] += 1
+            self.sample_count += 1
+
+    def write(self, directory: str, stamp: str) -> List[str]:
+        """Write the samples and the stalls, returning the paths written."""
+        folded = os.path.join(directory, f"subiquity-profile.{stamp}.folded")
+        with open(folded, "w") as fp:
+            for stack, count in sorted(self.samples.items()):
+                fp.write(f"{stack} {count}\n")
+        stalls = os.path.join(directory, f"subiquity-profile.{stamp}.stalls")
+        with open(stalls, "w") as fp:
+            for stall in self.stalls:
+                fp.write(
+                    f"event loop blocked for {stall.duration:.3f}s "
+                    f"at +{stall.start:.3f}s:\n"
+                )
+                fp.writelines(stall.stack)
+                fp.write("\n")
+        return [folded, stalls]
@@ -18,16 +18,54 @@ import os
 import random
 import subprocess
 from contextlib import suppress
-from typing import List, Optional
+from typing import Callable, List, Optional, Set
 
 from subiquitycore.utils import astart_command
 
 
+async def forward_output(
+    stream: asyncio.StreamReader, output: Callable[[str], None]
+) -> None:
+    """Call output with each line read from stream, until its end."""
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:
+            # The line was longer than the limit of the stream and has been
+            # dropped.
+            continue
+        if not line:
+            return
+        output(line.decode("utf-8", errors="replace").rstrip("\n"))
+
+
 class LoggedCommandRunner:
-    """Class that executes commands using systemd-run."""
+    """Class that executes commands using systemd-run.
+
+    Short commands that do not need private mounts can instead be run
+    directly, which avoids the D-Bus round trip and transient unit setup
+    that systemd-run costs. Their output still ends up in the journal
+    under the same identifier, by way of systemd-cat. Whether a command is
+    run directly is decided for each command, see _run_directly.
+
+    If output is set, the output of the commands that is not captured is
+    read by the runner and passed to output line by line instead of going
+    to the journal.
+    """
 
-    def __init__(self, ident, *, use_systemd_user: Optional[bool] = None) -> None:
+    # Programs that are always run directly, unless private mounts are
+    # requested.
+    direct_commands: Set[str] = {"chzdev", "mountpoint"}
+
+    def __init__(
+        self,
+        ident,
+        *,
+        use_systemd_user: Optional[bool] = None,
+        output: Optional[Callable[[str], None]] = None,
+    ) -> None:
         self.ident = ident
+        self.output = output
         self.env_allowlist = [
             "PATH",
             "PYTHONPATH",
@@ -70,25 +108,79 @@ class LoggedCommandRunner:
 
         return prefix + cmd
 
+    def _forge_direct_cmd(self, cmd: List[str], capture: bool) -> List[str]:
+        """Return the supplied command, prefixed to log its output if it
+        is not captured."""
+        if capture:
+            return cmd
+        return [
+            "systemd-cat",
+            "--level-prefix=false",
+            f"--identifier={self.ident}",
+            "--",
+        ] + cmd
+
+    def _direct_env(self):
+        """Return the environment of a directly run command, which is the
+        same as what systemd-run passes with --setenv."""
+        return {key: os.environ[key] for key in self.env_allowlist if key in os.environ}
+
+    def _run_directly(
+        self, cmd: List[str], private_mounts: bool, direct: Optional[bool]
+    ) -> bool:
+        if private_mounts:
+            if direct:
+                raise ValueError("cannot run a command directly with private mounts")
+            return False
+        if direct is not None:
+            return direct
+        return os.path.basename(cmd[0]) in self.direct_commands
+
     async def start(
         self,
         cmd: List[str],
         *,
         private_mounts: bool = False,
         capture: bool = False,
+        direct: Optional[bool] = None,
         **astart_kwargs,
     ) -> asyncio.subprocess.Process:
-        forged: List[str] = self._forge_systemd_cmd(
-            cmd, private_mounts=private_mounts, capture=capture
+        """Start cmd, through systemd-run or directly.
+
+        direct=True or False forces the choice, by default commands listed
+        in direct_commands are run directly.
+        """
+        forward = (
+            self.output is not None and not capture and "stdout" not in astart_kwargs
         )
+        if forward:
+            astart_kwargs.update(stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        forged: List[str]
+        if self._run_directly(cmd, private_mounts, direct):
+            forged = self._forge_direct_cmd(cmd, capture=capture or forward)
+            astart_kwargs.setdefault("env", self._direct_env())
+        else:
+            forged = self._forge_systemd_cmd(
+                cmd, private_mounts=private_mounts, capture=capture or forward
+            )
         proc = await astart_command(forged, **astart_kwargs)
         proc.args = forged
+        proc.output_task = None
+        if forward:
+            proc.output_task = asyncio.create_task(
+                forward_output(proc.stdout, self.output)
+            )
         return proc
 
     async def wait(
         self, proc: asyncio.subprocess.Process
     ) -> subprocess.CompletedProcess:
-        stdout, stderr = await proc.communicate()
+        if getattr(proc, "output_task", None) is not None:
+            await proc.output_task
+            await proc.wait()
+            stdout = stderr = None
+        else:
+            stdout, stderr = await proc.communicate()
         # .communicate() forces returncode to be set to a value
         assert proc.returncode is not None
         if proc.returncode != 0:
@@ -107,24 +199,33 @@ class LoggedCommandRunner:
 
 class DryRunCommandRunner(LoggedCommandRunner):
     def __init__(
-        self, ident, delay, *, use_systemd_user: Optional[bool] = None
+        self,
+        ident,
+        delay,
+        *,
+        use_systemd_user: Optional[bool] = None,
+        output: Optional[Callable[[str], None]] = None,
     ) -> None:
-        super().__init__(ident, use_systemd_user=use_systemd_user)
+        super().__init__(ident, use_systemd_user=use_systemd_user, output=output)
         self.delay = delay
 
-    def _forge_systemd_cmd(
-        self, cmd: List[str], private_mounts: bool, capture: bool
-    ) -> List[str]:
+    def _dry_run_cmd(self, cmd: List[str]) -> List[str]:
         if "scripts/replay-curtin-log.py" in cmd:
             # We actually want to run this command
-            prefixed_command = cmd
+            return cmd
         else:
-            prefixed_command = ["echo", "not running:"] + cmd
+            return ["echo", "not running:"] + cmd
 
+    def _forge_systemd_cmd(
+        self, cmd: List[str], private_mounts: bool, capture: bool
+    ) -> List[str]:
         return super()._forge_systemd_cmd(
-            prefixed_command, private_mounts=private_mounts, capture=capture
+            self._dry_run_cmd(cmd), private_mounts=private_mounts, capture=capture
         )
 
+    def _forge_direct_cmd(self, cmd: List[str], capture: bool) -> List[str]:
+        return super()._forge_direct_cmd(self._dry_run_cmd(cmd), capture=capture)
+
     def _get_delay_for_cmd(self, cmd: List[str]) -> float:
         if "scripts/replay-curtin-log.py" in cmd:
             return 0
@@ -141,11 +242,16 @@ class DryRunCommandRunner(LoggedCommandRunner):
         *,
         private_mounts: bool = False,
         capture: bool = False,
+        direct: Optional[bool] = None,
         **astart_kwargs,
     ) -> asyncio.subprocess.Process:
         delay = self._get_delay_for_cmd(cmd)
         proc = await super().start(
-            cmd, private_mounts=private_mounts, capture=capture, **astart_kwargs
+            cmd,
+            private_mounts=private_mounts,
+            capture=capture,
+            direct=direct,
+            **astart_kwargs,
         )
         await asyncio.sleep(delay)
         return proc
@@ -153,6 +259,8 @@ class DryRunCommandRunner(LoggedCommandRunner):
 
 def get_command_runner(app):
     if app.opts.dry_run:
-        return DryRunCommandRunner(app.log_syslog_id, 2 / app.scale_factor)
+        return DryRunCommandRunner(
+            app.log_syslog_id, 2 / app.scale_factor, output=app.publish_log_line
+        )
     else:
-        return LoggedCommandRunner(app.log_syslog_id)
+        return LoggedCommandRunner(app.log_syslog_id, output=app.publish_log_line)
@@ -0,0 +1,82 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Run ubuntu-advantage commands in a single, long-lived process.
+
+This script is run by UAClientWorker with the interpreter of the pro
+client and the path to its ubuntu-advantage script, and must not import
+anything from subiquity. It reads one JSON request per line on stdin:
+
+  {"args": ["status", "--format", "json"], "env": {"UA_CONFIG_FILE": "..."}}
+
+runs the command line in process and writes one JSON reply per line:
+
+  {"returncode": 0, "stdout": "..."}
+
+The first line written tells whether the pro client could be imported.
+The process exits when stdin is closed.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import traceback
+
+
+def main() -> None:
+    script = sys.argv[1]
+    # Keep the real stdout for the replies and send anything written to
+    # file descriptor 1 outside of a command to stderr.
+    channel = os.fdopen(os.dup(1), "w")
+    os.dup2(2, 1)
+
+    def reply(**kw) -> None:
+        channel.write(json.dumps(kw) + "\n")
+        channel.flush()
+
+    try:
+        from uaclient.cli import main as uaclient_main
+    except ImportError as exc:
+        reply(ready=False, error=repr(exc))
+        return
+    reply(ready=True)
+
+    base_env = dict(os.environ)
+    for line in sys.stdin:
+        request = json.loads(line)
+        os.environ.clear()
+        os.environ.update(base_env)
+        os.environ.update(request["env"])
+        sys.argv = [script] + request["args"]
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            try:
+                returncode = uaclient_main(sys.argv)
+            except SystemExit as exc:
+                returncode = exc.code
+            except Exception:
+                traceback.print_exc()
+                returncode = 1
+        if returncode is None:
+            returncode = 0
+        elif not isinstance(returncode, int):
+            returncode = 1
+        reply(returncode=returncode, stdout=stdout.getvalue())
+
+
+if __name__ == "__main__":
+    main()
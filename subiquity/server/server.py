@@ -15,13 +15,13 @@
 
 import asyncio
 import copy
+import json
 import logging
 import os
 import sys
 import time
 from typing import Any, List, Optional
 
-import jsonschema
 import yaml
 from aiohttp import web
 from jsonschema.exceptions import ValidationError
@@ -43,23 +43,32 @@ from subiquity.common.types import (
     ApplicationState,
     ApplicationStatus,
     ErrorReportRef,
+    InstallerEvent,
     KeyFingerprint,
     LiveSessionSSHInfo,
     NonReportableError,
     PasswordKind,
 )
 from subiquity.models.subiquity import ModelNames, SubiquityModel
-from subiquity.server.autoinstall import AutoinstallError, AutoinstallValidationError
+from subiquity.server.autoinstall import (
+    AutoinstallError,
+    AutoinstallValidationError,
+    validate_with_schema,
+)
 from subiquity.server.controller import SubiquityController
+from subiquity.server.debug import DEBUG_API_CMDLINE_FLAG, DebugController
 from subiquity.server.dryrun import DRConfig
 from subiquity.server.errors import ErrorController
 from subiquity.server.event_listener import EventListener
+from subiquity.server.event_stream import EventStream
 from subiquity.server.geoip import DryRunGeoIPStrategy, GeoIP, HTTPGeoIPStrategy
+from subiquity.server.http_client import HTTPClient
 from subiquity.server.nonreportable import NonReportableException
 from subiquity.server.pkghelper import get_package_installer
 from subiquity.server.runner import get_command_runner
 from subiquity.server.snapd.api import make_api_client
 from subiquity.server.snapd.info import SnapdInfo
+from subiquity.server.timeline import TimelineProfiler, write_timeline
 from subiquity.server.types import InstallerChannels
 from subiquitycore.async_helpers import run_bg_task, run_in_thread
 from subiquitycore.context import Context, with_context
@@ -102,6 +111,11 @@ class MetaController:
             log_syslog_id=self.app.log_syslog_id,
         )
 
+    async def events_GET(
+        self, after: int = 0, limit: int = 1000
+    ) -> List[InstallerEvent]:
+        return await self.app.event_stream.wait_for_events_after(after, limit)
+
     async def confirm_POST(self, tty: str) -> None:
         self.app.confirming_tty = tty
         await self.app.base_model.confirm()
@@ -310,6 +324,7 @@ class SubiquityServer(Application):
         self.block_log_dir = block_log_dir
         self.cloud_init_ok = None
         self.state_event = asyncio.Event()
+        self.event_stream = EventStream()
         self.update_state(ApplicationState.STARTING_UP)
         self.interactive = None
         self.confirming_tty = ""
@@ -334,6 +349,8 @@ class SubiquityServer(Application):
         else:
             self.prober = Prober(opts.machine_config, self.debug_flags)
         self.kernel_cmdline = opts.kernel_cmdline
+        if opts.snapd_socket is not None:
+            self.snapd_socket_path = opts.snapd_socket
         if opts.snaps_from_examples:
             connection = get_fake_connection(self.scale_factor, opts.output_base)
             self.snapd = AsyncSnapd(connection)
@@ -350,13 +367,16 @@ class SubiquityServer(Application):
             self.snapd = None
         self.note_data_for_apport("SnapUpdated", str(self.updated))
         self.event_listeners: list[EventListener] = []
+        self.timeline = TimelineProfiler()
+        self.add_event_listener(self.timeline)
         self.autoinstall_config = None
         self.hub.subscribe(InstallerChannels.NETWORK_UP, self._network_change)
         self.hub.subscribe(InstallerChannels.NETWORK_PROXY_SET, self._proxy_set)
+        self.http_client = HTTPClient(self)
         if self.opts.dry_run:
             geoip_strategy = DryRunGeoIPStrategy()
         else:
-            geoip_strategy = HTTPGeoIPStrategy()
+            geoip_strategy = HTTPGeoIPStrategy(self.http_client)
 
         self.geoip = GeoIP(self, strategy=geoip_strategy)
 
@@ -380,7 +400,8 @@ class SubiquityServer(Application):
 
         self.base_model.set_source_variant(variant)
 
-    def load_serialized_state(self):
+    async def load_serialized_state(self):
+        await self.state_store.load()
         for controller in self.controllers.instances:
             controller.load_state()
 
@@ -400,7 +421,7 @@ class SubiquityServer(Application):
         install_context: bool = context.get("is-install-context", default=False)
         msg: str = ""
         parent_id: str = ""
-        indent: int = context.full_name().count("/") - 2
+        indent: int = context.depth - 2
 
         # We do filtering on which types of events get reported.
         # For interactive installs, we only want to report the event
@@ -453,16 +474,48 @@ class SubiquityServer(Application):
         else:
             parent_id = ""
 
-        journal.send(
+        self.event_stream.publish(
+            event_type,
             formatted_message,
-            PRIORITY=context.level,
-            SYSLOG_IDENTIFIER=self.event_syslog_id,
-            SUBIQUITY_CONTEXT_NAME=context.full_name(),
-            SUBIQUITY_EVENT_TYPE=event_type,
-            SUBIQUITY_CONTEXT_ID=str(context.id),
-            SUBIQUITY_CONTEXT_PARENT_ID=parent_id,
+            context_id=str(context.id),
+            context_parent_id=parent_id,
+            context_name=name,
+            level=context.level,
         )
 
+        # Clients follow the event stream via the API; the journal is an
+        # optional sink for anyone reading the logs of the live session.
+        if self.opts.journal_events:
+            journal.send(
+                formatted_message,
+                PRIORITY=context.level,
+                SYSLOG_IDENTIFIER=self.event_syslog_id,
+                SUBIQUITY_CONTEXT_NAME=name,
+                SUBIQUITY_EVENT_TYPE=event_type,
+                SUBIQUITY_CONTEXT_ID=str(context.id),
+                SUBIQUITY_CONTEXT_PARENT_ID=parent_id,
+            )
+
+    def loop_stalled(self, stall):
+        super().loop_stalled(stall)
+        self.timeline.record_stall(stall)
+
+    def publish_log_line(self, message: str, syslog_id: Optional[str] = None):
+        """Publish a line of command output.
+
+        Lines for log_syslog_id, the default, are published as "log"
+        events and lines for echo_syslog_id as "echo" events.
+        """
+        if syslog_id is None:
+            syslog_id = self.log_syslog_id
+        if syslog_id == self.echo_syslog_id:
+            self.event_stream.publish("echo", message)
+        else:
+            self.event_stream.publish("log", message)
+            self.hub.broadcast(InstallerChannels.LOG_LINE, message)
+        if self.opts.journal_events:
+            journal.send(message, SYSLOG_IDENTIFIER=syslog_id)
+
     def report_start_event(self, context, description):
         for listener in self.event_listeners:
             listener.report_start_event(context, description)
@@ -497,6 +550,22 @@ class SubiquityServer(Application):
         write_file(self.state_path("server-state"), state.name)
         self.state_event.set()
         self.state_event.clear()
+        self.event_stream.publish("state", state.name)
+        if state in (ApplicationState.DONE, ApplicationState.ERROR):
+            run_bg_task(self._write_timeline())
+
+    async def _write_timeline(self):
+        if self.block_log_dir is None:
+            return
+        # Take the snapshot in the event loop, contexts keep coming and
+        # going while the files are written.
+        trace = self.timeline.chrome_trace()
+        summary = self.timeline.summary()
+        logdir = os.path.dirname(self.block_log_dir)
+        try:
+            await run_in_thread(write_timeline, logdir, trace, summary)
+        except OSError:
+            log.exception("writing the install timeline failed")
 
     def note_file_for_apport(self, key, path):
         self.error_reporter.note_file_for_apport(key, path)
@@ -563,10 +632,22 @@ class SubiquityServer(Application):
                 elif self.state == ApplicationState.NEEDS_CONFIRMATION:
                     if self.base_model.is_postinstall_only(controller.model_name):
                         override_status = "confirm"
+        stall_count = self.watchdog.stall_count if self.watchdog is not None else 0
         if override_status is not None:
             resp = web.Response(headers={"x-status": override_status})
         else:
             resp = await handler(request)
+        if "fatal-loop-stalls" in self.debug_flags and self.watchdog is not None:
+            stalls = self.watchdog.stalls_since(stall_count, asyncio.current_task())
+            if stalls:
+                msg = "request to {} blocked the event loop for {:.3f}s".format(
+                    request.raw_path, max(stall.duration for stall in stalls)
+                )
+                log.error(msg)
+                resp = web.Response(
+                    status=500,
+                    headers={"x-status": "error", "x-error-msg": json.dumps(msg)},
+                )
         if self.updated:
             resp.headers["x-updated"] = "yes"
         else:
@@ -694,7 +775,7 @@ class SubiquityServer(Application):
     def validate_autoinstall(self):
         with self.context.child("core_validation", level="INFO") as ctx:
             try:
-                jsonschema.validate(self.autoinstall_config, self.base_schema)
+                validate_with_schema(self.autoinstall_config, self.base_schema)
             except ValidationError as original_exception:
                 # SubiquityServer currently only checks for these sections
                 # of autoinstall. Hardcode until we have better validation.
@@ -790,6 +871,8 @@ class SubiquityServer(Application):
             from .dryrun import DryRunController
 
             bind(app.router, API.dry_run, DryRunController(self))
+        if self.opts.dry_run or DEBUG_API_CMDLINE_FLAG in self.kernel_cmdline:
+            bind(app.router, API.debug, DebugController(self))
         for controller in self.controllers.instances:
             controller.add_routes(app)
         runner = web.AppRunner(app, keepalive_timeout=0xFFFFFFFF, access_log=None)
@@ -1023,6 +1106,7 @@ class SubiquityServer(Application):
     async def start(self):
         self.controllers.load_all()
         await self.start_api_server()
+        self.package_installer.start_loading_cache()
         self.update_state(ApplicationState.CLOUD_INIT_WAIT)
         await self.wait_for_cloudinit()
         self.set_installer_password()
@@ -1041,11 +1125,17 @@ class SubiquityServer(Application):
         self.load_autoinstall_config(only_early=False)
         if not self.interactive and not self.opts.dry_run:
             open("/run/casper-no-prompt", "w").close()
-        self.load_serialized_state()
+        await self.load_serialized_state()
         self.update_state(ApplicationState.WAITING)
         await super().start()
         await self.apply_autoinstall_config()
 
+    async def run(self):
+        try:
+            await super().run()
+        finally:
+            await self.http_client.close()
+
     def exit(self):
         self.update_state(ApplicationState.EXITED)
         super().exit()
@@ -0,0 +1,259 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""A stand-in for snapd that serves canned responses over a unix socket.
+
+FakeSnapdConnection answers requests in process, which is fine for
+dry-runs but hides everything that happens between subiquity and snapd:
+HTTP over the socket, concurrent requests and how long snapd takes to
+answer. SnapdSimulator serves the same data (examples/snaps by default)
+over a real unix socket, so that a server started with --snapd-socket
+talks to it through SnapdConnection as it would to snapd, with:
+
+ * latency: every response is delayed by latency seconds, plus up to
+   jitter seconds picked at random.
+ * errors: requests whose path matches one of the patterns (as in
+   fnmatch, e.g. "v2/find*") fail with the given HTTP status, and any
+   request fails with a 500 with probability error_rate.
+ * change progression: each GET of v2/changes/$id returns the next of
+   the files in the v2-changes-$id directory or, if change_interval is
+   set, the one reached after that many seconds per file since the
+   change was started.
+
+Run it with:
+
+  python3 -m subiquity.server.snapd.simulator --socket /tmp/snapd.socket
+"""
+
+import argparse
+import asyncio
+import collections
+import fnmatch
+import glob
+import http
+import json
+import logging
+import os
+import random
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+import attr
+from aiohttp import web
+
+from subiquitycore.snapd import FakeSnapdConnection
+
+log = logging.getLogger("subiquity.server.snapd.simulator")
+
+EXAMPLES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
+    "examples",
+    "snaps",
+)
+
+
+def error_response(status: int, message: str) -> web.Response:
+    return web.json_response(
+        {
+            "type": "error",
+            "status-code": status,
+            "status": http.HTTPStatus(status).phrase,
+            "result": {"message": message},
+        },
+        status=status,
+    )
+
+
+@attr.s(auto_attribs=True)
+class _Change:
+    files: List[str]
+    started: float
+    polls: int = 0
+
+    def current(self, now: float, interval: Optional[float]) -> str:
+        if interval is None:
+            index = self.polls
+        else:
+            index = int((now - self.started) / interval)
+        self.polls += 1
+        return self.files[min(index, len(self.files) - 1)]
+
+
+class SnapdSimulator:
+    def __init__(
+        self,
+        snap_data_dir: str = EXAMPLES_DIR,
+        output_base: str = ".subiquity",
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        errors: Optional[Dict[str, int]] = None,
+        error_rate: float = 0.0,
+        change_interval: Optional[float] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.snap_data_dir = snap_data_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.errors = dict(errors or {})
+        self.error_rate = error_rate
+        self.change_interval = change_interval
+        self.random = random.Random(seed)
+        # POST requests are answered the same way as in a dry-run with
+        # the in-process fake.
+        self.fake = FakeSnapdConnection(snap_data_dir, 1, output_base)
+        self.changes: Dict[str, _Change] = {}
+        # Number of requests served, by method and path, e.g. "GET v2/find".
+        self.requests: collections.Counter = collections.Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", self._handle)
+        return app
+
+    async def start(self, socket_path: str) -> None:
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.UnixSite(self._runner, socket_path)
+        await site.start()
+        log.debug("simulating snapd on %s", socket_path)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _injected_error(self, path: str) -> Optional[web.Response]:
+        for pattern, status in self.errors.items():
+            if fnmatch.fnmatchcase(path, pattern):
+                return error_response(status, f"injected error for {path}")
+        if self.error_rate and self.random.random() < self.error_rate:
+            return error_response(500, f"injected random error for {path}")
+        return None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        path = request.match_info["path"]
+        self.requests[f"{request.method} {path}"] += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = self.latency
+            if self.jitter:
+                delay += self.random.uniform(0, self.jitter)
+            if delay:
+                await asyncio.sleep(delay)
+            response = self._injected_error(path)
+            if response is not None:
+                return response
+            if request.method == "GET":
+                return self._get(path, dict(request.query))
+            elif request.method == "POST":
+                return self._post(path, await request.json(), dict(request.query))
+            return error_response(405, f"method {request.method} not allowed")
+        finally:
+            self.in_flight -= 1
+
+    def _get(self, path: str, args: Dict[str, str]) -> web.Response:
+        # The same naming scheme as FakeSnapdConnection.get.
+        filename = path.replace("/", "-")
+        if args:
+            filename += "-" + urlencode(sorted(args.items()))
+        filepath = os.path.join(self.snap_data_dir, filename)
+        if filename in self.changes:
+            change = self.changes[filename]
+            filepath = change.current(time.monotonic(), self.change_interval)
+        elif os.path.exists(filepath + ".json"):
+            filepath += ".json"
+        elif os.path.isdir(filepath):
+            files = sorted(glob.glob(os.path.join(filepath, "*.json")))
+            change = self.changes[filename] = _Change(files, time.monotonic())
+            filepath = change.current(time.monotonic(), self.change_interval)
+        else:
+            return error_response(404, f"no canned response for GET {filename}")
+        with open(filepath) as fp:
+            data = json.load(fp)
+        return web.json_response(data, status=data.get("status-code", 200))
+
+    def _post(self, path: str, body, args: Dict[str, str]) -> web.Response:
+        try:
+            data = self.fake.post(path, body, **args).json()
+        except Exception as exc:
+            return error_response(404, str(exc))
+        if data.get("type") == "async":
+            # A change is (re)started, it progresses from its first state.
+            self.changes.pop(f"v2-changes-{data['change']}", None)
+        return web.json_response(data, status=data.get("status-code", 200))
+
+
+def parse_error(value: str):
+    pattern, sep, status = value.rpartition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected PATTERN=STATUS, got {value!r}")
+    return pattern, int(status)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate snapd on a unix socket.")
+    parser.add_argument("--socket", required=True)
+    parser.add_argument("--snap-data-dir", default=EXAMPLES_DIR)
+    parser.add_argument("--output-base", default=".subiquity")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument(
+        "--error",
+        type=parse_error,
+        action="append",
+        default=[],
+        metavar="PATTERN=STATUS",
+        help="fail the requests whose path matches PATTERN with STATUS",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--change-interval", type=float)
+    parser.add_argument("--seed", type=int)
+    opts = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG)
+
+    simulator = SnapdSimulator(
+        opts.snap_data_dir,
+        opts.output_base,
+        latency=opts.latency,
+        jitter=opts.jitter,
+        errors=dict(opts.error),
+        error_rate=opts.error_rate,
+        change_interval=opts.change_interval,
+        seed=opts.seed,
+    )
+
+    async def serve():
+        await simulator.start(opts.socket)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await simulator.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log.info("requests served: %s", dict(simulator.requests))
+
+
+if __name__ == "__main__":
+    main()
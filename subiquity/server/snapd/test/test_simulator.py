@@ -0,0 +1,95 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import glob
+import json
+import os
+
+import requests
+
+from subiquity.server.snapd.api import make_api_client
+from subiquity.server.snapd.simulator import EXAMPLES_DIR, SnapdSimulator
+from subiquitycore.snapd import AsyncSnapd, SnapdConnection
+from subiquitycore.tests import SubiTestCase
+
+
+class TestSnapdSimulator(SubiTestCase):
+    async def start(self, **kw):
+        tmpdir = self.tmp_dir()
+        os.makedirs(os.path.join(tmpdir, "run/subiquity"))
+        self.simulator = SnapdSimulator(EXAMPLES_DIR, tmpdir, **kw)
+        socket_path = os.path.join(tmpdir, "snapd.socket")
+        await self.simulator.start(socket_path)
+        self.addAsyncCleanup(self.simulator.stop)
+        self.snapd = AsyncSnapd(SnapdConnection("/", socket_path))
+        self.client = make_api_client(self.snapd)
+
+    async def test_get(self):
+        await self.start()
+        [snap] = await self.client.v2.find.GET(name="docker")
+        self.assertEqual("docker", snap.name)
+        self.assertEqual(1, self.simulator.requests["GET v2/find"])
+
+    async def test_get_unknown(self):
+        await self.start()
+        with self.assertRaises(requests.HTTPError) as cm:
+            await self.snapd.get("v2/find", name="no-such-snap")
+        self.assertEqual(404, cm.exception.response.status_code)
+        self.assertEqual("error", cm.exception.response.json()["type"])
+
+    async def test_post_and_wait(self):
+        await self.start()
+        body = {"action": "install", "step": "setup-storage-encryption"}
+        await self.snapd.post_and_wait("v2/systems/enhanced-secureboot-desktop", body)
+        files = glob.glob(os.path.join(EXAMPLES_DIR, "v2-changes-6", "*.json"))
+        self.assertEqual(len(files), self.simulator.requests["GET v2/changes/6"])
+        # Starting the change again starts its progression again.
+        await self.snapd.post_and_wait("v2/systems/enhanced-secureboot-desktop", body)
+        self.assertEqual(2 * len(files), self.simulator.requests["GET v2/changes/6"])
+
+    async def test_change_interval(self):
+        await self.start(change_interval=1000)
+        files = sorted(glob.glob(os.path.join(EXAMPLES_DIR, "v2-changes-6", "*.json")))
+        with open(files[0]) as fp:
+            first = json.load(fp)
+        with open(files[2]) as fp:
+            third = json.load(fp)
+        self.assertEqual(first, await self.snapd.get("v2/changes/6"))
+        self.assertEqual(first, await self.snapd.get("v2/changes/6"))
+        self.simulator.changes["v2-changes-6"].started -= 2500
+        self.assertEqual(third, await self.snapd.get("v2/changes/6"))
+
+    async def test_injected_errors(self):
+        await self.start(errors={"v2/find*": 503})
+        with self.assertRaises(requests.HTTPError) as cm:
+            await self.snapd.get("v2/find", name="docker")
+        self.assertEqual(503, cm.exception.response.status_code)
+        await self.snapd.get("v2/snaps/subiquity")
+
+    async def test_error_rate(self):
+        await self.start(error_rate=1)
+        with self.assertRaises(requests.HTTPError) as cm:
+            await self.snapd.get("v2/snaps/subiquity")
+        self.assertEqual(500, cm.exception.response.status_code)
+
+    async def test_latency_concurrent_requests(self):
+        await self.start(latency=0.2)
+        names = ["docker", "juju", "microk8s", "etcd"]
+        results = await asyncio.gather(
+            *(self.client.v2.find.GET(name=name) for name in names)
+        )
+        self.assertEqual(names, [snap.name for [snap] in results])
+        self.assertEqual(len(names), self.simulator.max_in_flight)
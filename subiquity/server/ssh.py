@@ -13,11 +13,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import base64
+import binascii
 import enum
+import hashlib
 import logging
 import os
+import struct
 import subprocess
-from typing import List
+import time
+from typing import Dict, List, Optional, Tuple
 
 from subiquity.common.types import SSHFetchIdStatus
 from subiquitycore.utils import arun_command
@@ -32,11 +37,81 @@ class SSHFetchError(Exception):
         super().__init__()
 
 
+# Key type -> (name shown by ssh-keygen -l, size in bits if fixed)
+KEY_TYPES: Dict[str, Tuple[str, Optional[int]]] = {
+    "ssh-rsa": ("RSA", None),
+    "ssh-dss": ("DSA", None),
+    "ssh-ed25519": ("ED25519", 256),
+    "ecdsa-sha2-nistp256": ("ECDSA", 256),
+    "ecdsa-sha2-nistp384": ("ECDSA", 384),
+    "ecdsa-sha2-nistp521": ("ECDSA", 521),
+    "sk-ssh-ed25519@openssh.com": ("ED25519-SK", 256),
+    "sk-ecdsa-sha2-nistp256@openssh.com": ("ECDSA-SK", 256),
+}
+
+
+def _read_string(blob: bytes, offset: int) -> Tuple[bytes, int]:
+    (length,) = struct.unpack_from(">I", blob, offset)
+    offset += 4
+    if offset + length > len(blob):
+        raise ValueError("truncated key blob")
+    return blob[offset : offset + length], offset + length
+
+
+def fingerprint_for_key(key: str) -> Optional[str]:
+    """Compute the fingerprint of a public key the way ssh-keygen -l does.
+
+    Returns None if the key is not in a format we know how to handle, in
+    which case the caller should fall back to asking ssh-keygen.
+    """
+    try:
+        key_type, data, *rest = key.split(None, 2)
+    except ValueError:
+        return None
+    if key_type not in KEY_TYPES:
+        return None
+    name, bits = KEY_TYPES[key_type]
+    try:
+        blob = base64.b64decode(data, validate=True)
+        blob_type, offset = _read_string(blob, 0)
+        if blob_type.decode("ascii") != key_type:
+            return None
+        if bits is None:
+            # The public exponent comes before the modulus for RSA keys, the
+            # prime p comes first for DSA keys.
+            if key_type == "ssh-rsa":
+                unused, offset = _read_string(blob, offset)
+            mpint, offset = _read_string(blob, offset)
+            bits = int.from_bytes(mpint, "big").bit_length()
+    except (binascii.Error, struct.error, UnicodeDecodeError, ValueError):
+        return None
+    digest = base64.b64encode(hashlib.sha256(blob).digest()).decode()
+    comment = rest[0].strip() if rest else "no comment"
+    return f"{bits} SHA256:{digest.rstrip('=')} {comment} ({name})"
+
+
 class SSHKeyFetcher:
+    # How long the keys fetched for a user id are reused for, in seconds.
+    cache_ttl = 300
+
     def __init__(self, app):
         self.app = app
+        self._keys_cache: Dict[str, Tuple[float, List[str]]] = {}
 
     async def fetch_keys_for_id(self, user_id: str) -> List[str]:
+        """Return the keys for user_id, reusing recently fetched keys.
+
+        Failures are not cached so that a typo can be fixed and retried.
+        """
+        now = time.monotonic()
+        cached = self._keys_cache.get(user_id)
+        if cached is not None and now - cached[0] < self.cache_ttl:
+            return list(cached[1])
+        keys = await self.import_keys_for_id(user_id)
+        self._keys_cache[user_id] = (now, keys)
+        return list(keys)
+
+    async def import_keys_for_id(self, user_id: str) -> List[str]:
         cmd = ("ssh-import-id", "--output", "-", "--", user_id)
         env = None
         if self.app.base_model.proxy.proxy:
@@ -57,10 +132,12 @@ class SSHKeyFetcher:
 
     async def gen_fingerprint_for_key(self, key: str) -> str:
         """For a given key, generate the fingerprint."""
+        fingerprint = fingerprint_for_key(key)
+        if fingerprint is not None:
+            return fingerprint
 
-        # ssh-keygen supports multiple keys at once, but it is simpler to
-        # associate each key with its resulting fingerprint if we call
-        # ssh-keygen multiple times.
+        # Only key types we do not know about get here, so it is simpler to
+        # run ssh-keygen once per key than to match keys with fingerprints.
         cmd = ("ssh-keygen", "-l", "-f", "-")
         try:
             cp = await arun_command(cmd, check=True, input=key)
@@ -95,7 +172,7 @@ ssh-ed25519\
             reason=f"ERROR Username {username} not found.",
         )
 
-    async def fetch_keys_for_id(self, user_id: str) -> List[str]:
+    async def import_keys_for_id(self, user_id: str) -> List[str]:
         service, username = user_id.split(":", maxsplit=1)
         strategy = self.SSHImportStrategy(self.app.dr_cfg.ssh_import_default_strategy)
         for entry in self.app.dr_cfg.ssh_imports:
@@ -105,7 +182,7 @@ ssh-ed25519\
             break
 
         strategies_mapping = {
-            self.SSHImportStrategy.RUN_ON_HOST: super().fetch_keys_for_id,
+            self.SSHImportStrategy.RUN_ON_HOST: super().import_keys_for_id,
             self.SSHImportStrategy.SUCCESS: self.fetch_keys_fake_success,
             self.SSHImportStrategy.FAILURE: self.fetch_keys_fake_failure,
         }
@@ -15,6 +15,7 @@
 
 import contextlib
 import io
+import os
 import pathlib
 import subprocess
 import tempfile
@@ -30,8 +31,10 @@ from subiquity.server.apt import (
     AptConfigurer,
     DryRunAptConfigurer,
     OverlayMountpoint,
+    pool_lists_key,
 )
 from subiquity.server.dryrun import DRConfig
+from subiquity.server.mounter import Mounter, OverlayCleanupError
 from subiquitycore.tests import SubiTestCase
 from subiquitycore.tests.mocks import make_app
 from subiquitycore.tests.parameterized import parameterized
@@ -99,13 +102,56 @@ class TestAptConfigurer(SubiTestCase):
             lowers=["lowers1-install-tree"],
             mountpoint="mountpoint-install-tree",
         )
-        self.source = "source"
+        self.configurer._source_path = "source"
+        self.configurer.mounter = Mounter(self.app)
 
         with patch.object(
             self.app, "command_runner", create=True, new_callable=AsyncMock
         ):
-            async with self.configurer.overlay():
+            async with self.configurer.overlay() as ov1:
                 pass
+            async with self.configurer.overlay() as ov2:
+                self.assertIs(ov1, ov2)
+            self.app.command_runner.run.assert_called_once()
+
+    async def test_apply_apt_config_again(self):
+        self.app.root = self.tmp_dir()
+        self.app.note_data_for_apport = Mock()
+        self.configurer._source_path = "source"
+        self.configurer.mounter = Mounter(self.app)
+
+        with (
+            patch("subiquity.server.apt.run_curtin_command"),
+            patch("subiquity.server.apt.generate_config_yaml"),
+        ):
+            await self.configurer.apply_apt_config(context=None, final=True)
+            first = self.configurer.configured_tree
+            await self.configurer.apply_apt_config(context=None, final=True)
+        self.assertEqual(
+            [self.configurer.configured_tree.mountpoint],
+            [m.mountpoint for m in self.configurer.mounter._mounts],
+        )
+        self.assertFalse(os.path.exists(first.upperdir))
+
+    async def test_apply_apt_config_again_busy(self):
+        self.app.root = self.tmp_dir()
+        self.app.note_data_for_apport = Mock()
+        self.configurer._source_path = "source"
+        self.configurer.mounter = Mounter(self.app)
+
+        with (
+            patch("subiquity.server.apt.run_curtin_command"),
+            patch("subiquity.server.apt.generate_config_yaml"),
+        ):
+            await self.configurer.apply_apt_config(context=None, final=True)
+            first = self.configurer.configured_tree
+            with patch.object(
+                self.configurer.mounter,
+                "teardown_overlay",
+                side_effect=OverlayCleanupError,
+            ):
+                await self.configurer.apply_apt_config(context=None, final=True)
+        self.assertIsNot(first, self.configurer.configured_tree)
 
     async def test_run_apt_config_check(self):
         with tempfile.TemporaryDirectory() as tempdir:
@@ -143,6 +189,85 @@ class TestAptConfigurer(SubiTestCase):
                 with self.assertRaises(AptConfigCheckError):
                     await self.configurer.run_apt_config_check(output)
 
+    async def _configure_for_install(self, install_tree: pathlib.Path):
+        self.configurer.configured_tree = OverlayMountpoint(
+            mountpoint=self.tmp_dir(), lowers=[], upperdir=None
+        )
+        self.configurer.mounter.setup_overlay.return_value = OverlayMountpoint(
+            mountpoint=str(install_tree), lowers=[], upperdir=None
+        )
+
+        async def apt_get_update(app, context, *args, **kwargs):
+            lists = install_tree / "var/lib/apt/lists"
+            lists.mkdir()
+            (lists / "_cdrom_Packages").touch()
+
+        with patch(
+            "subiquity.server.apt.run_curtin_command", side_effect=apt_get_update
+        ) as run_curtin:
+            with patch(
+                "subiquity.server.apt.lsb_release", return_value={"codename": "noble"}
+            ):
+                await self.configurer.configure_for_install(context=None)
+        return run_curtin
+
+    def _setup_pool(self):
+        self.app.root = self.tmp_dir()
+        self.configurer.pool = self.tmp_dir()
+        self.configurer.prebuilt_lists_dir = self.tmp_path("prebuilt")
+        release = pathlib.Path(self.configurer.pool, "dists/noble/Release")
+        release.parent.mkdir(parents=True)
+        release.write_text("Suite: noble\n")
+
+        async def run(cmd):
+            subprocess.run(cmd, check=True)
+
+        self.app.command_runner.run.side_effect = run
+
+    async def test_configure_for_install_offline_reuses_lists(self):
+        self._setup_pool()
+        self.model.network.has_network = False
+
+        with self.naked_apt_dir() as install_tree:
+            run_curtin = await self._configure_for_install(install_tree)
+            run_curtin.assert_called_once()
+
+        with self.naked_apt_dir() as install_tree:
+            run_curtin = await self._configure_for_install(install_tree)
+            run_curtin.assert_not_called()
+            self.assertTrue(
+                (install_tree / "var/lib/apt/lists/_cdrom_Packages").exists()
+            )
+
+    async def test_configure_for_install_offline_prebuilt_lists(self):
+        self._setup_pool()
+        self.model.network.has_network = False
+        key = pool_lists_key(
+            self.configurer.pool,
+            "noble",
+            "deb [check-date=no] file:///cdrom noble main restricted\n",
+        )
+        prebuilt = pathlib.Path(self.configurer.prebuilt_lists_dir, key)
+        (prebuilt / "var/lib/apt/lists").mkdir(parents=True)
+        (prebuilt / "var/lib/apt/lists/_cdrom_Prebuilt").touch()
+
+        with self.naked_apt_dir() as install_tree:
+            run_curtin = await self._configure_for_install(install_tree)
+            run_curtin.assert_not_called()
+            self.assertTrue(
+                (install_tree / "var/lib/apt/lists/_cdrom_Prebuilt").exists()
+            )
+
+    async def test_configure_for_install_online_runs_update(self):
+        self._setup_pool()
+        self.model.network.has_network = True
+
+        for i in range(2):
+            with self.naked_apt_dir() as install_tree:
+                run_curtin = await self._configure_for_install(install_tree)
+                run_curtin.assert_called_once()
+        self.assertFalse(self.configurer.pool_lists_dirs()[-1].exists())
+
     @staticmethod
     @contextlib.contextmanager
     def naked_apt_dir():
@@ -0,0 +1,70 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest.mock import patch
+
+import jsonschema
+from jsonschema.exceptions import SchemaError, ValidationError
+
+from subiquity.server.autoinstall import get_validator, validate_with_schema
+from subiquitycore.tests import SubiTestCase
+
+
+class TestValidatorCache(SubiTestCase):
+    def setUp(self):
+        self.schema = {
+            "type": "object",
+            "properties": {
+                "some-key": {"type": "boolean"},
+                "other-key": {"type": "integer"},
+            },
+        }
+
+    def test_validator_compiled_once(self):
+        """Test the schema is only checked on first use."""
+        with patch.object(
+            jsonschema.validators,
+            "validator_for",
+            wraps=jsonschema.validators.validator_for,
+        ) as validator_for:
+            first = get_validator(self.schema)
+            second = get_validator(self.schema)
+        self.assertIs(first, second)
+        # check_schema also looks up the validator for the metaschema, so
+        # only count lookups for our schema.
+        calls = [c for c in validator_for.call_args_list if c.args[0] is self.schema]
+        self.assertEqual(1, len(calls))
+
+    def test_equal_schemas_distinct_validators(self):
+        """Test the cache is keyed on identity, not equality."""
+        other = dict(self.schema)
+        self.assertIsNot(get_validator(self.schema), get_validator(other))
+
+    def test_invalid_schema(self):
+        with self.assertRaises(SchemaError):
+            get_validator({"type": "not-a-type"})
+
+    def test_validate_ok(self):
+        validate_with_schema({"some-key": True}, self.schema)
+
+    def test_validate_matches_jsonschema(self):
+        """Test the error raised is the one jsonschema.validate raises."""
+        data = {"some-key": "not a bool", "other-key": "not an int"}
+        with self.assertRaises(ValidationError) as expected:
+            jsonschema.validate(data, self.schema)
+        with self.assertRaises(ValidationError) as actual:
+            validate_with_schema(data, self.schema)
+        self.assertEqual(expected.exception.message, actual.exception.message)
+        self.assertEqual(expected.exception.path, actual.exception.path)
@@ -0,0 +1,76 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import unittest
+
+from subiquity.server.event_stream import EventStream
+
+
+class TestEventStream(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.stream = EventStream(maxlen=5)
+
+    def publish(self, n):
+        for i in range(n):
+            self.stream.publish("info", f"message {i}")
+
+    def test_sequence_numbers(self):
+        self.publish(3)
+        events = self.stream.events_after(0, 100)
+        self.assertEqual([1, 2, 3], [e.seq for e in events])
+        self.assertEqual("message 0", events[0].message)
+
+    def test_resume(self):
+        self.publish(4)
+        self.assertEqual([3, 4], [e.seq for e in self.stream.events_after(2, 100)])
+        self.assertEqual([], self.stream.events_after(4, 100))
+
+    def test_limit(self):
+        self.publish(4)
+        self.assertEqual([2, 3], [e.seq for e in self.stream.events_after(1, 2)])
+
+    def test_bounded(self):
+        self.publish(8)
+        # Only the last 5 events are kept.
+        self.assertEqual(
+            [4, 5, 6, 7, 8], [e.seq for e in self.stream.events_after(0, 100)]
+        )
+        self.assertEqual([7, 8], [e.seq for e in self.stream.events_after(6, 100)])
+
+    def test_after_from_previous_server(self):
+        self.publish(2)
+        self.assertEqual([1, 2], [e.seq for e in self.stream.events_after(10, 100)])
+
+    async def test_wait_after_from_previous_server(self):
+        # Nothing was published yet by this server: wait for the first event
+        # instead of returning nothing straight away.
+        task = asyncio.create_task(self.stream.wait_for_events_after(10, 100))
+        await asyncio.sleep(0)
+        self.assertFalse(task.done())
+        self.publish(1)
+        events = await asyncio.wait_for(task, timeout=1)
+        self.assertEqual([1], [e.seq for e in events])
+
+    async def test_wait(self):
+        self.publish(1)
+        task = asyncio.create_task(self.stream.wait_for_events_after(1, 100))
+        await asyncio.sleep(0)
+        self.assertFalse(task.done())
+        self.stream.publish("start", "new", context_id="7")
+        events = await asyncio.wait_for(task, timeout=1)
+        self.assertEqual(1, len(events))
+        self.assertEqual(2, events[0].seq)
+        self.assertEqual("7", events[0].context_id)
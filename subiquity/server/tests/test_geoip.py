@@ -17,6 +17,7 @@ import aiohttp
 from aioresponses import aioresponses
 
 from subiquity.server.geoip import GeoIP, HTTPGeoIPStrategy
+from subiquity.server.http_client import HTTPClient
 from subiquitycore.tests import SubiTestCase
 from subiquitycore.tests.mocks import make_app
 
@@ -46,8 +47,11 @@ empty_cc = "<Response><CountryCode></CountryCode></Response>"
 
 class TestGeoIP(SubiTestCase):
     async def asyncSetUp(self):
-        strategy = HTTPGeoIPStrategy()
-        self.geoip = GeoIP(make_app(), strategy)
+        app = make_app()
+        app.base_model.proxy.proxy = ""
+        http = HTTPClient(app)
+        self.addAsyncCleanup(http.close)
+        self.geoip = GeoIP(app, HTTPGeoIPStrategy(http))
 
         with aioresponses() as mocked:
             mocked.get("https://geoip.ubuntu.com/lookup", body=xml)
@@ -61,9 +65,12 @@ class TestGeoIP(SubiTestCase):
 
 
 class TestGeoIPBadData(SubiTestCase):
-    def setUp(self):
-        strategy = HTTPGeoIPStrategy()
-        self.geoip = GeoIP(make_app(), strategy)
+    async def asyncSetUp(self):
+        app = make_app()
+        app.base_model.proxy.proxy = ""
+        http = HTTPClient(app)
+        self.addAsyncCleanup(http.close)
+        self.geoip = GeoIP(app, HTTPGeoIPStrategy(http))
 
     async def test_partial_reponse(self):
         with aioresponses() as mocked:
@@ -0,0 +1,86 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest import mock
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from subiquity.server.http_client import HTTPClient
+from subiquitycore.tests import SubiTestCase
+from subiquitycore.tests.mocks import make_app
+
+
+class TestHTTPClient(SubiTestCase):
+    async def asyncSetUp(self):
+        async def hello(request):
+            return web.Response(text="hello")
+
+        async def broken(request):
+            raise web.HTTPInternalServerError()
+
+        web_app = web.Application()
+        web_app.router.add_get("/hello", hello)
+        web_app.router.add_get("/broken", broken)
+        self.server = TestServer(web_app)
+        await self.server.start_server()
+        self.addAsyncCleanup(self.server.close)
+
+        self.app = make_app()
+        self.app.base_model.proxy.proxy = ""
+        self.http = HTTPClient(self.app)
+        self.addAsyncCleanup(self.http.close)
+
+    def url(self, path):
+        return str(self.server.make_url(path))
+
+    async def test_session_shared(self):
+        for i in range(3):
+            async with self.http.get(self.url("/hello")) as resp:
+                self.assertEqual("hello", await resp.text())
+        metrics = self.http.metrics()
+        self.assertEqual({self.server.host: 3}, metrics["requests"])
+        self.assertEqual({}, metrics["errors"])
+        self.assertEqual(1, metrics["sessions_created"])
+
+    async def test_errors_counted(self):
+        with self.assertRaises(aiohttp.ClientResponseError):
+            async with self.http.get(self.url("/broken")) as resp:
+                resp.raise_for_status()
+        self.assertEqual({self.server.host: 1}, self.http.metrics()["errors"])
+
+    async def test_proxy(self):
+        self.app.base_model.proxy.proxy = "http://proxy.example:3128"
+        with mock.patch.object(aiohttp.ClientSession, "request") as m_request:
+            async with self.http.get("https://example.com/"):
+                pass
+        self.assertEqual(
+            "http://proxy.example:3128", m_request.call_args.kwargs["proxy"]
+        )
+
+    async def test_no_proxy(self):
+        with mock.patch.object(aiohttp.ClientSession, "request") as m_request:
+            async with self.http.get("https://example.com/"):
+                pass
+        self.assertIsNone(m_request.call_args.kwargs["proxy"])
+
+    async def test_close(self):
+        async with self.http.get(self.url("/hello")):
+            pass
+        await self.http.close()
+        async with self.http.get(self.url("/hello")):
+            pass
+        self.assertEqual(2, self.http.metrics()["sessions_created"])
@@ -0,0 +1,104 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import os
+from unittest.mock import patch
+
+from subiquity.server import md5check
+from subiquity.server.md5check import (
+    Md5Checker,
+    Md5Entry,
+    md5_file,
+    parse_md5sums,
+    squashfs_layers,
+)
+from subiquitycore.tests import SubiTestCase
+
+
+class TestParse(SubiTestCase):
+    def test_parse(self):
+        content = (
+            "0123456789ABCDEF0123456789abcdef  ./casper/initrd\n"
+            "fedcba9876543210fedcba9876543210  ./pool/main/a/b c.deb\n"
+            "garbage\n"
+        )
+        self.assertEqual(
+            [
+                Md5Entry("casper/initrd", "0123456789abcdef0123456789abcdef"),
+                Md5Entry("pool/main/a/b c.deb", "fedcba9876543210fedcba9876543210"),
+            ],
+            parse_md5sums(content),
+        )
+
+
+class TestSquashfsLayers(SubiTestCase):
+    def test_single(self):
+        self.assertEqual(
+            {"filesystem.squashfs"}, squashfs_layers("filesystem.squashfs")
+        )
+
+    def test_layered(self):
+        self.assertEqual(
+            {"minimal.squashfs", "minimal.standard.squashfs"},
+            squashfs_layers("minimal.standard.squashfs"),
+        )
+
+    def test_langs(self):
+        self.assertEqual(
+            {
+                "minimal.squashfs",
+                "minimal.en.squashfs",
+                "minimal.no-languages.squashfs",
+                "minimal.standard.squashfs",
+                "minimal.standard.en.squashfs",
+                "minimal.standard.no-languages.squashfs",
+            },
+            squashfs_layers("minimal.standard.squashfs", ["en", "no-languages"]),
+        )
+
+
+class TestMd5Checker(SubiTestCase):
+    def setUp(self):
+        self.root = self.tmp_dir()
+
+    def write(self, path, content):
+        with open(os.path.join(self.root, path), "wb") as fp:
+            fp.write(content)
+        return Md5Entry(path, hashlib.md5(content).hexdigest())
+
+    def test_md5_file_chunks(self):
+        content = os.urandom(1000)
+        self.write("f", content)
+        progress = []
+        with patch.object(md5check, "READ_SIZE", 300):
+            md5 = md5_file(os.path.join(self.root, "f"), progress.append)
+        self.assertEqual(hashlib.md5(content).hexdigest(), md5)
+        self.assertEqual([300, 300, 300, 100], progress)
+
+    async def test_check(self):
+        good = self.write("good", b"good")
+        bad = Md5Entry("bad", self.write("bad", b"bad").md5.replace("a", "b"))
+        missing = Md5Entry("missing", "0" * 32)
+        checked = []
+        checker = Md5Checker(self.root, max_workers=2)
+        failed = await checker.check(
+            [good, bad, missing], lambda e, ok: checked.append((e.path, ok))
+        )
+        self.assertEqual({"bad", "missing"}, set(failed))
+        self.assertEqual(
+            {("good", True), ("bad", False), ("missing", False)}, set(checked)
+        )
+        self.assertEqual(7, checker.bytes_checked)
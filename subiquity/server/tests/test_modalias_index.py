@@ -0,0 +1,135 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import gzip
+
+from subiquity.server.modalias_index import (
+    ModaliasIndex,
+    build_index,
+    parse_modaliases,
+    read_system_modaliases,
+    recommend,
+)
+from subiquitycore.tests import SubiTestCase, populate_dir
+
+PACKAGES = """\
+Package: nvidia-driver-535
+Version: 535.183.01-0ubuntu1
+Modaliases: nvidia(pci:v000010DEd00001C82sv*sd*bc03sc*i*,
+ pci:v000010DEd00001C8Csv*sd*bc03sc*i*)
+
+Package: hello
+Version: 2.10-3
+
+Package: nvidia-driver-550
+Modaliases: nvidia(pci:v000010DEd00001C82sv*sd*bc03sc*i*)
+
+Package: broadcom-sta-dkms
+Modaliases: wl(pci:v000014E4d00004311sv*sd*bc02sc80i*)
+"""
+
+NVIDIA = "pci:v000010DEd00001C82sv00001043sd000085F4bc03sc00i00"
+BROADCOM = "pci:v000014E4d00004311sv0000103Csd00001363bc02sc80i00"
+
+
+class TestParseModaliases(SubiTestCase):
+    def test_parse(self):
+        self.assertEqual(
+            ["pci:v1*", "pci:v2*", "usb:v3*"],
+            parse_modaliases("a(pci:v1*, pci:v2*), b-c(usb:v3*)"),
+        )
+
+    def test_empty(self):
+        self.assertEqual([], parse_modaliases(""))
+
+
+class TestBuildIndex(SubiTestCase):
+    def test_build(self):
+        path = self.tmp_path("Packages.gz")
+        with gzip.open(path, "wt") as fp:
+            fp.write(PACKAGES)
+        index = build_index([path])
+        self.assertEqual(
+            ["nvidia-driver-535", "nvidia-driver-550"],
+            index["pci:v000010DEd00001C82sv*sd*bc03sc*i*"],
+        )
+        self.assertEqual(
+            ["nvidia-driver-535"], index["pci:v000010DEd00001C8Csv*sd*bc03sc*i*"]
+        )
+        self.assertEqual(3, len(index))
+
+
+class TestModaliasIndex(SubiTestCase):
+    def setUp(self):
+        path = self.tmp_path("Packages")
+        with open(path, "w") as fp:
+            fp.write(PACKAGES)
+        self.index = ModaliasIndex(build_index([path]))
+
+    def test_packages_for(self):
+        self.assertEqual(
+            {"nvidia-driver-535", "nvidia-driver-550", "broadcom-sta-dkms"},
+            self.index.packages_for([NVIDIA, BROADCOM, "acpi:PNP0A03:"]),
+        )
+
+    def test_no_match(self):
+        self.assertEqual(set(), self.index.packages_for(["pci:v000010DE"]))
+        self.assertEqual(set(), self.index.packages_for([]))
+
+    def test_load_missing(self):
+        self.assertIsNone(ModaliasIndex.load(self.tmp_path("nope.json")))
+
+    def test_load_invalid(self):
+        path = self.tmp_path("index.json")
+        with open(path, "w") as fp:
+            fp.write("{")
+        self.assertIsNone(ModaliasIndex.load(path))
+
+
+class TestReadSystemModaliases(SubiTestCase):
+    def test_read(self):
+        sysfs = self.tmp_dir()
+        populate_dir(
+            sysfs,
+            {
+                "bus/pci/devices/0000:01:00.0/modalias": NVIDIA + "\n",
+                "bus/pci/devices/0000:02:00.0/modalias": BROADCOM + "\n",
+                "bus/usb/devices/1-1/modalias": "\n",
+            },
+        )
+        self.assertEqual({NVIDIA, BROADCOM}, read_system_modaliases(sysfs))
+
+
+class TestRecommend(SubiTestCase):
+    def test_newest_version(self):
+        self.assertEqual(
+            ["broadcom-sta-dkms", "nvidia-driver-550"],
+            recommend(
+                ["nvidia-driver-535", "nvidia-driver-550", "broadcom-sta-dkms"],
+                gpgpu=False,
+            ),
+        )
+
+    def test_server_flavour(self):
+        packages = [
+            "nvidia-driver-535-server",
+            "nvidia-driver-550",
+            "nvidia-driver-550-open",
+        ]
+        self.assertEqual(["nvidia-driver-550"], recommend(packages, gpgpu=False))
+        self.assertEqual(["nvidia-driver-535-server"], recommend(packages, gpgpu=True))
+
+    def test_oem_metapackages_ignored(self):
+        self.assertEqual([], recommend(["oem-somerville-tentacool-meta"], gpgpu=False))
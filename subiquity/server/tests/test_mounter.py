@@ -176,6 +176,69 @@ class TestMounter(SubiTestCase):
         self.assertTrue(dst.is_dir())
 
 
+class TestOverlays(SubiTestCase):
+    def setUp(self):
+        self.app = make_app()
+        self.app.command_runner = AsyncMock()
+        self.mounter = Mounter(self.app)
+        self.mounted = set()
+
+        async def run(cmd, **kwargs):
+            if cmd[0] == "mount":
+                self.mounted.add(cmd[-1])
+            elif cmd[0] == "umount":
+                self.mounted.remove(cmd[-1])
+
+        self.app.command_runner.run.side_effect = run
+
+    async def test_teardown_overlay(self):
+        overlay = await self.mounter.setup_overlay(["/lower"])
+        upperdir = overlay.upperdir
+        self.assertEqual({overlay.mountpoint}, self.mounted)
+        await self.mounter.teardown_overlay(overlay)
+        self.assertEqual(set(), self.mounted)
+        self.assertFalse(os.path.exists(upperdir))
+        self.assertEqual([], self.mounter._mounts)
+
+    async def test_pooled_overlay_reused(self):
+        async with self.mounter.pooled_overlay(["/lower"]) as ov1:
+            pass
+        # Not torn down when no longer used ...
+        self.assertEqual({ov1.mountpoint}, self.mounted)
+        async with self.mounter.pooled_overlay(["/lower"]) as ov2:
+            self.assertIs(ov1, ov2)
+        self.assertEqual(1, self.app.command_runner.run.call_count)
+
+    async def test_pooled_overlay_not_shared(self):
+        async with self.mounter.pooled_overlay(["/lower"]) as ov1:
+            async with self.mounter.pooled_overlay(["/lower"]) as ov2:
+                self.assertNotEqual(ov1.upperdir, ov2.upperdir)
+                self.assertEqual({ov1.mountpoint, ov2.mountpoint}, self.mounted)
+
+    async def test_pooled_overlay_released_lazily(self):
+        async with self.mounter.pooled_overlay(["/lower1"]) as ov1:
+            pass
+        async with self.mounter.pooled_overlay(["/lower2"]) as ov2:
+            # ... but when an overlay over other layers is needed.
+            self.assertEqual({ov2.mountpoint}, self.mounted)
+        self.assertNotIn(ov1.mountpoint, self.mounted)
+
+    async def test_pooled_overlay_in_use_kept(self):
+        async with self.mounter.pooled_overlay(["/lower1"]) as ov1:
+            async with self.mounter.pooled_overlay(["/lower2"]) as ov2:
+                self.assertEqual({ov1.mountpoint, ov2.mountpoint}, self.mounted)
+
+    async def test_cleanup(self):
+        overlay = await self.mounter.setup_overlay(["/lower"])
+        async with self.mounter.pooled_overlay([overlay]):
+            pass
+        await self.mounter.mount("/cdrom", self.tmp_dir(), options="bind")
+        await self.mounter.cleanup()
+        self.assertEqual(set(), self.mounted)
+        self.assertEqual([], self.mounter._mounts)
+        self.assertEqual([], self.mounter.tmpfiles._tdirs)
+
+
 class TestLowerDirFor(SubiTestCase):
     def test_lowerdir_for_str(self):
         self.assertEqual(lowerdir_for("/tmp/lower1"), "/tmp/lower1")
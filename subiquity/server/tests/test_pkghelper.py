@@ -81,6 +81,60 @@ class TestPackageInstaller(SubiTestCase):
                 PackageInstallState.NOT_AVAILABLE,
             )
 
+    async def test_get_cache_loads_once(self):
+        with patch("apt.Cache", return_value={}) as m_cache:
+            self.pkginstaller.start_loading_cache()
+            cache = await self.pkginstaller.get_cache()
+            self.assertIs(cache, await self.pkginstaller.get_cache())
+        m_cache.assert_called_once_with()
+
+    def cdrom_pkgs(self, *names):
+        return {
+            name: MockPackage(installed=False, name=name, candidate_uri="cdrom://")
+            for name in names
+        }
+
+    async def test_install_pkgs_merged(self):
+        with patch.dict(
+            self.pkginstaller.cache, self.cdrom_pkgs("zfsutils-linux", "efibootmgr")
+        ):
+            with patch("subiquity.server.pkghelper.arun_command") as arun:
+                arun.return_value = Mock(returncode=0)
+                self.assertEqual(
+                    await self.pkginstaller.install_pkgs(
+                        ["zfsutils-linux", "efibootmgr"]
+                    ),
+                    {
+                        "zfsutils-linux": PackageInstallState.DONE,
+                        "efibootmgr": PackageInstallState.DONE,
+                    },
+                )
+        arun.assert_called_once()
+        cmd = arun.call_args.args[0]
+        self.assertEqual(["efibootmgr", "zfsutils-linux"], cmd[-2:])
+
+    async def test_install_pkgs_merged_failure(self):
+        async def fake_arun(cmd, env):
+            return Mock(returncode=0 if cmd[-1] == "efibootmgr" else 1)
+
+        with patch.dict(
+            self.pkginstaller.cache, self.cdrom_pkgs("zfsutils-linux", "efibootmgr")
+        ):
+            with patch(
+                "subiquity.server.pkghelper.arun_command", side_effect=fake_arun
+            ) as arun:
+                self.assertEqual(
+                    await self.pkginstaller.install_pkgs(
+                        ["zfsutils-linux", "efibootmgr"]
+                    ),
+                    {
+                        "zfsutils-linux": PackageInstallState.FAILED,
+                        "efibootmgr": PackageInstallState.DONE,
+                    },
+                )
+        # One merged transaction, then one attempt per package.
+        self.assertEqual(3, arun.call_count)
+
 
 @patch("apt.Cache", Mock(return_value={}))
 @patch("subiquity.server.pkghelper.asyncio.sleep")
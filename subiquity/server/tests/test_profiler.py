@@ -0,0 +1,97 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+import sys
+import time
+
+from subiquity.server.debug import DebugController
+from subiquity.server.profiler import SamplingProfiler, fold
+from subiquitycore.tests import SubiTestCase
+from subiquitycore.tests.mocks import make_app
+
+
+def block_the_loop():
+    time.sleep(0.3)
+
+
+class TestSamplingProfiler(SubiTestCase):
+    def test_fold(self):
+        def inner():
+            return sys._getframe()
+
+        folded = fold("T", inner()).split(";")
+        self.assertEqual("T", folded[0])
+        self.assertTrue(folded[-1].startswith("inner ("))
+        self.assertTrue(folded[-2].startswith("test_fold ("))
+
+    async def test_stall(self):
+        profiler = SamplingProfiler(
+            asyncio.get_running_loop(), interval=0.01, lag_threshold=0.1
+        )
+        profiler.start()
+        await asyncio.sleep(0.2)
+        block_the_loop()
+        await asyncio.sleep(0.1)
+        profiler.stop()
+        self.assertFalse(profiler.running)
+        self.assertGreater(profiler.sample_count, 0)
+
+        [stall] = profiler.stalls
+        self.assertGreater(stall.duration, 0.15)
+        self.assertIn("block_the_loop", "".join(stall.stack))
+        self.assertTrue(
+            any("block_the_loop" in stack for stack in profiler.samples),
+        )
+
+        paths = profiler.write(self.tmp_dir(), "test")
+        with open(paths[0]) as fp:
+            line = fp.readline()
+        stack, count = line.rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+        with open(paths[1]) as fp:
+            self.assertIn("event loop blocked for", fp.read())
+
+
+class TestDebugController(SubiTestCase):
+    async def test_profiler(self):
+        app = make_app()
+        logdir = self.tmp_dir()
+        app.block_log_dir = os.path.join(logdir, "block")
+        controller = DebugController(app)
+
+        status = await controller.profiler_GET()
+        self.assertFalse(status.running)
+        status = await controller.profiler_POST(enable=True, interval=0.01)
+        self.assertTrue(status.running)
+        await asyncio.sleep(0.05)
+        status = await controller.profiler_POST(enable=False)
+        self.assertFalse(status.running)
+        self.assertGreater(status.samples, 0)
+        self.assertEqual(2, len(status.files))
+        for path in status.files:
+            self.assertEqual(logdir, os.path.dirname(path))
+            self.assertTrue(os.path.exists(path))
+
+    async def test_profiler_rejects_non_positive(self):
+        controller = DebugController(make_app())
+        with self.assertRaises(ValueError):
+            await controller.profiler_POST(enable=True, interval=0)
+        with self.assertRaises(ValueError):
+            await controller.profiler_POST(enable=True, lag_threshold=0)
+        with self.assertRaises(ValueError):
+            await controller.profiler_POST(enable=True, lag_threshold=-1)
+        self.assertIsNone(controller.profiler)
@@ -15,7 +15,7 @@
 
 import os
 import subprocess
-from unittest.mock import ANY, patch
+from unittest.mock import ANY, Mock, patch
 
 from subiquity.server.runner import DryRunCommandRunner, LoggedCommandRunner
 from subiquitycore.tests import SubiTestCase
@@ -113,6 +113,75 @@ class TestLoggedCommandRunner(SubiTestCase):
         expected_cmd = ANY
         astart_mock.assert_called_once_with(expected_cmd, stdout=subprocess.PIPE)
 
+    def test_forge_direct_cmd(self):
+        runner = LoggedCommandRunner(ident="my-id")
+        self.assertEqual(
+            ["/bin/ls", "/root"],
+            runner._forge_direct_cmd(["/bin/ls", "/root"], capture=True),
+        )
+        self.assertEqual(
+            [
+                "systemd-cat",
+                "--level-prefix=false",
+                "--identifier=my-id",
+                "--",
+                "/bin/ls",
+                "/root",
+            ],
+            runner._forge_direct_cmd(["/bin/ls", "/root"], capture=False),
+        )
+
+    def test_run_directly(self):
+        runner = LoggedCommandRunner(ident="my-id")
+        self.assertTrue(runner._run_directly(["mountpoint", "/target"], False, None))
+        self.assertTrue(runner._run_directly(["/usr/sbin/chzdev"], False, None))
+        self.assertFalse(runner._run_directly(["/bin/ls"], False, None))
+        self.assertTrue(runner._run_directly(["/bin/ls"], False, True))
+        self.assertFalse(runner._run_directly(["mountpoint"], False, False))
+        self.assertFalse(runner._run_directly(["mountpoint"], True, None))
+        with self.assertRaises(ValueError):
+            runner._run_directly(["/bin/ls"], True, True)
+
+    async def test_start_direct(self):
+        runner = LoggedCommandRunner(ident="my-id", use_systemd_user=False)
+        environ = {"PATH": "/usr/bin", "SAMPLE": "should-not-be-exported"}
+
+        with patch.dict(os.environ, environ, clear=True):
+            with patch("subiquity.server.runner.astart_command") as astart_mock:
+                proc = await runner.start(["/bin/ls"], capture=True, direct=True)
+
+        astart_mock.assert_called_once_with(["/bin/ls"], env={"PATH": "/usr/bin"})
+        self.assertEqual(["/bin/ls"], proc.args)
+
+    async def test_run_direct(self):
+        runner = LoggedCommandRunner(ident="my-id")
+        cp = await runner.run(["echo", "hello"], capture=True, direct=True)
+        self.assertEqual(b"hello\n", cp.stdout)
+        with self.assertRaises(subprocess.CalledProcessError):
+            await runner.run(["false"], capture=True, direct=True)
+
+    async def test_run_direct_output(self):
+        lines = []
+        runner = LoggedCommandRunner(ident="my-id", output=lines.append)
+        cp = await runner.run(["sh", "-c", "echo one; echo two >&2"], direct=True)
+        self.assertEqual(["sh", "-c", "echo one; echo two >&2"], cp.args)
+        self.assertEqual(["one", "two"], lines)
+        # Captured output is not forwarded.
+        cp = await runner.run(["echo", "three"], capture=True, direct=True)
+        self.assertEqual(b"three\n", cp.stdout)
+        self.assertEqual(["one", "two"], lines)
+
+    async def test_start_systemd_output(self):
+        runner = LoggedCommandRunner(
+            ident="my-id", use_systemd_user=False, output=Mock()
+        )
+        with patch("subiquity.server.runner.astart_command") as astart_mock:
+            with patch("subiquity.server.runner.forward_output"):
+                proc = await runner.start(["/bin/ls"])
+        self.assertIn("--pipe", proc.args)
+        self.assertEqual(subprocess.PIPE, astart_mock.call_args.kwargs["stdout"])
+        self.assertEqual(subprocess.STDOUT, astart_mock.call_args.kwargs["stderr"])
+
 
 class TestDryRunCommandRunner(SubiTestCase):
     def setUp(self):
@@ -145,6 +214,13 @@ class TestDryRunCommandRunner(SubiTestCase):
             ["scripts/replay-curtin-log.py"], private_mounts=True, capture=False
         )
 
+    @patch.object(LoggedCommandRunner, "_forge_direct_cmd")
+    def test_forge_direct_cmd(self, mock_super):
+        self.runner._forge_direct_cmd(["/bin/ls", "/root"], capture=True)
+        mock_super.assert_called_once_with(
+            ["echo", "not running:", "/bin/ls", "/root"], capture=True
+        )
+
     def test_get_delay_for_cmd(self):
         # Most commands use the default delay
         delay = self.runner._get_delay_for_cmd(["/bin/ls", "/root"])
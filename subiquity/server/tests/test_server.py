@@ -13,18 +13,25 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import copy
 import os
 import shlex
+import time
 from typing import Any
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, Mock, call, patch
 
 import jsonschema
 import yaml
+from aiohttp import web
 from jsonschema.validators import validator_for
 
 from subiquity.cloudinit import CloudInitSchemaTopLevelKeyError
-from subiquity.common.types import NonReportableError, PasswordKind
+from subiquity.common.types import (
+    ApplicationState,
+    NonReportableError,
+    PasswordKind,
+)
 from subiquity.server.autoinstall import AutoinstallError, AutoinstallValidationError
 from subiquity.server.nonreportable import NonReportableException
 from subiquity.server.server import (
@@ -35,11 +42,13 @@ from subiquity.server.server import (
     iso_autoinstall_path,
     root_autoinstall_path,
 )
+from subiquity.server.types import InstallerChannels
 from subiquitycore.context import Context
 from subiquitycore.tests import SubiTestCase
 from subiquitycore.tests.mocks import make_app
 from subiquitycore.tests.parameterized import parameterized
 from subiquitycore.utils import run_command
+from subiquitycore.watchdog import LoopWatchdog
 
 
 class TestAutoinstallLoad(SubiTestCase):
@@ -606,6 +615,47 @@ class TestExceptionHandling(SubiTestCase):
         self.assertIsNone(self.server.nonreportable_error)
 
 
+class TestLoopStalls(SubiTestCase):
+    async def asyncSetUp(self):
+        opts = Mock()
+        opts.dry_run = True
+        opts.output_base = self.tmp_dir()
+        opts.machine_config = NOPROBERARG
+        self.server = SubiquityServer(opts, None)
+        self.server.debug_flags = ("fatal-loop-stalls",)
+        self.server.watchdog = LoopWatchdog(
+            asyncio.get_running_loop(), 0.1, self.server.loop_stalled
+        )
+        self.server.watchdog.start()
+        self.addCleanup(self.server.watchdog.stop)
+        self.request = Mock(raw_path="/meta/status")
+
+    async def test_blocking_request_fails(self):
+        async def handler(request):
+            time.sleep(0.3)
+            return web.Response()
+
+        with patch("subiquity.server.server.controller_for_request"):
+            resp = await self.server.middleware(self.request, handler)
+        self.assertEqual(500, resp.status)
+        self.assertIn("blocked the event loop", resp.headers["x-error-msg"])
+
+    async def test_request_ok(self):
+        async def handler(request):
+            await asyncio.sleep(0.3)
+            return web.Response()
+
+        with patch("subiquity.server.server.controller_for_request"):
+            resp = await self.server.middleware(self.request, handler)
+        self.assertEqual(200, resp.status)
+
+    async def test_stall_recorded_in_timeline(self):
+        time.sleep(0.3)
+        await asyncio.sleep(0.1)
+        [stall] = self.server.timeline.stalls
+        self.assertGreaterEqual(stall.duration, 0.25)
+
+
 class TestEventReporting(SubiTestCase):
     async def asyncSetUp(self):
         opts = Mock()
@@ -745,6 +795,55 @@ class TestEventReporting(SubiTestCase):
         self.assertIn("message", message)
         self.assertNotIn("description", message)
 
+    async def test_no_journal_events(self):
+        context: Context = Context(
+            self.server, "MockContext", "description", None, "INFO"
+        )
+        self.server.opts.journal_events = False
+
+        with patch("subiquity.server.server.journal.send") as journal_send_mock:
+            self.server.report_error_event(context, "message")
+            self.server.publish_log_line("output")
+
+        journal_send_mock.assert_not_called()
+        [error, log] = self.server.event_stream.events_after(
+            self.server.event_stream.last_seq - 2, 10
+        )
+        self.assertEqual("error", error.kind)
+        self.assertEqual(("log", "output"), (log.kind, log.message))
+
+    async def test_publish_log_line(self):
+        lines = []
+        self.server.hub.subscribe(InstallerChannels.LOG_LINE, lines.append)
+
+        with patch("subiquity.server.server.journal.send") as journal_send_mock:
+            self.server.publish_log_line("output")
+            self.server.publish_log_line("early", self.server.echo_syslog_id)
+        await asyncio.sleep(0)
+
+        self.assertEqual(
+            [
+                call("output", SYSLOG_IDENTIFIER=self.server.log_syslog_id),
+                call("early", SYSLOG_IDENTIFIER=self.server.echo_syslog_id),
+            ],
+            journal_send_mock.call_args_list,
+        )
+        events = self.server.event_stream.events_after(
+            self.server.event_stream.last_seq - 2, 10
+        )
+        self.assertEqual(
+            [("log", "output"), ("echo", "early")],
+            [(e.kind, e.message) for e in events],
+        )
+        self.assertEqual(["output"], lines)
+
+    def test_state_events(self):
+        self.server.update_state(ApplicationState.WAITING)
+        [event] = self.server.event_stream.events_after(
+            self.server.event_stream.last_seq - 1, 10
+        )
+        self.assertEqual(("state", "WAITING"), (event.kind, event.message))
+
 
 class TestVariantHandling(SubiTestCase):
     async def asyncSetUp(self):
@@ -18,10 +18,53 @@ from subprocess import CalledProcessError, CompletedProcess
 from unittest import mock
 
 from subiquity.common.types import SSHFetchIdStatus
-from subiquity.server.ssh import DryRunSSHKeyFetcher, SSHFetchError, SSHKeyFetcher
+from subiquity.server.ssh import (
+    DryRunSSHKeyFetcher,
+    SSHFetchError,
+    SSHKeyFetcher,
+    fingerprint_for_key,
+)
 from subiquitycore.tests.mocks import make_app
 
 
+class TestFingerprintForKey(unittest.TestCase):
+    def test_ed25519(self):
+        key = """\
+ssh-ed25519\
+ AAAAC3NzaC1lZDI1NTE5AAAAIMM/qhS3hS3+IjpJBYXZWCqPKPH9Zag8QYbS548iEjoZ\
+ test@earth # ssh-import-id lp:test"""
+        self.assertEqual(
+            "256 SHA256:rIR9UVRKslp5wLhV/XuYflDOMN67Z+4c1KgFuS75Qms"
+            " test@earth # ssh-import-id lp:test (ED25519)",
+            fingerprint_for_key(key),
+        )
+
+    def test_rsa(self):
+        key = """\
+ssh-rsa AAAAB3NzaC1yc2EAAAADAQABAAAAgQDYwjj8WYm2OkYqidSwRq9oYg95trnU3HhZEYrQ\
+tTdRX1l0b829vFymTIfxkikUbVNgfs9zaEKHdN72ks3F8Ge6dUWYCtuFnk232NA30T50Qpp/k2+6\
+SL3ce8ZHMK+PwVvIGA7flQ2bslhRktrgUEd+4CEkfyjHH2krGo6SYMqEnw== test@host"""
+        self.assertEqual(
+            "1024 SHA256:sGP5e42bkGY0ZK19M+HH9amwT0KL6lGkJRZTs44ncfQ test@host (RSA)",
+            fingerprint_for_key(key),
+        )
+
+    def test_no_comment(self):
+        key = "ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAAIMM/qhS3hS3+IjpJBYXZWCqPKPH9Zag8QYbS548iEjoZ"
+        self.assertTrue(fingerprint_for_key(key).endswith(" no comment (ED25519)"))
+
+    def test_unhandled(self):
+        self.assertIsNone(fingerprint_for_key("ssh-nsa AAAAC3NzaC1lZ test@host"))
+        self.assertIsNone(fingerprint_for_key("ssh-ed25519 AAAAAC3N test@host"))
+        self.assertIsNone(fingerprint_for_key("ssh-ed25519"))
+        # The type in the blob does not match.
+        self.assertIsNone(
+            fingerprint_for_key(
+                "ssh-rsa AAAAC3NzaC1lZDI1NTE5AAAAIMM/qhS3hS3+IjpJBYXZWCqPKPH9Zag8QYbS548iEjoZ"
+            )
+        )
+
+
 class TestSSHKeyFetcher(unittest.IsolatedAsyncioTestCase):
     arun_command_sym = "subiquity.server.ssh.arun_command"
 
@@ -72,6 +115,44 @@ ssh-ed25519 AAAAAC3N test@host # ssh-import-id lp:test
             self.assertEqual(cm.exception.reason, stderr)
             self.assertEqual(cm.exception.status, SSHFetchIdStatus.IMPORT_ERROR)
 
+    async def test_fetch_keys_for_id_cached(self):
+        with mock.patch(self.arun_command_sym) as mock_arun:
+            mock_arun.return_value = CompletedProcess([], 0)
+            mock_arun.return_value.stdout = "ssh-rsa AAAAC3NzaC1lZ test@host\n"
+            keys1 = await self.fetcher.fetch_keys_for_id(user_id="lp:test")
+            keys2 = await self.fetcher.fetch_keys_for_id(user_id="lp:test")
+            self.assertEqual(keys1, keys2)
+            mock_arun.assert_called_once()
+
+            await self.fetcher.fetch_keys_for_id(user_id="gh:test")
+            self.assertEqual(2, mock_arun.call_count)
+
+            with mock.patch("subiquity.server.ssh.time.monotonic") as m_monotonic:
+                m_monotonic.return_value = 1e12
+                await self.fetcher.fetch_keys_for_id(user_id="lp:test")
+            self.assertEqual(3, mock_arun.call_count)
+
+    async def test_fetch_keys_for_id_error_not_cached(self):
+        with mock.patch(self.arun_command_sym) as mock_arun:
+            mock_arun.side_effect = CalledProcessError(1, [], None, "error")
+            for i in range(2):
+                with self.assertRaises(SSHFetchError):
+                    await self.fetcher.fetch_keys_for_id(user_id="lp:test")
+            self.assertEqual(2, mock_arun.call_count)
+
+    async def test_gen_fingerprint_for_key_in_process(self):
+        with mock.patch(self.arun_command_sym) as mock_arun:
+            fp = await self.fetcher.gen_fingerprint_for_key(
+                "ssh-ed25519"
+                " AAAAC3NzaC1lZDI1NTE5AAAAIMM/qhS3hS3+IjpJBYXZWCqPKPH9Zag8QYbS548iEjoZ"
+                " test@host"
+            )
+        mock_arun.assert_not_called()
+        self.assertEqual(
+            "256 SHA256:rIR9UVRKslp5wLhV/XuYflDOMN67Z+4c1KgFuS75Qms test@host (ED25519)",
+            fp,
+        )
+
     async def test_gen_fingerprint_for_key_ok(self):
         with mock.patch(self.arun_command_sym) as mock_arun:
             mock_arun.return_value = CompletedProcess([], 0)
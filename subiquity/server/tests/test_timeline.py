@@ -0,0 +1,214 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import unittest
+from unittest.mock import Mock
+
+import attr
+
+from subiquity.server.timeline import (
+    SUMMARY_FILENAME,
+    TRACE_FILENAME,
+    Span,
+    TimelineProfiler,
+    chrome_trace,
+    critical_path,
+    curtin_events,
+    self_times,
+    spans_from_trace,
+    summary,
+    write_timeline,
+)
+from subiquitycore.context import Context
+from subiquitycore.tests import SubiTestCase
+from subiquitycore.watchdog import Stall
+
+
+def span(id, parent_id, start, end, name=None, result="SUCCESS"):
+    name = name or f"s{id}"
+    return Span(id, parent_id, name, f"subiquity/{name}", "", start, end, result)
+
+
+class TestTimelineProfiler(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.profiler = TimelineProfiler(clock=lambda: self.now)
+        app = Mock()
+        app.report_start_event = self.profiler.report_start_event
+        app.report_finish_event = self.profiler.report_finish_event
+        app.report_info_event = self.profiler.report_info_event
+        self.root = Context(app, "subiquity", "", None, "INFO")
+
+    def test_records_spans(self):
+        with self.root.child("Install", "installing") as install:
+            self.now = 1.0
+            install.info("hello")
+            with self.assertRaises(RuntimeError):
+                with install.child("step"):
+                    self.now = 3.0
+                    raise RuntimeError("boom")
+            self.now = 4.0
+        outer, inner = self.profiler.spans.values()
+        self.assertEqual(
+            Span(
+                id=install.id,
+                parent_id=self.root.id,
+                name="Install",
+                full_name="subiquity/Install",
+                description="installing",
+                start=0.0,
+                end=4.0,
+                result="SUCCESS",
+                finish_description="installing",
+            ),
+            outer,
+        )
+        self.assertEqual(install.id, inner.parent_id)
+        self.assertEqual((1.0, 3.0), (inner.start, inner.end))
+        self.assertEqual("FAIL", inner.result)
+        self.assertEqual("boom", inner.finish_description)
+        [mark] = self.profiler.marks
+        self.assertEqual((install.id, "info", "hello", 1.0), attr.astuple(mark))
+
+    def test_skips_requests(self):
+        request = self.root.child("GET /meta/status")
+        request.set("request", object())
+        with request:
+            with request.child("handler"):
+                pass
+        self.assertEqual({}, self.profiler.spans)
+
+    def test_unfinished(self):
+        self.root.child("forever").enter()
+        self.now = 5.0
+        [s] = self.profiler.finished_spans()
+        self.assertEqual((5.0, "UNFINISHED"), (s.end, s.result))
+        self.assertIsNone(self.profiler.spans[s.id].end)
+
+
+class TestAnalysis(unittest.TestCase):
+    def test_critical_path(self):
+        spans = [
+            span(1, None, 0, 10),
+            span(2, 1, 0, 4),
+            # Runs in the background, finishing before the end.
+            span(3, 1, 1, 9),
+            span(4, 1, 4, 10),
+            span(5, 4, 5, 8),
+            span(6, None, 2, 3),
+        ]
+        path = critical_path(spans)
+        self.assertEqual([(0, 1), (1, 2), (1, 4), (2, 5)], [(d, s.id) for d, s in path])
+
+    def test_self_times(self):
+        spans = [span(1, None, 0, 10), span(2, 1, 1, 4), span(3, 1, 3, 6)]
+        self.assertEqual({1: 5, 2: 3, 3: 3}, self_times(spans))
+
+    def test_chrome_trace_lanes(self):
+        spans = [
+            span(1, None, 10, 20),
+            span(2, 1, 11, 15),
+            span(3, 1, 12, 18),
+            span(4, 2, 13, 14),
+        ]
+        trace = chrome_trace(spans)
+        events = {e["args"]["id"]: e for e in trace["traceEvents"] if e["ph"] == "X"}
+        self.assertEqual(0, events[1]["ts"])
+        self.assertEqual(10_000_000, events[1]["dur"])
+        self.assertEqual(events[1]["tid"], events[2]["tid"])
+        self.assertEqual(events[2]["tid"], events[4]["tid"])
+        # 3 overlaps 2 without being inside it.
+        self.assertNotEqual(events[2]["tid"], events[3]["tid"])
+        self.assertEqual(
+            [(s.id, s.start, s.end) for s in spans],
+            [(s.id, s.start + 10, s.end + 10) for s in spans_from_trace(trace)],
+        )
+
+
+class TestCurtinEvents(unittest.TestCase):
+    def test_curtin_events(self):
+        spans = [
+            span(1, None, 0, 10, name="run_curtin_step"),
+            span(2, 1, 1, 2, name="cmd-install"),
+            span(3, None, 20, 30, name="run_curtin_step"),
+            span(4, 3, 21, 29, name="cmd-install", result="FAIL"),
+            span(5, 4, 22, 28, name="stage-partitioning"),
+            span(6, 5, 23, 24, name="builtin"),
+        ]
+        trace = chrome_trace(spans)
+        events = list(curtin_events(trace, ["partitioning"]))
+        self.assertEqual(
+            [
+                ("start", "cmd-install", None),
+                ("start", "cmd-install/stage-partitioning", None),
+                ("start", "cmd-install/stage-partitioning/builtin", None),
+                ("finish", "cmd-install/stage-partitioning/builtin", "SUCCESS"),
+                ("finish", "cmd-install/stage-partitioning", "SUCCESS"),
+                ("finish", "cmd-install", "FAIL"),
+            ],
+            [
+                (e["CURTIN_EVENT_TYPE"], e["CURTIN_NAME"], e.get("CURTIN_RESULT"))
+                for e in events
+            ],
+        )
+        self.assertEqual("22000000", events[1]["__MONOTONIC_TIMESTAMP"])
+        initial = list(curtin_events(trace, []))
+        self.assertEqual(
+            [("cmd-install", "1000000"), ("cmd-install", "2000000")],
+            [(e["CURTIN_NAME"], e["__MONOTONIC_TIMESTAMP"]) for e in initial],
+        )
+        with self.assertRaises(ValueError):
+            list(curtin_events(trace, ["extract"]))
+
+
+class TestWriteTimeline(SubiTestCase):
+    def test_write(self):
+        spans = [span(1, None, 0, 10), span(2, 1, 1, 4)]
+        d = self.tmp_dir()
+        write_timeline(d, chrome_trace(spans), summary(spans))
+        with open(os.path.join(d, TRACE_FILENAME)) as fp:
+            self.assertEqual(spans, spans_from_trace(json.load(fp)))
+        with open(os.path.join(d, SUMMARY_FILENAME)) as fp:
+            self.assertEqual(
+                [
+                    "critical path (10.000s):",
+                    "    10.000s subiquity/s1 [SUCCESS]",
+                    "     3.000s   subiquity/s2 [SUCCESS]",
+                    "",
+                    "10 slowest contexts by own time:",
+                    "     7.000s subiquity/s1",
+                    "     3.000s subiquity/s2",
+                ],
+                fp.read().splitlines(),
+            )
+
+    def test_stalls(self):
+        spans = [span(1, None, 10, 20)]
+        stack = ['  File "x.py", line 3, in f\n    time.sleep(1)\n']
+        stalls = [Stall(number=1, start=12, duration=1.5, stack=stack)]
+        trace = chrome_trace(spans, stalls=stalls)
+        [event] = [e for e in trace["traceEvents"] if e.get("cat") == "stall"]
+        self.assertEqual((2_000_000, 1_500_000), (event["ts"], event["dur"]))
+        self.assertEqual(1, event["tid"])
+        self.assertEqual(1, len(spans_from_trace(trace)))
+        self.assertEqual(
+            [
+                "1 event loop stalls, longest first:",
+                '     1.500s at +2.000s File "x.py", line 3, in f',
+            ],
+            summary(spans, stalls).splitlines()[-2:],
+        )
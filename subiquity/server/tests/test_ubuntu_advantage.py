@@ -13,6 +13,10 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
+import json
+import os
+import sys
 import unittest
 from subprocess import CompletedProcess
 from unittest.mock import ANY, AsyncMock, patch
@@ -24,8 +28,10 @@ from subiquity.server.ubuntu_advantage import (
     InvalidTokenError,
     MockedUAInterfaceStrategy,
     UAClientUAInterfaceStrategy,
+    UAClientWorker,
     UAInterface,
 )
+from subiquitycore.tests import SubiTestCase, populate_dir
 
 
 class TestMockedUAInterfaceStrategy(unittest.IsolatedAsyncioTestCase):
@@ -307,3 +313,123 @@ class TestUAInterface(unittest.IsolatedAsyncioTestCase):
         # Test with "Z" suffix for the expiration date.
         status["expires"] = "2035-12-31T00:00:00Z"
         subscription = await interface.get_subscription(token="XXX")
+
+    async def test_subscription_status_cached(self):
+        strategy = AsyncMock()
+        strategy.query_info.return_value = {"expires": "2035-12-31T00:00:00Z"}
+        interface = UAInterface(strategy)
+
+        results = await asyncio.gather(
+            interface.get_subscription_status("XXX"),
+            interface.get_subscription_status("XXX"),
+        )
+        self.assertEqual(results[0], results[1])
+        await interface.get_subscription_status("XXX")
+        strategy.query_info.assert_awaited_once_with("XXX")
+
+        await interface.get_subscription_status("YYY")
+        self.assertEqual(2, strategy.query_info.await_count)
+
+        interface.cache_ttl = 0
+        await interface.get_subscription_status("XXX")
+        self.assertEqual(3, strategy.query_info.await_count)
+
+    async def test_subscription_status_failure_not_cached(self):
+        strategy = AsyncMock()
+        strategy.query_info.side_effect = CheckSubscriptionError("XXX")
+        interface = UAInterface(strategy)
+
+        for i in range(2):
+            with self.assertRaises(CheckSubscriptionError):
+                await interface.get_subscription_status("XXX")
+        self.assertEqual(2, strategy.query_info.await_count)
+
+
+FAKE_UACLIENT_CLI = """\
+import json
+import os
+import time
+
+
+def main(sys_argv=None):
+    if "slow" in sys_argv:
+        time.sleep(1)
+    print(json.dumps({
+        "argv": sys_argv,
+        "config": os.environ.get("UA_CONFIG_FILE"),
+        "pid": os.getpid(),
+    }))
+    return 1 if "fail" in sys_argv else 0
+"""
+
+
+class TestUAClientWorker(SubiTestCase):
+    def setUp(self):
+        pythonpath = self.tmp_dir()
+        populate_dir(
+            pythonpath,
+            {
+                "uaclient/__init__.py": "",
+                "uaclient/cli.py": FAKE_UACLIENT_CLI,
+            },
+        )
+        self.pythonpath = pythonpath
+
+    async def test_run_in_process(self):
+        worker = UAClientWorker(sys.executable, "/usr/bin/ubuntu-advantage")
+        with patch.dict(os.environ, {"PYTHONPATH": self.pythonpath}):
+            proc1 = await worker.run(["status"], {"UA_CONFIG_FILE": "/a.conf"})
+            proc2 = await worker.run(["api", "fail"], {"UA_CONFIG_FILE": "/b.conf"})
+        self.addAsyncCleanup(worker._proc.wait)
+        worker._proc.stdin.close()
+
+        out1 = json.loads(proc1.stdout)
+        out2 = json.loads(proc2.stdout)
+        self.assertEqual(0, proc1.returncode)
+        self.assertEqual(1, proc2.returncode)
+        self.assertEqual(["/usr/bin/ubuntu-advantage", "status"], out1["argv"])
+        self.assertEqual("/a.conf", out1["config"])
+        self.assertEqual("/b.conf", out2["config"])
+        self.assertEqual(out1["pid"], out2["pid"])
+
+    async def test_cancelled_request(self):
+        worker = UAClientWorker(sys.executable, "/usr/bin/ubuntu-advantage")
+        with patch.dict(os.environ, {"PYTHONPATH": self.pythonpath}):
+            proc1 = await worker.run(["status"], {})
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(worker.run(["slow"], {}), timeout=0.1)
+            self.assertIsNone(worker._proc)
+            proc2 = await worker.run(["status"], {})
+        self.addAsyncCleanup(worker._proc.wait)
+        worker._proc.stdin.close()
+
+        out1 = json.loads(proc1.stdout)
+        out2 = json.loads(proc2.stdout)
+        # Not the reply to the cancelled request, from a new worker.
+        self.assertEqual(["/usr/bin/ubuntu-advantage", "status"], out2["argv"])
+        self.assertNotEqual(out1["pid"], out2["pid"])
+
+    async def test_no_uaclient(self):
+        worker = UAClientWorker(sys.executable, "/usr/bin/ubuntu-advantage")
+        with patch.dict(os.environ, {"PYTHONPATH": self.tmp_dir()}):
+            self.assertIsNone(await worker.run(["status"], {}))
+        self.assertFalse(worker.usable)
+
+    async def test_strategy_falls_back_to_command(self):
+        strategy = UAClientUAInterfaceStrategy(
+            (sys.executable, "/usr/bin/ubuntu-advantage"), use_worker=True
+        )
+        strategy.worker.usable = False
+        with patch(TestUAClientUAInterfaceStrategy.arun_command_sym) as mock_arun:
+            mock_arun.return_value = CompletedProcess([], 0, stdout="{}")
+            await strategy.query_info(token="123456789")
+        mock_arun.assert_called_once()
+
+    async def test_magic_wait_shared(self):
+        strategy = UAClientUAInterfaceStrategy()
+        with patch.object(strategy, "_api_call", return_value={}) as api_call:
+            await asyncio.gather(
+                strategy.magic_wait_v1(magic_token="ABCDEF"),
+                strategy.magic_wait_v1(magic_token="ABCDEF"),
+            )
+        api_call.assert_called_once()
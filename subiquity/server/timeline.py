@@ -0,0 +1,420 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Record when each context starts and finishes during an install.
+
+The timeline is written, when the install is done or fails, as
+
+ * subiquity-timeline.json, in the trace event format understood by
+   chrome://tracing and https://ui.perfetto.dev, and
+ * subiquity-timeline.txt, a summary listing the critical path of the
+   install, i.e. the chain of contexts each waiting on the previous one,
+   the contexts that spent the most time on their own and the longest
+   times the event loop was blocked.
+
+The curtin events recorded in a timeline can be replayed with
+scripts/replay-curtin-log.py, see curtin_events.
+"""
+
+import collections
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import attr
+
+from subiquity.server.event_listener import EventListener
+from subiquitycore.context import Context
+from subiquitycore.watchdog import Stall
+
+log = logging.getLogger("subiquity.server.timeline")
+
+TRACE_FILENAME = "subiquity-timeline.json"
+SUMMARY_FILENAME = "subiquity-timeline.txt"
+
+
+@attr.s(auto_attribs=True)
+class Span:
+    id: int
+    parent_id: Optional[int]
+    name: str
+    full_name: str
+    description: str
+    start: float
+    end: Optional[float] = None
+    result: Optional[str] = None
+    finish_description: Optional[str] = None
+
+
+@attr.s(auto_attribs=True)
+class Mark:
+    context_id: int
+    kind: str
+    message: str
+    time: float
+
+
+class TimelineProfiler(EventListener):
+    """Keep the start and finish of every context, except API requests."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.spans: Dict[int, Span] = {}
+        self.marks: List[Mark] = []
+        self.stalls: List[Stall] = []
+
+    def report_start_event(self, context: Context, description: str) -> None:
+        if context.get("request") is not None:
+            return
+        parent_id = context.parent.id if context.parent is not None else None
+        self.spans[context.id] = Span(
+            id=context.id,
+            parent_id=parent_id,
+            name=context.name,
+            full_name=context.full_name(),
+            description=description,
+            start=self.clock(),
+        )
+
+    def report_finish_event(
+        self, context: Context, description: str, result: Any
+    ) -> None:
+        span = self.spans.get(context.id)
+        if span is None:
+            return
+        span.end = self.clock()
+        span.result = result.name
+        span.finish_description = description
+
+    def _mark(self, context: Context, kind: str, message: str) -> None:
+        if context.get("request") is not None:
+            return
+        self.marks.append(Mark(context.id, kind, message, self.clock()))
+
+    def report_info_event(self, context: Context, message: str) -> None:
+        self._mark(context, "info", message)
+
+    def report_warning_event(self, context: Context, message: str) -> None:
+        self._mark(context, "warning", message)
+
+    def report_error_event(self, context: Context, message: str) -> None:
+        self._mark(context, "error", message)
+
+    def finished_spans(self) -> List[Span]:
+        """Return a copy of the spans, the unfinished ones ending now."""
+        now = self.clock()
+        spans = []
+        for span in self.spans.values():
+            span = attr.evolve(span)
+            if span.end is None:
+                span.end = now
+                span.result = "UNFINISHED"
+            spans.append(span)
+        return spans
+
+    def record_stall(self, stall: Stall) -> None:
+        self.stalls.append(stall)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        return chrome_trace(self.finished_spans(), self.marks, self.stalls)
+
+    def summary(self) -> str:
+        return summary(self.finished_spans(), self.stalls)
+
+
+def _lanes(spans: Sequence[Span]) -> Dict[int, int]:
+    """Give each span a lane (a "thread" in the trace) such that the spans
+    of a lane are properly nested, each one inside one of its ancestors.
+
+    Spans run concurrently, e.g. in background tasks, so they do not all
+    nest inside each other.
+    """
+    by_id = {span.id: span for span in spans}
+    stacks: List[List[Span]] = []
+    lanes: Dict[int, int] = {}
+
+    def ancestors(span):
+        while span.parent_id in by_id:
+            span = by_id[span.parent_id]
+            yield span.id
+
+    for span in sorted(spans, key=lambda s: (s.start, -s.end)):
+        candidates = list(range(len(stacks)))
+        if span.parent_id in lanes:
+            candidates.insert(0, lanes[span.parent_id])
+        for lane in candidates:
+            stack = stacks[lane]
+            while stack and stack[-1].end <= span.start:
+                stack.pop()
+            if not stack:
+                break
+            top = stack[-1]
+            if span.end <= top.end and top.id in set(ancestors(span)):
+                break
+        else:
+            stacks.append([])
+            lane = len(stacks) - 1
+        stacks[lane].append(span)
+        lanes[span.id] = lane
+    return lanes
+
+
+def chrome_trace(
+    spans: Sequence[Span], marks: Sequence[Mark] = (), stalls: Sequence[Stall] = ()
+) -> Dict[str, Any]:
+    """Return spans, marks and stalls as a trace in the Trace Event Format."""
+    origin = min((span.start for span in spans), default=0.0)
+    lanes = _lanes(spans)
+
+    def us(t):
+        return round((t - origin) * 1e6)
+
+    events: List[Dict[str, Any]] = [
+        {"ph": "M", "pid": 1, "name": "process_name", "args": {"name": "subiquity"}},
+    ]
+    for span in spans:
+        events.append(
+            {
+                "ph": "X",
+                "pid": 1,
+                "tid": lanes[span.id],
+                "cat": span.full_name.split("/")[1] if "/" in span.full_name else "",
+                "name": span.name,
+                "ts": us(span.start),
+                "dur": us(span.end) - us(span.start),
+                "args": {
+                    "id": span.id,
+                    "parent": span.parent_id,
+                    "full_name": span.full_name,
+                    "description": span.description,
+                    "finish_description": span.finish_description,
+                    "result": span.result,
+                },
+            }
+        )
+    for mark in marks:
+        events.append(
+            {
+                "ph": "i",
+                "s": "p",
+                "pid": 1,
+                "tid": lanes.get(mark.context_id, 0),
+                "name": mark.kind,
+                "ts": us(mark.time),
+                "args": {"context": mark.context_id, "message": mark.message},
+            }
+        )
+    stall_lane = max(lanes.values(), default=-1) + 1
+    if stalls:
+        events.append(
+            {
+                "ph": "M",
+                "pid": 1,
+                "tid": stall_lane,
+                "name": "thread_name",
+                "args": {"name": "event loop stalls"},
+            }
+        )
+    for stall in stalls:
+        events.append(
+            {
+                "ph": "X",
+                "pid": 1,
+                "tid": stall_lane,
+                "cat": "stall",
+                "name": "event loop blocked",
+                "ts": us(stall.start),
+                "dur": round(stall.duration * 1e6),
+                "args": {"stack": "".join(stall.stack)},
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def spans_from_trace(trace: Dict[str, Any]) -> List[Span]:
+    """Read back the spans of a trace returned by chrome_trace."""
+    spans = []
+    for event in trace["traceEvents"]:
+        if event["ph"] != "X" or "id" not in event["args"]:
+            continue
+        args = event["args"]
+        spans.append(
+            Span(
+                id=args["id"],
+                parent_id=args["parent"],
+                name=event["name"],
+                full_name=args["full_name"],
+                description=args["description"],
+                start=event["ts"] / 1e6,
+                end=(event["ts"] + event["dur"]) / 1e6,
+                result=args["result"],
+                finish_description=args["finish_description"],
+            )
+        )
+    return spans
+
+
+def _children(spans: Sequence[Span]) -> Tuple[Dict[int, List[Span]], List[Span]]:
+    ids = {span.id for span in spans}
+    children: Dict[int, List[Span]] = collections.defaultdict(list)
+    top = []
+    for span in spans:
+        if span.parent_id in ids:
+            children[span.parent_id].append(span)
+        else:
+            top.append(span)
+    return children, top
+
+
+def critical_path(spans: Sequence[Span]) -> List[Tuple[int, Span]]:
+    """Return the critical path through spans, with the depth of each span.
+
+    Starting from the end of the timeline, this repeatedly picks the span
+    that finished last before that point and continues from its start,
+    then does the same within each picked span. Shortening any span not
+    on the path would not have finished the install any earlier.
+    """
+    children, top = _children(spans)
+    path: List[Tuple[int, Span]] = []
+
+    def walk(kids, until, depth):
+        chain = []
+        for kid in sorted(kids, key=lambda s: s.end, reverse=True):
+            if kid.end <= until:
+                chain.append(kid)
+                until = kid.start
+        for kid in reversed(chain):
+            path.append((depth, kid))
+            walk(children[kid.id], kid.end, depth + 1)
+
+    walk(top, max((span.end for span in spans), default=0.0), 0)
+    return path
+
+
+def self_times(spans: Sequence[Span]) -> Dict[int, float]:
+    """Return, for each span, how long it ran with none of its children."""
+    children, _ = _children(spans)
+    result = {}
+    for span in spans:
+        busy = 0.0
+        cursor = span.start
+        for kid in sorted(children[span.id], key=lambda s: s.start):
+            start, end = max(kid.start, cursor), min(kid.end, span.end)
+            if end > start:
+                busy += end - start
+                cursor = end
+        result[span.id] = span.end - span.start - busy
+    return result
+
+
+def summary(
+    spans: Sequence[Span], stalls: Sequence[Stall] = (), slowest: int = 10
+) -> str:
+    lines = []
+    path = critical_path(spans)
+    if path:
+        total = max(s.end for _, s in path) - min(s.start for _, s in path)
+        lines.append(f"critical path ({total:.3f}s):")
+    for depth, span in path:
+        lines.append(
+            f"{span.end - span.start:10.3f}s {'  ' * depth}{span.full_name}"
+            f" [{span.result}] {span.description}".rstrip()
+        )
+    own = self_times(spans)
+    by_id = {span.id: span for span in spans}
+    lines.append("")
+    lines.append(f"{slowest} slowest contexts by own time:")
+    for span_id in sorted(own, key=own.get, reverse=True)[:slowest]:
+        lines.append(f"{own[span_id]:10.3f}s {by_id[span_id].full_name}")
+    if stalls:
+        origin = min((span.start for span in spans), default=0.0)
+        lines.append("")
+        lines.append(f"{len(stalls)} event loop stalls, longest first:")
+        for stall in sorted(stalls, key=lambda s: s.duration, reverse=True)[:slowest]:
+            # The innermost frame, where the loop was blocked.
+            where = stall.stack[-1].strip().splitlines()[0] if stall.stack else ""
+            lines.append(
+                f"{stall.duration:10.3f}s at +{stall.start - origin:.3f}s {where}"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def write_timeline(directory: str, trace: Dict[str, Any], text: str) -> None:
+    with open(os.path.join(directory, TRACE_FILENAME), "w") as fp:
+        json.dump(trace, fp)
+    with open(os.path.join(directory, SUMMARY_FILENAME), "w") as fp:
+        fp.write(text)
+
+
+def curtin_events(
+    trace: Dict[str, Any], stages: Sequence[str]
+) -> Iterator[Dict[str, str]]:
+    """Turn a curtin install recorded in trace back into curtin events.
+
+    The events of each curtin install run are recorded as a "cmd-install"
+    context and its descendants. The first run with the given stages is
+    picked and its events are returned like the entries of a journald
+    export, with their original timing, so that replay-curtin-log.py can
+    replay them.
+    """
+    spans = spans_from_trace(trace)
+    children, _ = _children(spans)
+    wanted = {f"stage-{stage}" for stage in stages}
+    for cmd in sorted(spans, key=lambda s: s.start):
+        if cmd.name != "cmd-install":
+            continue
+        run = {kid.name for kid in children[cmd.id] if kid.name.startswith("stage-")}
+        if run == wanted:
+            break
+    else:
+        raise ValueError(f"no curtin install of stages {list(stages)} in trace")
+
+    entries = []
+
+    def walk(span, curtin_name):
+        message = f"{curtin_name}: {span.description}"
+        base = {
+            "SYSLOG_IDENTIFIER": "curtin_event",
+            "PRIORITY": "7",
+            "CODE_LINE": "0",
+            "CURTIN_NAME": curtin_name,
+            "CURTIN_MESSAGE": span.description,
+        }
+        entries.append(
+            {
+                **base,
+                "__MONOTONIC_TIMESTAMP": str(round(span.start * 1e6)),
+                "CURTIN_EVENT_TYPE": "start",
+                "MESSAGE": f"start: {message}",
+            }
+        )
+        for kid in children[span.id]:
+            walk(kid, f"{curtin_name}/{kid.name}")
+        entries.append(
+            {
+                **base,
+                "__MONOTONIC_TIMESTAMP": str(round(span.end * 1e6)),
+                "CURTIN_EVENT_TYPE": "finish",
+                "CURTIN_RESULT": span.result,
+                "MESSAGE": f"finish: {curtin_name}: {span.result}: {span.description}",
+            }
+        )
+
+    walk(cmd, cmd.name)
+    # The sort is stable, so that events at the same time stay in order.
+    entries.sort(key=lambda e: int(e["__MONOTONIC_TIMESTAMP"]))
+    return iter(entries)
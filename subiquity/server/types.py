@@ -59,3 +59,6 @@ class InstallerChannels(CoreChannels):
     # install a "bridge kernel". After this is sent we really do
     # finally know which kernel we will be installing.
     BRIDGE_KERNEL_DECIDED = "bridge-kernel-decided"
+    # (LOG_LINE, line) is sent for each line of output of the commands run
+    # with log_syslog_id.
+    LOG_LINE = "log-line"
@@ -18,14 +18,17 @@ helper."""
 import asyncio
 import contextlib
 import datetime
+import functools
 import json
 import logging
 import os
+import subprocess
 import tempfile
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime as dt
 from subprocess import CompletedProcess
-from typing import List, Sequence, Tuple, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 import yaml
 
@@ -179,24 +182,120 @@ class MockedUAInterfaceStrategy(UAInterfaceStrategy):
         }
 
 
+class UAClientWorker:
+    """A long-lived process running ubuntu-advantage commands in process (see
+    scripts/ua_worker.py), so that each command does not pay for starting
+    Python and loading the pro client again."""
+
+    script = os.path.join(os.path.dirname(__file__), "scripts", "ua_worker.py")
+
+    def __init__(self, interpreter: str, executable: str) -> None:
+        self.interpreter = interpreter
+        self.executable = executable
+        self.usable = True
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+
+    async def _start(self) -> Optional[asyncio.subprocess.Process]:
+        proc = await asyncio.create_subprocess_exec(
+            self.interpreter,
+            self.script,
+            self.executable,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            # The output of ubuntu-advantage status is sent as a single line.
+            limit=1 << 24,
+        )
+        try:
+            hello = json.loads(await proc.stdout.readline())
+        except ValueError:
+            hello = {}
+        except BaseException:
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+            raise
+        if hello.get("ready"):
+            return proc
+        log.debug("cannot run ubuntu-advantage in process: %s", hello.get("error"))
+        self.usable = False
+        with contextlib.suppress(ProcessLookupError):
+            proc.kill()
+        await proc.wait()
+        return None
+
+    async def run(
+        self, args: Sequence[str], env: Dict[str, str]
+    ) -> Optional[CompletedProcess]:
+        """Run ubuntu-advantage with args, or return None if the worker cannot
+        be used."""
+        async with self._lock:
+            if not self.usable:
+                return None
+            if self._proc is None or self._proc.returncode is not None:
+                self._proc = await self._start()
+                if self._proc is None:
+                    return None
+            request = json.dumps({"args": list(args), "env": env}) + "\n"
+            proc, self._proc = self._proc, None
+            try:
+                proc.stdin.write(request.encode("utf-8"))
+                await proc.stdin.drain()
+                reply = json.loads(await proc.stdout.readline())
+                self._proc = proc
+            except (OSError, ValueError) as exc:
+                log.warning("ubuntu-advantage worker failed: %r", exc)
+                return None
+            finally:
+                # Unless its reply was read (the request can also have been
+                # cancelled), the worker may still write it and the next
+                # request would read it instead of its own.
+                if self._proc is None:
+                    with contextlib.suppress(ProcessLookupError):
+                        proc.kill()
+        return CompletedProcess(args, reply["returncode"], stdout=reply["stdout"])
+
+
 class UAClientUAInterfaceStrategy(UAInterfaceStrategy):
     """Strategy that relies on UA client script to retrieve the information."""
 
     Executable = Union[str, Sequence[str]]
     scale_factor = 1
 
-    def __init__(self, executable: Executable = "ubuntu-advantage") -> None:
+    # API endpoints that block for a long time and would hold the worker.
+    long_running_endpoints = {"u.pro.attach.magic.wait.v1"}
+
+    def __init__(
+        self, executable: Executable = "ubuntu-advantage", *, use_worker=False
+    ) -> None:
         """Initialize the strategy using the path to the ubuntu-advantage
         executable we want to use. The executable can be specified as a
         sequence of strings so that we can specify the interpret to use as
-        well.
+        well. With use_worker, commands are run in a UAClientWorker when the
+        interpreter is known and the pro client can be imported.
         """
         self.executable: List[str] = (
             [executable] if isinstance(executable, str) else list(executable)
         )
         self.uaclient_config = None
+        self.worker: Optional[UAClientWorker] = None
+        if use_worker and len(self.executable) == 2:
+            self.worker = UAClientWorker(*self.executable)
+        self._magic_waits: Dict[str, asyncio.Task] = {}
         super().__init__()
 
+    async def _run(
+        self, command: Sequence[str], config_file: str, *, use_worker: bool = True
+    ) -> CompletedProcess:
+        if use_worker and self.worker is not None:
+            args = command[len(self.executable) :]
+            proc = await self.worker.run(args, {"UA_CONFIG_FILE": config_file})
+            if proc is not None:
+                return proc
+        env = os.environ.copy()
+        env["UA_CONFIG_FILE"] = config_file
+        return await utils.arun_command(command, check=False, env=env)
+
     def load_default_uaclient_config(self) -> None:
         with open("/etc/ubuntu-advantage/uaclient.conf") as fh:
             self.uaclient_config = yaml.safe_load(fh)
@@ -233,15 +332,11 @@ class UAClientUAInterfaceStrategy(UAInterfaceStrategy):
         )
 
         with self.uaclient_config_file() as config_file:
-            env = os.environ.copy()
-            env["UA_CONFIG_FILE"] = config_file
             # On error, the command will exit with status 1. When that happens,
             # the output should still be formatted as a JSON object and we can
             # inspect it to know the reason of the failure. This is how we
             # figure out if the contract token was invalid.
-            proc: CompletedProcess = await utils.arun_command(
-                command, check=False, env=env
-            )
+            proc: CompletedProcess = await self._run(command, config_file)
         if proc.returncode == 0:
             # TODO check if we're not returning a string or a list
             try:
@@ -280,10 +375,10 @@ class UAClientUAInterfaceStrategy(UAInterfaceStrategy):
             command.append(f"{key}={value}")
 
         with self.uaclient_config_file() as config_file:
-            env = os.environ.copy()
-            env["UA_CONFIG_FILE"] = config_file
-            proc: CompletedProcess = await utils.arun_command(
-                tuple(command), check=False, env=env
+            proc: CompletedProcess = await self._run(
+                tuple(command),
+                config_file,
+                use_worker=endpoint not in self.long_running_endpoints,
             )
         try:
             return json.loads(proc.stdout)
@@ -298,10 +393,19 @@ class UAClientUAInterfaceStrategy(UAInterfaceStrategy):
         )
 
     async def magic_wait_v1(self, magic_token: str) -> dict:
-        """Call the u.pro.attach.magic.wait.v1 endpoint."""
-        return await self._api_call(
-            endpoint="u.pro.attach.magic.wait.v1", params=[("magic_token", magic_token)]
-        )
+        """Call the u.pro.attach.magic.wait.v1 endpoint. Concurrent calls for
+        the same magic token share the same request."""
+        task = self._magic_waits.get(magic_token)
+        if task is None:
+            task = asyncio.create_task(
+                self._api_call(
+                    endpoint="u.pro.attach.magic.wait.v1",
+                    params=[("magic_token", magic_token)],
+                )
+            )
+            self._magic_waits[magic_token] = task
+            task.add_done_callback(lambda _: self._magic_waits.pop(magic_token, None))
+        return await asyncio.shield(task)
 
     async def magic_revoke_v1(self, magic_token: str) -> dict:
         """Call the u.pro.attach.magic.revoke.v1 endpoint."""
@@ -314,12 +418,33 @@ class UAClientUAInterfaceStrategy(UAInterfaceStrategy):
 class UAInterface:
     """Interface to obtain Ubuntu Advantage subscription information."""
 
+    # How long, in seconds, the information about a subscription is reused.
+    cache_ttl = 300
+
     def __init__(self, strategy: UAInterfaceStrategy):
         self.strategy = strategy
+        self._status_cache: Dict[str, Tuple[float, dict]] = {}
+        self._status_queries: Dict[str, asyncio.Task] = {}
+
+    def _status_done(self, token: str, task: asyncio.Task) -> None:
+        del self._status_queries[token]
+        # Failures are not cached, the next check queries again.
+        if not task.cancelled() and task.exception() is None:
+            self._status_cache[token] = (time.monotonic(), task.result())
 
     async def get_subscription_status(self, token: str) -> dict:
-        """Return a dictionary containing the subscription information."""
-        return await self.strategy.query_info(token)
+        """Return a dictionary containing the subscription information.
+        Concurrent queries for the same token share the same request and
+        the result is reused for cache_ttl seconds."""
+        cached = self._status_cache.get(token)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            return cached[1]
+        task = self._status_queries.get(token)
+        if task is None:
+            task = asyncio.create_task(self.strategy.query_info(token))
+            self._status_queries[token] = task
+            task.add_done_callback(functools.partial(self._status_done, token))
+        return await asyncio.shield(task)
 
     async def get_subscription(self, token: str) -> UbuntuProSubscription:
         """Return the name of the contract, the name of the account and the
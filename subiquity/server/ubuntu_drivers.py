@@ -20,11 +20,18 @@ import os
 import re
 import subprocess
 from abc import ABC, abstractmethod
-from typing import List, Type
+from typing import List, Optional, Type
 
 import yaml
 
 from subiquity.server.curtin import run_curtin_command
+from subiquity.server.modalias_index import (
+    MODALIAS_INDEX_PATH,
+    ModaliasIndex,
+    read_system_modaliases,
+    recommend,
+)
+from subiquitycore.async_helpers import run_in_thread
 from subiquitycore.file_util import copy_file_if_exists, write_file
 from subiquitycore.utils import arun_command, system_scripts_env
 
@@ -40,6 +47,7 @@ class CommandNotFoundError(Exception):
 class UbuntuDriversInterface(ABC):
     def __init__(self, app, gpgpu: bool) -> None:
         self.app = app
+        self.gpgpu = gpgpu
 
         self.list_oem_cmd = [
             "ubuntu-drivers",
@@ -76,6 +84,11 @@ class UbuntuDriversInterface(ABC):
     async def list_oem(self, root_dir: str, context) -> List[str]:
         pass
 
+    async def early_list_drivers(self) -> Optional[List[str]]:
+        """Return the drivers that list_drivers is expected to return,
+        without needing a root_dir, or None if this cannot be told."""
+        return None
+
     async def install_drivers(self, root_dir: str, context) -> None:
         await run_curtin_command(
             self.app,
@@ -126,6 +139,18 @@ class UbuntuDriversClientInterface(UbuntuDriversInterface):
     """UbuntuDrivers interface that uses the ubuntu-drivers command from the
     specified root directory."""
 
+    modalias_index_path = MODALIAS_INDEX_PATH
+
+    def _early_list_drivers(self) -> Optional[List[str]]:
+        index = ModaliasIndex.load(self.modalias_index_path)
+        if index is None:
+            return None
+        packages = index.packages_for(read_system_modaliases())
+        return recommend(packages, gpgpu=self.gpgpu)
+
+    async def early_list_drivers(self) -> Optional[List[str]]:
+        return await run_in_thread(self._early_list_drivers)
+
     async def ensure_cmd_exists(self, root_dir: str) -> None:
         # TODO This does not tell us if the "--recommended" option is
         # available.
@@ -328,6 +353,9 @@ class UbuntuDriversHasDriversInterface(UbuntuDriversInterface):
     async def ensure_cmd_exists(self, root_dir: str) -> None:
         pass
 
+    async def early_list_drivers(self) -> Optional[List[str]]:
+        return self.drivers
+
     async def list_drivers(self, root_dir: str, context) -> List[str]:
         return self.drivers
 
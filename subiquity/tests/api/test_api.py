@@ -153,6 +153,12 @@ class Server(Client):
     ):
         env = os.environ.copy()
         env["SUBIQUITY_REPLAY_TIMESCALE"] = "100"
+        # Fail the requests that block the event loop of the server for too
+        # long.
+        env["SUBIQUITY_LOOP_STALL_THRESHOLD"] = "2"
+        env["SUBIQUITY_DEBUG"] = ",".join(
+            filter(None, [env.get("SUBIQUITY_DEBUG"), "fatal-loop-stalls"])
+        )
         cmd = [
             "python3",
             "-m",
@@ -2033,6 +2039,24 @@ class TestAutoinstallServer(TestAPI):
             self.assertIsNone(view_request_yes)
             self.assertEqual("skip", resp.headers["x-status"])
 
+    @timeout()
+    async def test_events(self):
+        cfg = "examples/machines/simple.json"
+        extra = [
+            "--autoinstall",
+            "examples/autoinstall/short.yaml",
+            "--source-catalog",
+            "examples/sources/install.yaml",
+        ]
+        async with start_server(cfg, extra_args=extra, set_first_source=False) as inst:
+            events = await inst.get("/meta/events", after=0)
+            self.assertNotEqual([], events)
+            seqs = [event["seq"] for event in events]
+            self.assertEqual(list(range(seqs[0], seqs[0] + len(seqs))), seqs)
+            # Resuming from the last seen event picks up where we left off.
+            more = await inst.get("/meta/events", after=seqs[-1])
+            self.assertEqual(seqs[-1] + 1, more[0]["seq"])
+
     @timeout()
     async def test_interactive(self):
         cfg = "examples/machines/simple.json"
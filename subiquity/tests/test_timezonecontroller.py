@@ -13,12 +13,17 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
 from unittest import mock
 
 from subiquity.common.types import TimeZoneInfo
 from subiquity.models.timezone import TimeZoneModel
-from subiquity.server.controllers.timezone import TimeZoneController
-from subiquitycore.tests import SubiTestCase
+from subiquity.server.controllers.timezone import (
+    TimeZoneController,
+    list_timezones,
+    timedatectl_gettz,
+)
+from subiquitycore.tests import SubiTestCase, populate_dir
 from subiquitycore.tests.mocks import make_app
 
 
@@ -78,6 +83,7 @@ class TestTimeZoneController(SubiTestCase):
             else:
                 tz = TimeZoneInfo(val, False)
             self.tzc.deserialize(val)
+            await self.tzc.set_system_timezone()
             self.assertEqual(val, self.tzc.serialize())
             self.assertEqual(settz, self.tzc.model.should_set_tz, self.tzc.model)
             self.assertEqual(geoip, self.tzc.model.detect_with_geoip, self.tzc.model)
@@ -106,17 +112,75 @@ class TestTimeZoneController(SubiTestCase):
             with self.assertRaises(ValueError):
                 self.tzc.deserialize(b)
 
-    @mock.patch("subprocess.run")
+    @mock.patch("subiquity.server.controllers.timezone.arun_command")
     @mock.patch("subiquity.server.controllers.timezone.timedatectl_gettz")
-    def test_set_tz_escape_dryrun(self, tdc_gettz, subprocess_run):
+    async def test_set_tz_escape_dryrun(self, tdc_gettz, arun_command):
         tdc_gettz.return_value = tz_utc
         self.tzc.app.dry_run = True
         self.tzc.possible = ["geoip"]
         self.tzc.deserialize("geoip")
-        self.assertEqual("sleep", subprocess_run.call_args.args[0][0])
+        await self.tzc.set_system_timezone()
+        self.assertEqual("sleep", arun_command.call_args.args[0][0])
+
+    @mock.patch("subiquity.server.controllers.timezone.timedatectl_settz")
+    async def test_autoinstall_sets_tz_on_apply(self, tdc_settz):
+        self.tzc.possible = ["", "geoip", "America/Denver"]
+        self.tzc.load_autoinstall_data("America/Denver")
+        tdc_settz.assert_not_called()
+        await self.tzc.apply_autoinstall_config()
+        tdc_settz.assert_called_once_with(self.tzc.app, "America/Denver")
 
     @mock.patch("subiquity.server.controllers.timezone.timedatectl_settz")
     async def test_get_tz_should_not_set(self, tdc_settz):
         await self.tzc.GET()
         self.assertFalse(self.tzc.model.should_set_tz)
         tdc_settz.assert_not_called()
+
+
+class TestTimeZoneCatalog(SubiTestCase):
+    def test_list_from_tzdata_zi(self):
+        zoneinfo = self.tmp_dir()
+        populate_dir(
+            zoneinfo,
+            {
+                "tzdata.zi": """\
+# version 2024a
+R d 1916 o - May 1 0 1 S
+Z America/Denver -6:59:56 - LMT 1883 N 18 19u
+-7 u M%sT 1920
+Z Etc/UTC 0 - UTC
+L Etc/UTC UTC
+L America/Denver America/Shiprock
+"""
+            },
+        )
+        self.assertEqual(
+            ["America/Denver", "America/Shiprock", "Etc/UTC", "UTC"],
+            list_timezones(zoneinfo),
+        )
+
+    def test_list_from_zone1970_tab(self):
+        zoneinfo = self.tmp_dir()
+        populate_dir(
+            zoneinfo,
+            {
+                "zone1970.tab": """\
+# tzdb timezone descriptions
+NZ,AQ\t-3652+17446\tPacific/Auckland\tNew Zealand time
+US\t+394421-1045903\tAmerica/Denver\tMountain (most areas)
+"""
+            },
+        )
+        self.assertEqual(
+            ["America/Denver", "Pacific/Auckland", "UTC"], list_timezones(zoneinfo)
+        )
+
+    def test_gettz(self):
+        localtime = self.tmp_path("localtime")
+        os.symlink("/usr/share/zoneinfo/America/Denver", localtime)
+        self.assertEqual(tz_denver, timedatectl_gettz(localtime))
+
+    def test_gettz_not_a_link(self):
+        (localtime,) = populate_dir(self.tmp_dir(), {"localtime": "TZif"})
+        self.assertEqual(tz_utc, timedatectl_gettz(localtime))
+        self.assertEqual(tz_utc, timedatectl_gettz(self.tmp_path("missing")))
@@ -13,13 +13,15 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import array
 import asyncio
 import logging
 
-from urwid import LineBox, Text
+import urwid
+from urwid import LineBox, SimpleFocusListWalker, Text
 
 from subiquity.common.types import ApplicationState
-from subiquitycore.async_helpers import run_bg_task
+from subiquitycore.async_helpers import run_bg_task, run_in_thread
 from subiquitycore.ui.buttons import cancel_btn, danger_btn, ok_btn, other_btn
 from subiquitycore.ui.container import Columns, ListBox, Pile
 from subiquitycore.ui.form import Toggleable
@@ -40,10 +42,104 @@ class MyLineBox(LineBox):
             return ""
 
 
+class BoundedListWalker(SimpleFocusListWalker):
+    """A list walker that only keeps the most recent maxlen widgets."""
+
+    def __init__(self, maxlen):
+        super().__init__([])
+        self.maxlen = maxlen
+        self.dropped = 0
+
+    def append(self, widget):
+        super().append(widget)
+        excess = len(self) - self.maxlen
+        if excess > 0:
+            del self[:excess]
+            self.dropped += excess
+
+
+def index_lines(path):
+    """Return the offsets at which each line of the file at path starts.
+
+    The last element is the size of the file, so line i is found between
+    offsets[i] and offsets[i + 1].
+    """
+    offsets = array.array("q", [0])
+    try:
+        with open(path, "rb") as fp:
+            for line in fp:
+                offsets.append(offsets[-1] + len(line))
+    except FileNotFoundError:
+        pass
+    return offsets
+
+
+class FileLinesWalker(urwid.ListWalker):
+    """A list walker over the lines of a file.
+
+    Only the offsets of the lines are kept in memory. Lines are read and
+    turned into widgets when they are displayed, so the file can be far
+    larger than what the progress view keeps around.
+    """
+
+    cache_size = 500
+
+    def __init__(self, path, offsets):
+        self.path = path
+        self.offsets = offsets
+        self.focus = max(len(self) - 1, 0)
+        self._fp = None
+        self._widgets = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _widget(self, pos):
+        if not 0 <= pos < len(self):
+            return None, None
+        widget = self._widgets.get(pos)
+        if widget is None:
+            if self._fp is None:
+                self._fp = open(self.path, "rb")
+            self._fp.seek(self.offsets[pos])
+            data = self._fp.read(self.offsets[pos + 1] - self.offsets[pos])
+            widget = Text(data.decode("utf-8", "replace").rstrip("\n"))
+            if len(self._widgets) >= self.cache_size:
+                self._widgets.clear()
+            self._widgets[pos] = widget
+        return widget, pos
+
+    def get_focus(self):
+        return self._widget(self.focus)
+
+    def set_focus(self, position):
+        self.focus = position
+        self._modified()
+
+    def get_next(self, position):
+        return self._widget(position + 1)
+
+    def get_prev(self, position):
+        return self._widget(position - 1)
+
+    def positions(self, reverse=False):
+        if reverse:
+            return range(len(self) - 1, -1, -1)
+        return range(len(self))
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+
 class ProgressView(BaseView):
     title = _("Installation progress")
 
-    def __init__(self, controller):
+    def __init__(self, controller, *, max_event_lines, max_log_lines):
+        # A verbose install can produce hundreds of thousands of lines of
+        # output and keeping them all makes the UI slow and the client
+        # large, so only the most recent lines are kept on screen.
         self.controller = controller
         self.ongoing = {}  # context_id -> line containing a spinner
 
@@ -57,7 +153,7 @@ class ProgressView(BaseView):
         self.view_log_btn = other_btn(_("View full log"), on_press=self.view_log)
         self.continue_btn = other_btn(_("Continue"), on_press=self.continue_)
 
-        self.event_listbox = ListBox()
+        self.event_listbox = ListBox(BoundedListWalker(max_event_lines))
         self.event_linebox = MyLineBox(self.event_listbox)
         self.event_buttons = button_pile([self.view_log_btn])
         event_body = [
@@ -68,13 +164,21 @@ class ProgressView(BaseView):
         ]
         self.event_pile = Pile(event_body)
 
-        self.log_listbox = ListBox()
-        log_linebox = MyLineBox(self.log_listbox, _("Full installer output"))
+        self.log_listbox = ListBox(BoundedListWalker(max_log_lines))
+        self.log_linebox = MyLineBox(self.log_listbox, _("Full installer output"))
+        self.view_full_output_btn = other_btn(
+            _("View full output"), on_press=self.view_full_output
+        )
+        log_buttons = [
+            self.view_full_output_btn,
+            other_btn(_("Close"), on_press=self.close_log),
+        ]
         log_body = [
-            ("weight", 1, log_linebox),
-            ("pack", button_pile([other_btn(_("Close"), on_press=self.close_log)])),
+            ("weight", 1, self.log_linebox),
+            ("pack", button_pile(log_buttons)),
         ]
         self.log_pile = Pile(log_body)
+        self.full_output_walker = None
 
         super().__init__(self.event_pile)
 
@@ -89,7 +193,6 @@ class ProgressView(BaseView):
 
     def event_start(self, context_id, context_parent_id, message):
         self.event_finish(context_parent_id)
-        walker = self.event_listbox.base_widget.body
         spinner = Spinner(app=self.controller.app)
         spinner.start()
         new_line = Columns(
@@ -99,18 +202,16 @@ class ProgressView(BaseView):
             ],
             dividechars=1,
         )
-        self.ongoing[context_id] = len(walker)
+        self.ongoing[context_id] = new_line
         self._add_line(self.event_listbox, new_line)
         self.request_redraw_if_visible()
 
     def event_finish(self, context_id):
-        index = self.ongoing.pop(context_id, None)
-        if index is None:
+        line = self.ongoing.pop(context_id, None)
+        if line is None:
             return
-        walker = self.event_listbox.base_widget.body
-        spinner = walker[index][1]
+        spinner, _options = line.contents.pop(1)
         spinner.stop()
-        walker[index] = walker[index][0]
         self.request_redraw_if_visible()
 
     def event_other(self, message: str, event_type: str) -> None:
@@ -140,7 +241,17 @@ class ProgressView(BaseView):
             self.event_finish(context_id)
 
     def add_log_line(self, text):
+        walker = self.log_listbox.base_widget.body
+        truncated = walker.dropped > 0
         self._add_line(self.log_listbox, Text(text))
+        if walker.dropped and not truncated:
+            # The oldest output has just scrolled out of the view, so point
+            # at where it can still be found.
+            self.log_linebox.set_title(
+                _("Installer output (see {path} for the full output)").format(
+                    path=self.controller.output_path
+                )
+            )
 
     def set_status(self, text):
         self.event_linebox.set_title(text)
@@ -252,6 +363,33 @@ class ProgressView(BaseView):
     def close_log(self, btn):
         self._w = self.event_pile
 
+    def view_full_output(self, btn):
+        run_bg_task(self._view_full_output())
+
+    async def _view_full_output(self):
+        await self.controller.flush_output()
+        path = self.controller.output_path
+        offsets = await run_in_thread(index_lines, path)
+        self.full_output_walker = FileLinesWalker(path, offsets)
+        # Not our ListBox: its scrollbar measures every line in the body,
+        # which would read the whole file on each render.
+        listbox = urwid.ListBox(self.full_output_walker)
+        listbox.set_focus_valign("bottom")
+        full_output_body = [
+            ("weight", 1, MyLineBox(listbox, path)),
+            (
+                "pack",
+                button_pile([other_btn(_("Close"), on_press=self.close_full_output)]),
+            ),
+        ]
+        self._w = Pile(full_output_body)
+        self.request_redraw_if_visible()
+
+    def close_full_output(self, btn):
+        self.full_output_walker.close()
+        self.full_output_walker = None
+        self._w = self.log_pile
+
 
 confirmation_text = _(
     """\
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from unittest import mock
 from unittest.mock import patch
@@ -6,15 +8,21 @@ import urwid
 
 from subiquity.client.controllers.progress import ProgressController
 from subiquity.common.types import ApplicationState
-from subiquity.ui.views.installprogress import ProgressView
+from subiquity.ui.views.installprogress import (
+    FileLinesWalker,
+    ProgressView,
+    index_lines,
+)
 from subiquitycore.testing import view_helpers
 
 
 class IdentityViewTests(unittest.TestCase):
-    def make_view(self):
+    def make_view(self, max_log_lines=5000):
         controller = mock.create_autospec(spec=ProgressController)
         controller.app = mock.Mock()
-        return ProgressView(controller)
+        return ProgressView(
+            controller, max_event_lines=1000, max_log_lines=max_log_lines
+        )
 
     def test_initial_focus(self):
         view = self.make_view()
@@ -82,3 +90,71 @@ class IdentityViewTests(unittest.TestCase):
         view = self.make_view()
         view.event_other("MOCK CONTEXT: bad keys: 1, 2, 3", "mock")
         text_mock.assert_called_with("MOCK CONTEXT: MOCK: bad keys: 1, 2, 3")
+
+    def test_log_lines_bounded(self):
+        view = self.make_view(max_log_lines=3)
+        view.controller.output_path = "/path/to/output"
+        for i in range(5):
+            view.add_log_line(f"line {i}")
+        walker = view.log_listbox.base_widget.body
+        self.assertEqual(["line 2", "line 3", "line 4"], [w.text for w in walker])
+        self.assertEqual(2, view.log_listbox.base_widget.focus_position)
+        self.assertIn("/path/to/output", view.log_linebox.title_widget.text)
+
+
+class TestProgressViewEvents(unittest.IsolatedAsyncioTestCase):
+    def make_view(self):
+        controller = mock.create_autospec(spec=ProgressController)
+        controller.app = mock.Mock()
+        return ProgressView(controller, max_event_lines=1000, max_log_lines=5000)
+
+    async def test_view_full_output(self):
+        view = self.make_view()
+        with tempfile.TemporaryDirectory() as tdir:
+            path = os.path.join(tdir, "output.log")
+            with open(path, "w") as fp:
+                fp.write("".join(f"line {i}\n" for i in range(10)))
+            view.controller.output_path = path
+            view.view_log(None)
+            btn = view_helpers.find_button_matching(view, "^View full output$")
+            self.assertIsNotNone(btn)
+            await view._view_full_output()
+            view.controller.flush_output.assert_awaited()
+            walker = view.full_output_walker
+            self.assertEqual(10, len(walker))
+            self.assertEqual("line 9", walker.get_focus()[0].text)
+            self.assertEqual("line 3", walker.get_prev(4)[0].text)
+            self.assertEqual((None, None), walker.get_next(9))
+            view.close_full_output(None)
+            self.assertIs(view.log_pile, view._w)
+            self.assertIsNone(walker._fp)
+
+    async def test_event_start_finish(self):
+        view = self.make_view()
+        view.event_start("1", "", "outer")
+        view.event_start("2", "1", "inner")
+        # Starting a child finishes the parent's spinner.
+        self.assertEqual(["2"], list(view.ongoing))
+        view.event_finish("2")
+        walker = view.event_listbox.base_widget.body
+        self.assertEqual([1, 1], [len(line.contents) for line in walker])
+
+
+class TestFileLinesWalker(unittest.TestCase):
+    def test_index_lines(self):
+        with tempfile.TemporaryDirectory() as tdir:
+            path = os.path.join(tdir, "output.log")
+            with open(path, "w") as fp:
+                fp.write("a\nbcd\n\nlast")
+            self.assertEqual([0, 2, 6, 7, 11], list(index_lines(path)))
+            walker = FileLinesWalker(path, index_lines(path))
+            self.assertEqual(
+                ["a", "bcd", "", "last"],
+                [walker.get_next(i - 1)[0].text for i in walker.positions()],
+            )
+            walker.close()
+
+    def test_index_missing_file(self):
+        walker = FileLinesWalker("/does/not/exist", index_lines("/does/not/exist"))
+        self.assertEqual(0, len(walker))
+        self.assertEqual((None, None), walker.get_focus())
@@ -51,6 +51,22 @@ class Context:
         context.description = "result was {}".format(result)
     """
 
+    # A context is created for every API request and most operations, so
+    # keep them small and make the common queries on them cheap.
+    __slots__ = (
+        "id",
+        "app",
+        "name",
+        "description",
+        "parent",
+        "level",
+        "childlevel",
+        "data",
+        "depth",
+        "_full_name",
+        "_inherited",
+    )
+
     def __init__(self, app, name, description, parent, level, childlevel=None):
         global context_id
         self.id = context_id
@@ -64,6 +80,21 @@ class Context:
             childlevel = level
         self.childlevel = childlevel
         self.data = {}
+        if parent is None:
+            self.depth = 0
+            self._full_name = name
+            self._inherited = {}
+        else:
+            self.depth = parent.depth + 1
+            self._full_name = parent._full_name + "/" + name
+            # Flatten the data of all the ancestors so that get() is a
+            # couple of dict lookups rather than a walk up the chain. In
+            # practice data is only set on a context right after it is
+            # created, before any children are.
+            if parent.data:
+                self._inherited = {**parent._inherited, **parent.data}
+            else:
+                self._inherited = parent._inherited
 
     @classmethod
     def new(cls, app):
@@ -75,12 +106,7 @@ class Context:
         return type(self)(self.app, name, description, self, level, childlevel)
 
     def full_name(self):
-        c = self
-        names = []
-        while c is not None:
-            names.append(c.name)
-            c = c.parent
-        return "/".join(reversed(names))
+        return self._full_name
 
     def enter(self, description=None):
         if description is None:
@@ -112,12 +138,14 @@ class Context:
         self.data[key] = value
 
     def get(self, key, default=None):
-        c = self
-        while c is not None:
-            if key in c.data:
-                return c.data[key]
-            c = c.parent
-        return default
+        """Get the value for key set on this context or its ancestors.
+
+        Values set on an ancestor are only visible to contexts created
+        after they were set.
+        """
+        if key in self.data:
+            return self.data[key]
+        return self._inherited.get(key, default)
 
     def info(self, message: str, log: Optional[Logger] = None) -> None:
         if log is not None:
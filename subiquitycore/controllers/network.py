@@ -26,7 +26,7 @@ import yaml
 from probert.network import IFF_UP, NetworkEventReceiver
 
 from subiquitycore import netplan
-from subiquitycore.async_helpers import SingleInstanceTask
+from subiquitycore.async_helpers import SingleInstanceTask, run_in_thread
 from subiquitycore.context import with_context
 from subiquitycore.controller import BaseController
 from subiquitycore.file_util import write_file
@@ -250,17 +250,46 @@ class BaseNetworkController(BaseController):
                 # We don't actually care very much about this
                 log.exception("unset_link_flags failed for %s", dev.name)
 
-    async def _delete_devs(self, devs):
-        for dev in devs:
-            # XXX would be nicer to do this via rtlistener eventually.
-            log.debug("deleting %s", dev.name)
-            cmd = ["ip", "link", "delete", "dev", dev.name]
-            try:
-                await arun_command(cmd, check=True)
-            except subprocess.CalledProcessError as cp:
-                log.info("deleting %s failed with %r", dev.name, cp.stderr)
+    def _bg_delete_devs(self, devs):
+        # The rtlistener cannot delete links, so use a single netlink
+        # socket for all of them rather than running "ip link delete" once
+        # per device.
+        with pyroute2.IPRoute() as ipr:
+            for dev in devs:
+                log.debug("deleting %s", dev.name)
+                try:
+                    ipr.link("del", index=dev.ifindex)
+                except pyroute2.NetlinkError as e:
+                    log.info("deleting %s failed with %r", dev.name, e)
 
-    def _write_config(self):
+    async def _delete_devs(self, devs):
+        await run_in_thread(self._bg_delete_devs, devs)
+
+    async def _reconfigure_devs(self, devs) -> bool:
+        """Apply the written config to just devs.
+
+        This is what "netplan apply" boils down to for the networkd
+        backend when only existing physical interfaces changed. Returns
+        False if anything went wrong, in which case the caller should fall
+        back to a full "netplan apply".
+        """
+        env = orig_environ(None)
+        cmds = [
+            ["netplan", "generate"],
+            ["networkctl", "reload"],
+            ["networkctl", "reconfigure"] + [dev.name for dev in devs],
+        ]
+        try:
+            for cmd in cmds:
+                await arun_command(cmd, env=env, check=True)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            log.debug("reconfiguring %s failed: %r", [d.name for d in devs], exc)
+            return False
+        return True
+
+    def _write_config(self) -> bool:
+        """Write the netplan config, returning True if other netplan config
+        files had to be moved out of the way."""
         config = self.model.render_config()
 
         log.debug(
@@ -268,19 +297,25 @@ class BaseNetworkController(BaseController):
             yaml.dump(netplan.sanitize_config(config), default_flow_style=False),
         )
 
+        moved = False
         for p in netplan.configs_in_root(self.root, masked=True):
             if p == self.netplan_path:
                 continue
             os.rename(p, p + ".dist-" + self.opts.project)
+            moved = True
 
         write_file(self.netplan_path, self.model.stringify_config(config))
 
         self.parse_netplan_configs()
+        return moved
 
     @with_context(name="apply_config", description="silent={silent}", level="INFO")
     async def _apply_config(self, *, context, silent):
         devs_to_delete = []
         devs_to_down = []
+        # Whether the change can be applied with _reconfigure_devs, i.e.
+        # only existing, wired, physical devices changed.
+        partial = True
         dhcp_device_versions = []
         dhcp_events = set()
         for dev in self.model.get_all_netdevs(include_deleted=True):
@@ -295,14 +330,21 @@ class BaseNetworkController(BaseController):
                     dev.dhcp_events[v] = e = asyncio.Event()
                     dhcp_events.add(e)
             if dev.info is None:
+                if dev.config:
+                    # A virtual device that does not exist yet.
+                    partial = False
                 continue
             if dev.config != self.model.config.config_for_device(dev.info):
                 if dev.is_virtual:
                     devs_to_delete.append(dev)
                 else:
                     devs_to_down.append(dev)
+                    if dev.type == "wlan":
+                        partial = False
 
-        self._write_config()
+        if self._write_config():
+            partial = False
+        partial = partial and devs_to_down and not devs_to_delete
 
         if not silent:
             self.apply_starting()
@@ -337,23 +379,21 @@ class BaseNetworkController(BaseController):
                         check=True,
                         env=env,
                     )
+            elif partial and await self._reconfigure_devs(devs_to_down):
+                log.debug(
+                    "reconfigured %s without netplan apply",
+                    ", ".join(dev.name for dev in devs_to_down),
+                )
             else:
                 if devs_to_down or devs_to_delete:
                     try:
+                        # --now stops the units as well as masking them.
                         await arun_command(
                             [
                                 "systemctl",
                                 "mask",
                                 "--runtime",
-                                "systemd-networkd.service",
-                                "systemd-networkd.socket",
-                            ],
-                            check=True,
-                        )
-                        await arun_command(
-                            [
-                                "systemctl",
-                                "stop",
+                                "--now",
                                 "systemd-networkd.service",
                                 "systemd-networkd.socket",
                             ],
@@ -12,10 +12,16 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import subprocess
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, call, patch
 
-from subiquitycore.controllers.network import SubiquityNetworkEventReceiver
+import pyroute2
+
+from subiquitycore.controllers.network import (
+    BaseNetworkController,
+    SubiquityNetworkEventReceiver,
+)
 
 
 class TestRoutes(unittest.IsolatedAsyncioTestCase):
@@ -134,3 +140,36 @@ class TestRoutes(unittest.IsolatedAsyncioTestCase):
         ]
 
         self.assertFalse(self.er._default_route_exists(routes))
+
+
+class TestApplyHelpers(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.devs = [Mock(ifindex=3), Mock(ifindex=4)]
+        self.devs[0].name = "ens3"
+        self.devs[1].name = "ens4"
+
+    @patch("subiquitycore.controllers.network.pyroute2.IPRoute")
+    def test_delete_devs_one_socket(self, m_iproute):
+        ipr = m_iproute.return_value.__enter__.return_value
+        ipr.link.side_effect = [pyroute2.NetlinkError(19), None]
+        BaseNetworkController._bg_delete_devs(Mock(), self.devs)
+        m_iproute.assert_called_once_with()
+        self.assertEqual(
+            [call("del", index=3), call("del", index=4)], ipr.link.call_args_list
+        )
+
+    @patch("subiquitycore.controllers.network.arun_command")
+    async def test_reconfigure_devs(self, arun):
+        self.assertTrue(
+            await BaseNetworkController._reconfigure_devs(Mock(), self.devs)
+        )
+        self.assertEqual(
+            ["networkctl", "reconfigure", "ens3", "ens4"], arun.call_args.args[0]
+        )
+
+    @patch("subiquitycore.controllers.network.arun_command")
+    async def test_reconfigure_devs_failure(self, arun):
+        arun.side_effect = subprocess.CalledProcessError(1, ["networkctl"])
+        self.assertFalse(
+            await BaseNetworkController._reconfigure_devs(Mock(), self.devs)
+        )
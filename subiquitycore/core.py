@@ -13,7 +13,6 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-import json
 import logging
 import os
 
@@ -21,6 +20,8 @@ from subiquitycore.async_helpers import run_bg_task
 from subiquitycore.context import Context
 from subiquitycore.controllerset import ControllerSet
 from subiquitycore.pubsub import MessageHub
+from subiquitycore.state import StateStore
+from subiquitycore.watchdog import LoopWatchdog
 
 log = logging.getLogger("subiquitycore.core")
 
@@ -52,6 +53,8 @@ class Application:
             #    subiquitycore/prober.py
             #  - copy-logs-fail: makes post-install copying of logs fail, see
             #    subiquity/controllers/installprogress.py
+            #  - fatal-loop-stalls: makes API requests that block the event
+            #    loop for too long fail, see subiquity/server/server.py
             self.debug_flags = os.environ.get("SUBIQUITY_DEBUG", "").split(",")
 
         self.opts = opts
@@ -62,8 +65,15 @@ class Application:
             self.root = opts.output_base
         self.state_dir = os.path.join(self.root, "run", self.project)
         os.makedirs(self.state_path("states"), exist_ok=True)
+        self.state_store = StateStore(self.state_path("states"))
 
         self.scale_factor = float(os.environ.get("SUBIQUITY_REPLAY_TIMESCALE", "1"))
+        # Log the stack of whatever blocks the event loop for longer than
+        # this many seconds. 0 disables the check.
+        self.loop_stall_threshold = float(
+            os.environ.get("SUBIQUITY_LOOP_STALL_THRESHOLD", "0.5")
+        )
+        self.watchdog = None
         self.updated = os.path.exists(self.state_path("updating"))
         self.hub = MessageHub()
         asyncio.get_running_loop().set_exception_handler(self._exception_handler)
@@ -95,8 +105,7 @@ class Application:
         cur = self.controllers.cur
         if cur is None:
             return
-        with open(self.state_path("states", cur.name), "w") as fp:
-            json.dump(cur.serialize(), fp)
+        self.state_store.save(cur.name, cur.serialize())
 
     def report_start_event(self, context, description):
         log = logging.getLogger(context.full_name())
@@ -108,6 +117,13 @@ class Application:
         level = getattr(logging, context.level)
         log.log(level, "finish: %s %s", description, status.name)
 
+    def loop_stalled(self, stall):
+        log.warning(
+            "event loop blocked for %.3fs in:\n%s",
+            stall.duration,
+            "".join(stall.stack).rstrip(),
+        )
+
     # EventLoop -------------------------------------------------------------------
 
     def exit(self):
@@ -126,8 +142,20 @@ class Application:
 
     async def run(self):
         self.base_model = self.make_model()
+        if self.loop_stall_threshold > 0:
+            self.watchdog = LoopWatchdog(
+                asyncio.get_running_loop(),
+                self.loop_stall_threshold,
+                self.loop_stalled,
+            )
+            self.watchdog.start()
         run_bg_task(self.start())
-        await self.exit_event.wait()
+        try:
+            await self.exit_event.wait()
+        finally:
+            if self.watchdog is not None:
+                self.watchdog.stop()
+            await self.state_store.flush()
         if self._exc:
             exc, self._exc = self._exc, None
             raise exc
@@ -202,7 +202,7 @@ class NetworkDev:
         # Devices that have been configured in Subiquity but do not (yet) exist
         # on the system have their "info" field set to None. Once they exist,
         # probert should pass on the information through a call to new_link().
-        self.info: Optional[Link] = None
+        self._info: Optional[Link] = None
         self.disabled_reason = None
         self.dhcp_events = {}
         self._dhcp_state = {
@@ -333,6 +333,21 @@ class NetworkDev:
     def set_dhcp_state(self, version, state):
         self._dhcp_state[version] = state
 
+    @property
+    def info(self):
+        return self._info
+
+    @info.setter
+    def info(self, info):
+        # Keep the model's ifindex index up to date.
+        if self._model is not None:
+            by_ifindex = self._model.devices_by_ifindex
+            if self._info is not None and by_ifindex.get(self._info.ifindex) is self:
+                del by_ifindex[self._info.ifindex]
+            if info is not None:
+                by_ifindex[info.ifindex] = self
+        self._info = info
+
     @property
     def name(self):
         return self._name
@@ -356,6 +371,8 @@ class NetworkDev:
                 dead_device.config = None
                 dead_device.info = self.info
                 self.info = None
+            elif self._model.devices_by_name.get(self.name) is self:
+                del self._model.devices_by_name[self.name]
         self._name = new_name
 
     def supports_action(self, action):
@@ -455,6 +472,9 @@ class NetworkModel(object):
 
     def __init__(self, project):
         self.devices_by_name = {}  # Maps interface names to NetworkDev
+        # Maps ifindex to NetworkDev, for the devices that exist on the
+        # system. Maintained by NetworkDev.info.
+        self.devices_by_ifindex = {}
         self._has_network = False
         self.project = project
         self.force_offline = False
@@ -514,25 +534,21 @@ class NetworkModel(object):
         return dev
 
     def update_link(self, ifindex):
-        for name, dev in self.devices_by_name.items():
-            if dev.ifindex == ifindex:
-                return dev
+        return self.devices_by_ifindex.get(ifindex)
 
     def del_link(self, ifindex):
-        for name, dev in self.devices_by_name.items():
-            if dev.ifindex == ifindex:
-                dev.info = None
-                if dev.is_virtual:
-                    # We delete all virtual devices before running netplan
-                    # apply.  If a device has been deleted in the UI, we set
-                    # dev.config to None.  Now it's actually gone, forget we
-                    # ever knew it existed.
-                    if dev.config is None:
-                        del self.devices_by_name[name]
-                else:
-                    # If a physical interface disappears on us, it's gone.
-                    del self.devices_by_name[name]
-                return dev
+        dev = self.devices_by_ifindex.get(ifindex)
+        if dev is None:
+            return None
+        dev.info = None
+        # We delete all virtual devices before running netplan apply. If a
+        # device has been deleted in the UI, we set dev.config to None. Now
+        # it's actually gone, forget we ever knew it existed. If a physical
+        # interface disappears on us, it's gone.
+        if not dev.is_virtual or dev.config is None:
+            if self.devices_by_name.get(dev.name) is dev:
+                del self.devices_by_name[dev.name]
+        return dev
 
     def new_vlan(self, device_name, tag):
         name = "{name}.{tag}".format(name=device_name, tag=tag)
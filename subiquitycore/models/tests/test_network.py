@@ -14,7 +14,12 @@
 
 from unittest.mock import Mock
 
-from subiquitycore.models.network import BondConfig, BondParameters, NetworkDev
+from subiquitycore.models.network import (
+    BondConfig,
+    BondParameters,
+    NetworkDev,
+    NetworkModel,
+)
 from subiquitycore.tests import SubiTestCase
 from subiquitycore.tests.parameterized import parameterized
 
@@ -107,6 +112,46 @@ class TestNetworkDev(SubiTestCase):
         self.assertEqual(net_dev.config, {})
 
 
+class TestNetworkModelLinks(SubiTestCase):
+    def setUp(self):
+        self.model = NetworkModel("subiquity")
+        self.model.config = Mock(config_for_device=Mock(return_value={}))
+
+    def make_link(self, ifindex, name, typ="eth", is_virtual=False):
+        link = Mock(ifindex=ifindex, type=typ, is_virtual=is_virtual)
+        link.name = name
+        return link
+
+    def test_lookup_by_ifindex(self):
+        dev = self.model.new_link(2, self.make_link(2, "ens3"))
+        self.assertIs(dev, self.model.update_link(2))
+        self.assertIsNone(self.model.update_link(3))
+
+    def test_del_link(self):
+        dev = self.model.new_link(2, self.make_link(2, "ens3"))
+        self.assertIs(dev, self.model.del_link(2))
+        self.assertEqual({}, self.model.devices_by_name)
+        self.assertEqual({}, self.model.devices_by_ifindex)
+        self.assertIsNone(self.model.del_link(2))
+
+    def test_rename_existing_virtual(self):
+        self.model.config.config_for_device.return_value = {"interfaces": []}
+        dev = self.model.new_link(5, self.make_link(5, "bond0", "bond", True))
+        dev.name = "bond1"
+        # The device that exists on the system is now represented by a
+        # placeholder that gets deleted on the next apply.
+        dead = self.model.devices_by_name["bond0"]
+        self.assertIsNot(dev, dead)
+        self.assertIs(dead, self.model.update_link(5))
+        self.assertIs(dead, self.model.del_link(5))
+        self.assertEqual({"bond1": dev}, self.model.devices_by_name)
+
+    def test_rename_new_virtual(self):
+        dev = self.model.new_bond("bond0", BondConfig([], "balance-rr", None, None))
+        dev.name = "bond1"
+        self.assertEqual({"bond1": dev}, self.model.devices_by_name)
+
+
 class TestBondConfig(SubiTestCase):
     @parameterized.expand(
         [
@@ -0,0 +1,125 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+from subiquitycore.async_helpers import run_in_thread
+
+log = logging.getLogger("subiquitycore.state")
+
+
+class StateStore:
+    """Persist the serialized state of controllers in a directory.
+
+    Each state is kept as JSON in a file named after its controller.
+    save() returns immediately: the states saved while a write is in
+    progress are written together by the next one, in a thread. Each file
+    is written to a temporary file that is then renamed over it, so a
+    crash never leaves a state half-written.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.states: Dict[str, Any] = {}
+        self._pending: Dict[str, str] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Held while the directory is read or written in a thread.
+        self._io_lock = asyncio.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.states
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.states.get(name, default)
+
+    async def load(self) -> Dict[str, Any]:
+        """Read all the states from the directory, once the states already
+        saved have been written."""
+        await self.flush()
+        async with self._io_lock:
+            states = await run_in_thread(self._read)
+        # Do not lose what was saved while reading.
+        for name in self._pending:
+            states[name] = self.states[name]
+        self.states = states
+        return states
+
+    def _read(self) -> Dict[str, Any]:
+        states = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    # Left over by a write that did not complete: no write
+                    # is in progress while the lock is held.
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(entry.path)
+                    continue
+                try:
+                    with open(entry.path) as fp:
+                        states[entry.name] = json.load(fp)
+                except (OSError, ValueError):
+                    log.exception("ignoring state in %s", entry.path)
+        return states
+
+    def save(self, name: str, state: Any) -> None:
+        """Record state and schedule writing it. Must be called in the loop."""
+        self.states[name] = state
+        # Serialize now: the controller may change the object before the
+        # write happens.
+        self._pending[name] = json.dumps(state)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def flush(self) -> None:
+        """Wait for the saved states to be written."""
+        if self._flush_task is not None:
+            await asyncio.shield(self._flush_task)
+
+    async def _flush(self) -> None:
+        try:
+            # Let the states saved by the callbacks that are already
+            # scheduled join the first batch.
+            await asyncio.sleep(0)
+            while self._pending:
+                async with self._io_lock:
+                    batch, self._pending = self._pending, {}
+                    await run_in_thread(self._write, batch)
+        finally:
+            self._flush_task = None
+
+    def _write(self, batch: Dict[str, str]) -> None:
+        for name, content in batch.items():
+            path = os.path.join(self.directory, name)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{name}.")
+            try:
+                with os.fdopen(fd, "w") as fp:
+                    fp.write(content)
+                    fp.flush()
+                    os.fsync(fp.fileno())
+                os.rename(tmp, path)
+            except OSError:
+                log.exception("writing state to %s failed", path)
+                os.unlink(tmp)
+        # Make the renames durable too.
+        dirfd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(dirfd)
+        finally:
+            os.close(dirfd)
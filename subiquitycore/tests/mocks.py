@@ -51,6 +51,8 @@ def make_app(model=None):
     app.report_start_event = mock.Mock()
     app.report_finish_event = mock.Mock()
     app.make_apport_report = mock.Mock()
+    app.state_path = mock.Mock()
+    app.state_store = mock.MagicMock()
     app.snapdapi = mock.AsyncMock()
 
     return app
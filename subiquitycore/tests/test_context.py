@@ -0,0 +1,51 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from subiquitycore.context import Context
+from subiquitycore.tests.mocks import make_app
+
+
+class TestContext(unittest.TestCase):
+    def setUp(self):
+        self.root = Context.new(make_app())
+
+    def test_full_name_and_depth(self):
+        child = self.root.child("a")
+        grandchild = child.child("b")
+        self.assertEqual("mini", self.root.full_name())
+        self.assertEqual("mini/a/b", grandchild.full_name())
+        self.assertEqual(0, self.root.depth)
+        self.assertEqual(2, grandchild.depth)
+
+    def test_get(self):
+        child = self.root.child("a")
+        child.set("key", "child")
+        grandchild = child.child("b")
+        self.assertEqual("child", grandchild.get("key"))
+        self.assertIsNone(self.root.get("key"))
+        self.assertEqual("default", self.root.get("key", "default"))
+
+    def test_get_overridden(self):
+        self.root.set("key", "root")
+        child = self.root.child("a")
+        child.set("key", "child")
+        grandchild = child.child("b")
+        self.assertEqual("child", grandchild.get("key"))
+        self.assertEqual("root", self.root.child("c").get("key"))
+
+    def test_no_arbitrary_attributes(self):
+        with self.assertRaises(AttributeError):
+            self.root.something = 1
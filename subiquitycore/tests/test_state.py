@@ -0,0 +1,94 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import json
+import os
+import threading
+from unittest import mock
+
+from subiquitycore.state import StateStore
+from subiquitycore.tests import SubiTestCase
+
+
+class TestStateStore(SubiTestCase):
+    def setUp(self):
+        self.directory = self.tmp_dir()
+        self.store = StateStore(self.directory)
+
+    async def test_save_batches_writes(self):
+        with mock.patch.object(
+            self.store, "_write", wraps=self.store._write
+        ) as m_write:
+            self.store.save("Locale", "fr_FR.UTF-8")
+            self.store.save("Proxy", None)
+            self.store.save("Locale", "en_US.UTF-8")
+            self.assertEqual("en_US.UTF-8", self.store.get("Locale"))
+            await self.store.flush()
+        m_write.assert_called_once_with(
+            {"Locale": '"en_US.UTF-8"', "Proxy": "null"},
+        )
+        self.assertEqual(["Locale", "Proxy"], sorted(os.listdir(self.directory)))
+        with open(os.path.join(self.directory, "Locale")) as fp:
+            self.assertEqual("en_US.UTF-8", json.load(fp))
+
+    async def test_save_serializes_immediately(self):
+        state = {"mirror": "http://archive.ubuntu.com/ubuntu"}
+        self.store.save("Mirror", state)
+        state["mirror"] = None
+        await self.store.flush()
+        with open(os.path.join(self.directory, "Mirror")) as fp:
+            self.assertEqual(
+                "http://archive.ubuntu.com/ubuntu", json.load(fp)["mirror"]
+            )
+
+    async def test_load(self):
+        self.store.save("Locale", "fr_FR.UTF-8")
+        self.store.save("Proxy", None)
+        await self.store.flush()
+        # What a crash during a write leaves behind.
+        with open(os.path.join(self.directory, ".Locale.abcdef"), "w") as fp:
+            fp.write('"en_')
+        with open(os.path.join(self.directory, "Bad"), "w") as fp:
+            fp.write("{")
+
+        store = StateStore(self.directory)
+        self.assertEqual({"Locale": "fr_FR.UTF-8", "Proxy": None}, await store.load())
+        self.assertIn("Proxy", store)
+        self.assertNotIn("Bad", store)
+        self.assertNotIn(".Locale.abcdef", os.listdir(self.directory))
+
+    async def test_save_while_loading(self):
+        self.store.save("Locale", "fr_FR.UTF-8")
+        loop = asyncio.get_running_loop()
+        saved = threading.Event()
+        read = self.store._read
+
+        def save_proxy():
+            self.store.save("Proxy", None)
+            saved.set()
+
+        def read_and_save():
+            loop.call_soon_threadsafe(save_proxy)
+            saved.wait()
+            # What was saved before loading is written first, and what is
+            # saved while reading is only written afterwards.
+            self.assertEqual(["Locale"], os.listdir(self.directory))
+            return read()
+
+        with mock.patch.object(self.store, "_read", side_effect=read_and_save):
+            states = await self.store.load()
+        self.assertEqual({"Locale": "fr_FR.UTF-8", "Proxy": None}, states)
+        await self.store.flush()
+        self.assertEqual(["Locale", "Proxy"], sorted(os.listdir(self.directory)))
@@ -0,0 +1,92 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import time
+
+from subiquitycore.tests import SubiTestCase
+from subiquitycore.watchdog import LoopWatchdog
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+class TestLoopWatchdog(SubiTestCase):
+    async def asyncSetUp(self):
+        self.stalls = []
+        self.watchdog = LoopWatchdog(
+            asyncio.get_running_loop(), 0.1, self.stalls.append
+        )
+        self.watchdog.start()
+        self.addCleanup(self.watchdog.stop)
+
+    async def test_no_stall(self):
+        for _ in range(10):
+            block_the_loop(0.02)
+            await asyncio.sleep(0.01)
+        self.assertEqual([], self.stalls)
+        self.assertEqual(0, self.watchdog.stall_count)
+
+    async def test_stall(self):
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        # The stall was detected while the loop was blocked.
+        self.assertEqual(1, self.watchdog.stall_count)
+        [stall] = self.watchdog.stalls_since(0, asyncio.current_task())
+        self.assertEqual([], self.watchdog.stalls_since(1, asyncio.current_task()))
+        self.assertEqual([], self.stalls)
+        await asyncio.sleep(0.1)
+        self.assertEqual([stall], self.stalls)
+        self.assertGreaterEqual(stall.duration, 0.25)
+        self.assertIn("block_the_loop", stall.stack[-2])
+        self.assertIs(asyncio.current_task(), stall.task)
+
+    async def test_stop(self):
+        self.watchdog.stop()
+        self.assertFalse(self.watchdog.running)
+        block_the_loop(0.3)
+        self.assertEqual(0, self.watchdog.stall_count)
+
+
+class TestLoopWatchdogLag(SubiTestCase):
+    async def asyncSetUp(self):
+        self.stalls = []
+        self.now = 10.0
+        self.watchdog = LoopWatchdog(
+            asyncio.get_running_loop(),
+            0.4,
+            self.stalls.append,
+            clock=lambda: self.now,
+        )
+        self.watchdog._beat = 10.0
+
+    async def test_block_before_heartbeat(self):
+        # The loop blocks for 0.33s from just before the heartbeat due at
+        # 10.1, and the check happens just before the loop runs again.
+        self.now = 10.415
+        self.assertIsNone(self.watchdog._check(None))
+        self.assertEqual(0, self.watchdog.stall_count)
+
+    async def test_stall_measured_from_due_heartbeat(self):
+        self.now = 10.55
+        stall = self.watchdog._check(None)
+        self.assertEqual(10.1, stall.start)
+        self.assertAlmostEqual(0.45, stall.duration)
+        # The heartbeat finally runs at 10.7.
+        self.watchdog._beat = self.now = 10.7
+        self.assertIsNone(self.watchdog._check(stall))
+        await asyncio.sleep(0)
+        self.assertEqual([stall], self.stalls)
+        self.assertAlmostEqual(0.6, stall.duration)
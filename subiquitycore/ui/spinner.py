@@ -44,6 +44,52 @@ styles = {
 log = logging.getLogger("subiquitycore.ui.spinner")
 
 
+class _Animator:
+    """Drives all running spinners from a single task.
+
+    Rather than every spinner running its own timer (and requesting its own
+    redraws), running spinners register here and are advanced together,
+    with at most one redraw requested per app per tick.
+    """
+
+    tick = 0.1
+
+    def __init__(self):
+        self.spinners = set()
+        self.ticks = 0
+        self._task = None
+
+    def add(self, spinner):
+        self.spinners.add(spinner)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def discard(self, spinner):
+        self.spinners.discard(spinner)
+        if not self.spinners and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def step(self):
+        self.ticks += 1
+        apps = set()
+        for spinner in list(self.spinners):
+            if self.ticks % spinner.ticks_per_frame == 0:
+                spinner.advance()
+                if spinner.app is not None:
+                    apps.add(spinner.app)
+        for app in apps:
+            app.request_screen_redraw()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            self.step()
+
+
+_animator = _Animator()
+
+
 class Spinner(Text):
     """An animation used when loading elements.
     Use the .start() method to start the animation. You must ensure that you
@@ -56,35 +102,35 @@ class Spinner(Text):
         self.spin_index = 0
         self.spin_text = styles[style]["texts"]
         self.rate = styles[style]["rate"]
+        self.ticks_per_frame = max(1, round(self.rate / _animator.tick))
         self.app = app
         super().__init__("", align=align)
-        self._spin_task = None
+        self._running = False
 
-    def spin(self):
+    def advance(self):
         if self.debug:
             log.debug("spinning spinner %s", id(self))
         self.spin_index = (self.spin_index + 1) % len(self.spin_text)
         self.set_text(self.spin_text[self.spin_index])
+
+    def spin(self):
+        self.advance()
         if self.app is not None:
             self.app.request_screen_redraw()
 
-    async def _spin(self):
-        while True:
-            self.spin()
-            await asyncio.sleep(self.rate)
-
     def start(self):
-        if self._spin_task is not None:
+        if self._running:
             return
         if self.debug:
             log.debug("starting spinner %s", id(self))
-        self.stop()
-        self._spin_task = asyncio.create_task(self._spin())
+        self._running = True
+        self.advance()
+        _animator.add(self)
 
     def stop(self):
         if self.debug:
             log.debug("stopping spinner %s", id(self))
         self.set_text("")
-        if self._spin_task is not None:
-            self._spin_task.cancel()
-            self._spin_task = None
+        if self._running:
+            self._running = False
+            _animator.discard(self)
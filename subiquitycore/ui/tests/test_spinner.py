@@ -0,0 +1,54 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+from unittest import mock
+
+from subiquitycore.ui import spinner as spinner_mod
+from subiquitycore.ui.spinner import Spinner
+
+
+class TestSpinner(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.animator = spinner_mod._animator
+        self.animator.ticks = 0
+
+    async def test_shared_animation(self):
+        app = mock.Mock()
+        spinners = [Spinner(app=app) for _ in range(3)]
+        for spinner in spinners:
+            spinner.start()
+        task = self.animator._task
+        self.assertIsNotNone(task)
+        self.animator.step()
+        self.animator.step()
+        # All the spinners are driven by one task, and one redraw is
+        # requested per tick rather than one per spinner.
+        self.assertIs(task, self.animator._task)
+        self.assertEqual(2, app.request_screen_redraw.call_count)
+        self.assertEqual([3, 3, 3], [spinner.spin_index for spinner in spinners])
+        for spinner in spinners:
+            spinner.stop()
+        self.assertIsNone(self.animator._task)
+        self.assertEqual("", spinners[0].text)
+
+    async def test_slower_style(self):
+        spinner = Spinner(style="dots")
+        spinner.start()
+        self.assertEqual(1, spinner.spin_index)
+        self.animator.step()
+        self.animator.step()
+        # dots animates at half the rate of the animator's tick.
+        self.assertEqual(2, spinner.spin_index)
+        spinner.stop()
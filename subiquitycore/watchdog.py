@@ -0,0 +1,152 @@
+# Copyright 2026 Canonical, Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import collections
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Deque, List, Optional
+
+import attr
+
+log = logging.getLogger("subiquitycore.watchdog")
+
+
+@attr.s(auto_attribs=True, eq=False)
+class Stall:
+    # Incremented for each stall detected by a watchdog.
+    number: int
+    # When the loop should have run the heartbeat it did not run, according
+    # to the clock of the watchdog.
+    start: float
+    duration: float
+    # The stack of the loop thread when the stall was detected, as
+    # formatted by traceback.format_list.
+    stack: List[str]
+    # The task that was running, if any.
+    task: Optional[asyncio.Task] = None
+
+
+class LoopWatchdog:
+    """Detect when the event loop does not run for more than threshold seconds.
+
+    A callback is scheduled on the loop every threshold / 4 seconds and a
+    thread checks that it keeps running. When it has not run for longer
+    than threshold, the stack of the loop thread, i.e. the stack of the
+    code blocking the loop, is captured. When the loop runs again,
+    on_stall is called in the loop with the stall and its final duration.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        threshold: float,
+        on_stall: Callable[[Stall], None],
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.loop = loop
+        self.threshold = threshold
+        self.on_stall = on_stall
+        self.clock = clock
+        self.period = threshold / 4
+        # The number of stalls detected so far, including the current one.
+        self.stall_count = 0
+        # The last stalls detected, including the current one.
+        self.recent: Deque[Stall] = collections.deque(maxlen=100)
+        self._loop_thread_id: Optional[int] = None
+        self._beat = 0.0
+        self._beat_handle: Optional[asyncio.TimerHandle] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start watching. Must be called from the event loop thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._heartbeat()
+        self._thread = threading.Thread(
+            target=self._run, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching. Must be called from the event loop thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self._beat_handle is not None:
+            self._beat_handle.cancel()
+            self._beat_handle = None
+
+    def stalls_since(self, count: int, task: asyncio.Task) -> List[Stall]:
+        """Return the stalls of task detected after stall_count was count."""
+        return [s for s in list(self.recent) if s.number > count and s.task is task]
+
+    def _heartbeat(self) -> None:
+        self._beat = self.clock()
+        self._beat_handle = self.loop.call_later(self.period, self._heartbeat)
+
+    def _finish(self, stall: Stall) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self.on_stall, stall)
+        except RuntimeError:
+            # The loop is closed.
+            pass
+
+    def _check(self, stall: Optional[Stall]) -> Optional[Stall]:
+        """Check that the loop runs, given the stall in progress if any, and
+        return the stall still in progress."""
+        # Measure from when the next heartbeat was due rather than from the
+        # last one, or a block starting just before a heartbeat would count
+        # up to a whole period more than it lasted.
+        beat = self._beat
+        due = beat + self.period
+        if stall is not None and due != stall.start:
+            # A heartbeat ran at last, when the stall ended.
+            stall.duration = beat - stall.start
+            self._finish(stall)
+            stall = None
+        lag = self.clock() - due
+        if lag <= self.threshold:
+            return stall
+        if stall is None:
+            frame = sys._current_frames().get(self._loop_thread_id)
+            self.stall_count += 1
+            stall = Stall(
+                number=self.stall_count,
+                start=due,
+                duration=lag,
+                stack=traceback.format_list(traceback.extract_stack(frame)),
+                task=asyncio.current_task(self.loop),
+            )
+            self.recent.append(stall)
+        stall.duration = lag
+        return stall
+
+    def _run(self) -> None:
+        stall: Optional[Stall] = None
+        while not self._stop.wait(self.period):
+            stall = self._check(stall)
+        if stall is not None:
+            self._finish(stall)